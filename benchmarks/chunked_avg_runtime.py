@@ -0,0 +1,58 @@
+"""
+Benchmarks the vectorized chunked downsampling against the former groupby/lambda implementation.
+
+Usage:
+    python benchmarks/chunked_avg_runtime.py [parquet files ...] [--chunk-size 20] [--repeat 5]
+
+Without files, the largest parquet file under data/ is used.
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from opendic_benchmark_dashboard import aggregation, downsampling
+
+
+def legacy_chunked_avg_runtime(data_df, chunk_size=20, columns=["system_name", "ddl_command", "target_object"]):
+    # The implementation before the reduceat rewrite, kept for comparison (tests/test_downsampling.py checks that
+    # both give the same result)
+    create_summary = data_df.reset_index(drop=True)
+    create_summary["chunk_id"] = create_summary.index // chunk_size
+    return create_summary.groupby(columns + ["chunk_id"], as_index=False, observed=True).agg(
+        avg_runtime=("avg_runtime", "mean"),
+        granularity=("granularity", lambda x: x.iloc[0]),
+    )
+
+
+def best_of(repeat: int, func, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_files", nargs="*")
+    parser.add_argument("--chunk-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data_files = args.data_files or [max(glob.glob("data/**/*.parquet", recursive=True), key=os.path.getsize)]
+    # The CREATE summary the dashboard plots, from the per-file aggregate sidecars
+    create_df = aggregation.split_by_command(aggregation.load_file_aggregates(data_files))["CREATE"]
+    print(f"{', '.join(data_files)}: {len(create_df)} CREATE summary rows, chunk size {args.chunk_size}")
+
+    legacy = best_of(args.repeat, legacy_chunked_avg_runtime, create_df, args.chunk_size)
+    print(f"{'legacy groupby/lambda':<24}{legacy * 1000:10.2f} ms")
+    for mode in ["mean", "envelope", "percentiles", "lttb"]:
+        seconds = best_of(args.repeat, downsampling.downsample, create_df, mode=mode, chunk_size=args.chunk_size)
+        print(f"{mode:<24}{seconds * 1000:10.2f} ms  ({legacy / seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
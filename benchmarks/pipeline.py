@@ -0,0 +1,346 @@
+"""
+Benchmarks the load, aggregate and render pipeline of the dashboard on synthetic benchmark results.
+
+Usage:
+    python benchmarks/pipeline.py [--rows 1000000] [--systems 4] [--granularities 100000] [--repeat 3]
+                                  [--data-dir DIR [--clear-sidecars]] [--output results.json] [--compare earlier.json]
+
+Generates one parquet file per system with the columns of the real benchmark files, then times every stage
+behind the dashboard pages separately: loading (`load_data_standard`, the TLDR `load_data`), the chunked
+averages, the aggregation of each dashboard and the figure construction. Every stage reports its best time
+and the peak RSS of the process after it, results are written as JSON so runs can be compared over time.
+
+The cold sidecar stages delete the sidecars next to the data files. They only run on the temporary data dir,
+or on a `--data-dir` with `--clear-sidecars`.
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from opendic_benchmark_dashboard import (
+    aggregation,
+    disk_cache,
+    downsampling,
+    figures,
+    loader,
+    lod,
+    runtime_stats,
+    scaling,
+    schema,
+    sketch_store,
+    summary_store,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+TARGET_OBJECTS = ["table", "view", "function", "role"]
+
+# Groups of the TLDR aggregates and percentile sketches, like in streamlit_app.py
+TLDR_GROUP_COLUMNS = ["system_name", "ddl_command", "granularity"]
+PERCENTILE_GROUP_COLUMNS = ["system_name", "ddl_command", "granularity_bucket"]
+
+
+def generate_runs(system_name: str, rows: int, max_granularity: int, seed: int) -> pa.Table:
+    """
+    Synthetic runs of one system, shaped like the real files.
+
+    CREATE is run at every granularity, ALTER, COMMENT and SHOW at the powers of ten with three repetitions.
+    Runtimes are log-normal and grow with the granularity at a system-specific rate.
+    """
+    rng = np.random.default_rng(seed)
+    powers = 10 ** np.arange(int(np.log10(max_granularity)) + 1)
+    n_other = min(rows // 10, 3 * len(powers) * 3 * len(TARGET_OBJECTS) * 100)
+    n_create = rows - n_other
+
+    ddl_command = np.concatenate([np.full(n_create, "CREATE"), rng.choice(["ALTER", "COMMENT", "SHOW"], n_other)])
+    granularity = np.concatenate([np.arange(n_create) % max_granularity, rng.choice(powers, n_other)]).astype(np.int32)
+    target_object = rng.choice(TARGET_OBJECTS, rows)
+    growth = 10 ** rng.uniform(-7, -4)
+    query_runtime = rng.lognormal(np.log(0.002), 0.3, rows) * (1 + growth * granularity)
+    start_time = np.datetime64("2025-05-01T00:00:00", "us") + np.cumsum((query_runtime * 1e6).astype("timedelta64[us]"))
+    return pa.table(
+        {
+            "system_name": pa.array(np.full(rows, system_name)),
+            "ddl_command": pa.array(ddl_command),
+            "query_text": pa.array(np.char.add(np.char.add(ddl_command, " "), target_object)),
+            "target_object": pa.array(target_object),
+            "granularity": pa.array(granularity),
+            "repetition_nr": pa.array(rng.integers(0, 3, rows, dtype=np.int32)),
+            "query_runtime": pa.array(query_runtime),
+            "start_time": pa.array(start_time),
+            "end_time": pa.array(start_time + (query_runtime * 1e6).astype("timedelta64[us]")),
+        }
+    )
+
+
+def generate_data(data_dir: str, rows: int, systems: int, max_granularity: int) -> list[str]:
+    os.makedirs(data_dir, exist_ok=True)
+    data_files = []
+    for i in range(systems):
+        data_file = os.path.join(data_dir, f"system_{i}.parquet")
+        pq.write_table(generate_runs(f"system_{i}", rows // systems, max_granularity, seed=i), data_file)
+        data_files.append(data_file)
+    return data_files
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Stages:
+    """
+    Records the best time and peak RSS of every pipeline stage.
+    """
+
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, name: str, func, *args, setup=None, repeat=None, **kwargs):
+        """
+        Times `func(*args, **kwargs)`, calling `setup` untimed before every repetition, and returns its result.
+        """
+        rss_before = peak_rss_mib()
+        timings = []
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+        self.results.append(
+            {
+                "stage": name,
+                "seconds": round(min(timings), 6),
+                "peak_rss_mib": round(peak_rss_mib(), 1),
+                # Growth of the high-water mark, 0 if the stage fits into memory peaked by earlier stages
+                "rss_growth_mib": round(peak_rss_mib() - rss_before, 1),
+            }
+        )
+        print(f"{name:<48}{min(timings) * 1000:12.2f} ms  peak {peak_rss_mib():8.0f} MiB")
+        return result
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_pipeline(data_files: list[str], cache_dir: str, stages: Stages, cold_sidecars: bool = True) -> None:
+    """
+    Times every stage of the dashboard pipeline on `data_files`.
+
+    Args:
+        cold_sidecars (bool): Also time the sidecar stages from scratch, deleting the sidecars of `data_files`.
+    """
+    data_dir = os.path.dirname(data_files[0])
+    table_cache = disk_cache.DiskCache(cache_dir)
+
+    def clear_table_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def clear_sidecars():
+        for sidecar_dir in (summary_store.SIDECAR_DIR, sketch_store.SKETCH_DIR):
+            shutil.rmtree(os.path.join(data_dir, sidecar_dir), ignore_errors=True)
+
+    def load_data_standard(cache):
+        tables = loader.read_benchmark_tables(data_files, columns=loader.RUNTIME_COLUMNS, table_cache=cache)
+        return schema.to_frame(list(tables.values()))
+
+    # Loading
+    stages.measure("load_data_standard (parquet, no cache)", load_data_standard, disk_cache.DiskCache(max_bytes=0))
+    stages.measure("load_data_standard (cold cache)", load_data_standard, table_cache, setup=clear_table_cache, repeat=1)
+    data_df = stages.measure("load_data_standard (warm cache)", load_data_standard, table_cache)
+    if cold_sidecars:
+        stages.measure(
+            "load_data (TLDR aggregates, cold sidecars)",
+            aggregation.load_file_aggregates,
+            data_files,
+            TLDR_GROUP_COLUMNS,
+            setup=clear_sidecars,
+            repeat=1,
+        )
+    runtime_df = stages.measure(
+        "load_data (TLDR aggregates, warm)", aggregation.load_file_aggregates, data_files, TLDR_GROUP_COLUMNS
+    )
+    stages.measure(
+        "load_data (TLDR raw page, sorted)", loader.read_page, data_files, sort_by="query_runtime", table_cache=table_cache
+    )
+    stats_df = stages.measure("load_summary_stats", aggregation.load_file_aggregates, data_files)
+
+    # Aggregation of the dashboards
+    summaries = stages.measure("standard/opendic: split_by_command", aggregation.split_by_command, stats_df)
+    create_df = summaries["CREATE"]
+    create_summary_df = stages.measure("chunked_avg_runtime (chunk 20)", downsampling.chunked_mean, create_df, 20)
+    stages.measure("chunked_avg_runtime (chunk 1000)", downsampling.chunked_mean, create_df, 1000)
+    batch_summaries = stages.measure(
+        "opendic_batch: split_by_command", aggregation.split_by_command, stats_df, {"CREATE": "sum"}
+    )
+    stages.measure("TLDR: combine_aggregates", summary_store.combine_aggregates, [runtime_df], TLDR_GROUP_COLUMNS)
+    runtime_stats_df = stages.measure("error bands: runtime_statistics", runtime_stats.runtime_statistics, data_df, repeat=1)
+    if cold_sidecars:
+        stages.measure(
+            "percentiles: load_sketches (cold)",
+            loader.map_files,
+            sketch_store.load_sketches,
+            data_files,
+            setup=clear_sidecars,
+            repeat=1,
+        )
+    sketch_df = stages.measure(
+        "percentiles: merge_sketches (warm)",
+        lambda: sketch_store.merge_sketches(
+            loader.map_files(sketch_store.load_sketches, data_files), PERCENTILE_GROUP_COLUMNS
+        ),
+    )
+    percentiles_df = stages.measure(
+        "percentiles: sketch_percentiles", sketch_store.sketch_percentiles, sketch_df, PERCENTILE_GROUP_COLUMNS
+    )
+    scaling_df = stages.measure("scaling: scaling_report", scaling.scaling_report, stats_df, 1_000_000, 1.0)
+
+    # Figure construction
+    level_of_detail = lod.LevelOfDetail()
+    plot_df = stages.measure(
+        "figures: reduce_traces (CREATE)",
+        lod.reduce_traces,
+        create_summary_df,
+        ["system_name", "target_object"],
+        level_of_detail,
+    )
+    stages.measure(
+        "figures: summary (CREATE)",
+        figures.summary_figure,
+        plot_df,
+        "Log",
+        series_column="system_name",
+        line_dash="target_object",
+        render_mode=lod.render_mode(len(plot_df), level_of_detail),
+    )
+    alter_df = summaries["ALTER"].merge(
+        runtime_stats_df.drop(columns=["count", "mean"]), on=summary_store.GROUP_COLUMNS, how="left"
+    )
+    stages.measure(
+        "figures: summary with p50-p90-p99 band (ALTER)",
+        figures.summary_figure,
+        alter_df,
+        "Log",
+        series_column="system_name",
+        line_dash="target_object",
+        band="percentiles",
+    )
+    stages.measure(
+        "figures: histogram (batched CREATE)", figures.histogram_figure, batch_summaries["CREATE"], "Log", "system_name"
+    )
+    long_df = percentiles_df.melt(
+        id_vars=PERCENTILE_GROUP_COLUMNS,
+        value_vars=runtime_stats.quantile_columns(),
+        var_name="percentile",
+        value_name="runtime",
+    )
+    stages.measure("figures: percentiles", figures.percentiles_figure, long_df, "Log")
+    scaling_plot_df = pd.concat(
+        [
+            scaling.scaling_curves(scaling_df, 1, 1_000_000).assign(series="fit"),
+            scaling.measured_points(stats_df).assign(series="measured"),
+        ],
+        ignore_index=True,
+    )
+    stages.measure("figures: scaling", figures.scaling_figure, scaling_plot_df, 1_000_000, 1.0)
+    fig = stages.measure("figures: to_json", figures.summary_figure(plot_df, "Log", series_column="system_name").to_json)
+    stages.measure("figures: from_json (figure cache hit)", figures.pio.from_json, fig)
+
+
+def compare(results: list[dict], earlier_path: str) -> None:
+    with open(earlier_path) as f:
+        earlier = {stage["stage"]: stage for stage in json.load(f)["stages"]}
+    print(f"\nCompared to {earlier_path}:")
+    for stage in results:
+        if stage["stage"] in earlier and earlier[stage["stage"]]["seconds"] > 0:
+            ratio = stage["seconds"] / earlier[stage["stage"]]["seconds"]
+            print(f"{stage['stage']:<48}{ratio:8.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Runs over all systems")
+    parser.add_argument("--systems", type=int, default=4)
+    parser.add_argument("--granularities", type=int, default=100_000, help="Largest CREATE granularity")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", help="Keep the synthetic files here instead of a temporary dir")
+    parser.add_argument(
+        "--clear-sidecars",
+        action="store_true",
+        help="Delete the sidecars of --data-dir to time the cold sidecar stages, skipped otherwise",
+    )
+    parser.add_argument("--output", help=f"JSON results file, by default a new file in {RESULTS_DIR}")
+    parser.add_argument("--compare", help="Earlier JSON results to compare the timings with")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="opendic-bench-")
+    data_dir = args.data_dir or os.path.join(work_dir, "data")
+    try:
+        start = time.perf_counter()
+        if not glob.glob(os.path.join(data_dir, "*.parquet")):
+            generate_data(data_dir, args.rows, args.systems, args.granularities)
+        data_files = sorted(glob.glob(os.path.join(data_dir, "*.parquet")))
+        print(f"{len(data_files)} synthetic file(s) in {data_dir} ({time.perf_counter() - start:.1f}s)\n")
+
+        stages = Stages(args.repeat)
+        # Sidecars of a user-supplied data dir are only deleted on request
+        cold_sidecars = args.data_dir is None or args.clear_sidecars
+        run_pipeline(data_files, os.path.join(work_dir, "cache"), stages, cold_sidecars)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "parameters": {
+            "rows": args.rows,
+            "systems": args.systems,
+            "granularities": args.granularities,
+            "repeat": args.repeat,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "pyarrow": pa.__version__,
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+        },
+        "peak_rss_mib": round(peak_rss_mib(), 1),
+        "stages": stages.results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"pipeline-{args.rows}-{results['timestamp'].replace(':', '').replace('+0000', 'Z')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nPeak RSS {results['peak_rss_mib']:.0f} MiB, results written to {output}")
+
+    if args.compare:
+        compare(stages.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
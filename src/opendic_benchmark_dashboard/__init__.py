@@ -4,7 +4,11 @@ import sys
 
 
 def main() -> None:
-    print("Hello from opendic-benchmark-dashboard!")
+    """Render the dashboards headlessly into static files (see `report`)"""
+    # Imported here so the Streamlit launcher does not load pandas and Plotly
+    from opendic_benchmark_dashboard import report
+
+    report.main()
 
 
 def run_streamlit_app() -> None:
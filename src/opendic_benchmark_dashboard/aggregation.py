@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import duckdb_backend, loader, schema, summary_store, tracing
+from opendic_benchmark_dashboard.summary_store import GROUP_COLUMNS
+
+DDL_COMMANDS = ("CREATE", "ALTER", "COMMENT", "SHOW")
+
+# Engines that can compute the per-group runtime aggregates
+BACKENDS = ("pandas", "duckdb")
+
+
+def split_by_command(
+    summary_df: pd.DataFrame,
+    agg_spec: dict[str, str] | None = None,
+    default_agg: str = "mean",
+    group_columns=GROUP_COLUMNS,
+    ddl_commands=DDL_COMMANDS,
+) -> dict[str, pd.DataFrame]:
+    """
+    Splits a frame of per-group aggregates (one column per aggregation, e.g. from `summary_store`) into one
+    frame per DDL command, with the selected aggregation as `avg_runtime`.
+    """
+    agg_spec = agg_spec or {}
+    # Row positions of each command, found in one pass over the (small) summary
+    positions = summary_df.groupby("ddl_command", sort=False, observed=True).indices
+    no_rows = np.array([], dtype=np.intp)
+
+    summaries = {}
+    for ddl_command in ddl_commands:
+        agg = agg_spec.get(ddl_command, default_agg)
+        summaries[ddl_command] = (
+            summary_df[group_columns + [agg]]
+            .take(positions.get(ddl_command, no_rows))
+            .rename(columns={agg: "avg_runtime"})
+            .reset_index(drop=True)
+        )
+    return summaries
+
+
+def backend_from_environment() -> str:
+    """
+    Reads the aggregation backend from `OPENDIC_DASHBOARD_BACKEND` ("pandas" by default, or "duckdb").
+    """
+    backend = os.environ.get("OPENDIC_DASHBOARD_BACKEND", "pandas")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    return backend
+
+
+@tracing.traced(name="groupby aggregates")
+def load_file_aggregates(data_files: list[str], group_columns=GROUP_COLUMNS, backend: str | None = None) -> pd.DataFrame:
+    """
+    Per-group runtime aggregates (see `summary_store.compute_aggregates`) of the given parquet files, with the
+    normalized system names of `schema.SYSTEM_COLUMNS` if the groups include `system_name`.
+
+    Args:
+        data_files (list[str]): Parquet files of benchmark runs, no files give an empty frame.
+        group_columns (list): Columns of the groups, a subset of `GROUP_COLUMNS`.
+        backend (str): "pandas" merges the cached per-file sidecars, "duckdb" runs the aggregation as SQL over the
+            files. Defaults to `backend_from_environment()`.
+    """
+    backend = backend or backend_from_environment()
+    if not data_files:
+        return schema.add_system_columns(summary_store.combine_aggregates([], group_columns))
+    if backend == "duckdb":
+        return schema.add_system_columns(duckdb_backend.aggregate_files(data_files, group_columns))
+
+    aggregate_dfs = loader.map_files(summary_store.load_aggregates, data_files)
+    if len(aggregate_dfs) == 1 and list(group_columns) == GROUP_COLUMNS:
+        return schema.add_system_columns(aggregate_dfs[0])
+    return schema.add_system_columns(summary_store.combine_aggregates(aggregate_dfs, group_columns))
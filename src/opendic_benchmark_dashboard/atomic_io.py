@@ -0,0 +1,27 @@
+import contextlib
+import os
+import tempfile
+
+
+def write_atomic(path: str, write) -> None:
+    """
+    Writes `path` by calling `write(tmp_path)` on a temporary file next to it and renaming that into place.
+
+    Readers never see a partial file. The temporary file name is unique per writer, so the threads of one process
+    (Streamlit sessions, ingest workers) never write to the same file, and starts with a dot, so Arrow datasets
+    and the `*.parquet` / `*.arrow` listings ignore it. It is removed if `write` or the rename fails.
+
+    Args:
+        path (str): File to write, its folder must exist.
+        write (callable): Writes the content to the path it is given.
+    """
+    folder, file_name = os.path.split(path)
+    with tempfile.NamedTemporaryFile(dir=folder or ".", prefix=f".{file_name}.", suffix=".tmp", delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
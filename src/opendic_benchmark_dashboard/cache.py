@@ -0,0 +1,186 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from opendic_benchmark_dashboard import tracing
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    hash_seconds_saved: float = 0.0
+
+
+# Row count above which `st.cache_data` hashes a sample of a DataFrame, and the sample size
+_PANDAS_ROWS_LARGE = 50_000
+_PANDAS_SAMPLE_SIZE = 10_000
+
+# Rows actually hashed to estimate the hashing time of a frame, the time is scaled up to the rows Streamlit hashes
+_ESTIMATE_ROWS = 1_000
+
+# Number of hashing cost estimates kept in memory, as many as the serialized figures of `figures.build_figure`
+HASH_ESTIMATE_CACHE_SIZE = 256
+
+# Function name -> stats, shared by all sessions and reruns of the process
+cache_stats: dict[str, CacheStats] = {}
+# (function name, data_key) -> hashing cost estimate, measured once on the miss, least recently used first
+_hash_seconds: OrderedDict[tuple, float] = OrderedDict()
+_hash_lock = threading.Lock()
+_stats_lock = threading.Lock()
+# One flag per cached call in progress on this thread, set when the call computes (a miss)
+_calls = threading.local()
+
+
+def _estimate_hash_seconds(values) -> float:
+    """
+    Estimates how long `st.cache_data` would take to hash the DataFrame arguments on every call.
+
+    Only the first `_ESTIMATE_ROWS` rows of each frame are hashed, the time is extrapolated to the rows
+    Streamlit would hash (a sample of `_PANDAS_SAMPLE_SIZE` rows for large frames, without the time it takes
+    to draw that sample).
+    """
+    seconds = 0.0
+    for value in values:
+        if isinstance(value, pd.DataFrame) and len(value):
+            hashed_rows = _PANDAS_SAMPLE_SIZE if len(value) >= _PANDAS_ROWS_LARGE else len(value)
+            head = value.head(_ESTIMATE_ROWS)
+            start = time.perf_counter()
+            pd.util.hash_pandas_object(head).sum()
+            seconds += (time.perf_counter() - start) * hashed_rows / len(head)
+    return seconds
+
+
+def _hash_estimate(name: str, data_key) -> float | None:
+    """
+    The hashing cost estimate of a key, None if it was never measured or has been evicted.
+    """
+    with _hash_lock:
+        seconds = _hash_seconds.get((name, data_key))
+        if seconds is not None:
+            _hash_seconds.move_to_end((name, data_key))
+    return seconds
+
+
+def keyed_cache(func=None, *, ttl=None):
+    """
+    Caches like `st.cache_data`, but keyed on lightweight identifiers instead of frame contents.
+
+    Arguments whose name starts with an underscore (e.g. `_data_df`) are not hashed, so the decorated
+    function must also take a `data_key` (e.g. a `disk_cache.fingerprint` of the source files plus view parameters)
+    that identifies them. Hits, misses and the hashing time saved by the hits are recorded in `cache_stats`,
+    every call is a span of the active trace (see `tracing`).
+    """
+    if func is None:
+        return functools.partial(keyed_cache, ttl=ttl)
+
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    def compute(*args, data_key, **kwargs):
+        _calls.computing[-1] = True
+        # Measured once per key, later misses of the key (other arguments, expired entries) reuse it
+        if _hash_estimate(name, data_key) is None:
+            seconds = _estimate_hash_seconds([*args, *kwargs.values()])
+            with _hash_lock:
+                _hash_seconds[name, data_key] = seconds
+                while len(_hash_seconds) > HASH_ESTIMATE_CACHE_SIZE:
+                    _hash_seconds.popitem(last=False)
+        return func(*args, data_key=data_key, **kwargs)
+
+    cached = st.cache_data(ttl=ttl)(compute)
+
+    @functools.wraps(func)
+    def wrapper(*args, data_key, **kwargs):
+        return _call_cached(name, cached, args, dict(kwargs, data_key=data_key), _hash_estimate(name, data_key) or 0.0)
+
+    wrapper.clear = cached.clear
+    return wrapper
+
+
+def cache_data(func=None, *, ttl=None):
+    """
+    `st.cache_data` that records its hits and misses in `cache_stats` and as spans of the active trace.
+    """
+    if func is None:
+        return functools.partial(cache_data, ttl=ttl)
+
+    @functools.wraps(func)
+    def compute(*args, **kwargs):
+        _calls.computing[-1] = True
+        return func(*args, **kwargs)
+
+    cached = st.cache_data(ttl=ttl)(compute)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _call_cached(func.__qualname__, cached, args, kwargs)
+
+    wrapper.clear = cached.clear
+    return wrapper
+
+
+def shared_data(func=None, *, ttl=None):
+    """
+    Like `cache_data`, but a hit hands out the cached frame itself instead of unpickling a copy of it.
+
+    Callers get a shallow copy of the cached frame. With copy-on-write (always on from pandas 3, the dashboard
+    enables it on pandas 2), adding or overwriting columns or values copies the touched columns into the caller's
+    frame instead of writing to the shared ones. The cached frame is shared by all sessions and reruns without
+    copying its data.
+    """
+    if func is None:
+        return functools.partial(shared_data, ttl=ttl)
+
+    @functools.wraps(func)
+    def compute(*args, **kwargs):
+        _calls.computing[-1] = True
+        return func(*args, **kwargs)
+
+    cached = st.cache_resource(ttl=ttl)(compute)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = _call_cached(func.__qualname__, cached, args, kwargs)
+        return result.copy(deep=False) if isinstance(result, pd.DataFrame) else result
+
+    wrapper.clear = cached.clear
+    return wrapper
+
+
+def _call_cached(name: str, cached, args, kwargs, hash_seconds: float = 0.0):
+    """
+    Calls a cached function, counting the call as a miss if it computed and as a hit otherwise.
+    """
+    stats = cache_stats.setdefault(name, CacheStats())
+    # A stack, so the cached calls made while computing another one keep their own flag
+    computing = _calls.__dict__.setdefault("computing", [])
+    computing.append(False)
+    try:
+        with tracing.span(name):
+            result = cached(*args, **kwargs)
+            tracing.annotate(cache="miss" if computing[-1] else "hit")
+    finally:
+        computed = computing.pop()
+    with _stats_lock:
+        if computed:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+            stats.hash_seconds_saved += hash_seconds
+    return result
+
+
+def stats_frame() -> pd.DataFrame:
+    with _stats_lock:
+        return pd.DataFrame(
+            [
+                {"function": name, "hits": s.hits, "misses": s.misses, "hash_seconds_saved": s.hash_seconds_saved}
+                for name, s in cache_stats.items()
+            ]
+        )
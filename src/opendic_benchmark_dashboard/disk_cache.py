@@ -0,0 +1,133 @@
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from opendic_benchmark_dashboard import atomic_io
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "opendic-benchmark-dashboard")
+DEFAULT_MAX_BYTES = 2 * 1024**3
+
+
+def file_fingerprint(data_file: str) -> tuple[str, int, int]:
+    """
+    Identifies a file version by path, modification time and size, without reading it.
+    """
+    stat = os.stat(data_file)
+    return (os.path.abspath(data_file), stat.st_mtime_ns, stat.st_size)
+
+
+def fingerprint(data_files: list[str]) -> tuple:
+    return tuple(file_fingerprint(data_file) for data_file in sorted(data_files))
+
+
+class DiskCache:
+    """
+    Arrow IPC store of tables that survives restarts, evicting the least recently used entries once the
+    store grows beyond `max_bytes`. A `max_bytes` of 0 disables the cache.
+
+    Entries are written uncompressed and memory-mapped on read, so the tables are used zero-copy and
+    processes on the same host share one copy in the page cache.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def path(self, key_parts: tuple) -> str:
+        digest = hashlib.sha256(repr(key_parts).encode()).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{digest}.arrow")
+
+    def get(self, key_parts: tuple) -> pa.Table | None:
+        path = self.path(key_parts)
+        try:
+            table = feather.read_table(path, memory_map=True)
+            # The modification time doubles as the last access time for the LRU eviction
+            os.utime(path)
+        except (OSError, pa.ArrowInvalid):  # Missing, unreadable or partially evicted entries are misses
+            return None
+        return table
+
+    def put(self, key_parts: tuple, table: pa.Table) -> bool:
+        """
+        Stores `table` under `key_parts`.
+
+        Returns:
+            False if the table was not stored because it alone exceeds `max_bytes`, it would be evicted right away.
+        """
+        # Entries are uncompressed, so their size on disk is about the size of the table
+        if table.nbytes > self.max_bytes:
+            return False
+        path = self.path(key_parts)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Other processes never read a partial entry
+        atomic_io.write_atomic(path, lambda tmp_path: feather.write_feather(table, tmp_path, compression="uncompressed"))
+        self.evict()
+        return True
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the store fits into `max_bytes`.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".arrow"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:  # Replaced or evicted by another writer during the scan
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Evicted by another process
+                pass
+            total_bytes -= size
+
+    def get_or_compute(self, key_parts: tuple, compute) -> pa.Table:
+        """
+        Returns the cached table for `key_parts`, calling and storing `compute()` on a miss.
+
+        Args:
+            key_parts (tuple): Identifies the table, e.g. a `file_fingerprint` plus view parameters.
+            compute (callable): Builds the table.
+        """
+        if not self.enabled:
+            return compute()
+        table = self.get(key_parts)
+        if table is None:
+            table = compute()
+            try:
+                stored = self.put(key_parts, table)
+            except OSError:
+                # E.g. a read-only cache dir, the computed table is still valid
+                stored = False
+            if not stored:
+                return table
+            # Continue with the mapped entry, so the decoded copy can be freed
+            mapped = self.get(key_parts)
+            if mapped is not None:
+                table = mapped
+        return table
+
+
+def from_environment() -> DiskCache:
+    """
+    Configures the cache from `OPENDIC_DASHBOARD_CACHE_DIR` and `OPENDIC_DASHBOARD_CACHE_MAX_BYTES`.
+    """
+    return DiskCache(
+        cache_dir=os.environ.get("OPENDIC_DASHBOARD_CACHE_DIR", DEFAULT_CACHE_DIR),
+        max_bytes=int(os.environ.get("OPENDIC_DASHBOARD_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+    )
+
+
+default_cache = from_environment()
@@ -0,0 +1,216 @@
+import numpy as np
+import pandas as pd
+
+SERIES_COLUMNS = ["system_name", "ddl_command", "target_object"]
+
+
+def _chunk_segments(data_df: pd.DataFrame, chunk_size: int, columns: list[str]):
+    """
+    Orders the rows by `columns` and chunk, and finds where each (columns, chunk) segment starts.
+
+    Chunks are consecutive runs of `chunk_size` rows of `data_df`, like `index // chunk_size`. Rows with a missing
+    value in `columns` belong to no segment, like the groups `groupby` drops.
+
+    Returns:
+        order (np.ndarray): Positions of the rows in a segment, sorted by segment.
+        starts (np.ndarray): Offsets into `order` at which a segment starts.
+        chunk_ids (np.ndarray): Chunk of every row.
+    """
+    chunk_ids = np.arange(len(data_df)) // chunk_size
+    # Combine the sorted codes of every column and the chunk into one key, which orders the segments like
+    # `groupby(columns + ["chunk_id"])`
+    segment_keys = np.zeros(len(data_df), dtype=np.int64)
+    has_key = np.ones(len(data_df), dtype=bool)
+    for column in columns:
+        codes, uniques = pd.factorize(data_df[column], sort=True, use_na_sentinel=True)
+        has_key &= codes >= 0
+        segment_keys = segment_keys * len(uniques) + codes
+    segment_keys = segment_keys * (chunk_ids[-1] + 1) + chunk_ids
+    rows = np.flatnonzero(has_key)
+    # Summaries usually arrive ordered by their series already
+    if np.all(segment_keys[rows[1:]] >= segment_keys[rows[:-1]]):
+        order = rows
+    else:
+        order = rows[np.argsort(segment_keys[rows], kind="stable")]
+
+    sorted_keys = segment_keys[order]
+    new_segment = np.ones(len(order), dtype=bool)
+    new_segment[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    return order, np.flatnonzero(new_segment), chunk_ids
+
+
+def _segment_frame(data_df, columns, order, starts, chunk_ids, x_column) -> pd.DataFrame:
+    """
+    One row per segment with its `columns`, `chunk_id` and first `x_column` value.
+    """
+    first_rows = order[starts]
+    segment_df = data_df[columns].iloc[first_rows].reset_index(drop=True)
+    segment_df["chunk_id"] = chunk_ids[first_rows]
+    segment_df[x_column] = data_df[x_column].to_numpy()[first_rows]
+    return segment_df
+
+
+def chunked_mean(
+    data_df: pd.DataFrame,
+    chunk_size: int = 20,
+    columns=SERIES_COLUMNS,
+    value_column: str = "avg_runtime",
+    x_column: str = "granularity",
+) -> pd.DataFrame:
+    """
+    Averages `value_column` over chunks of `chunk_size` rows per `columns` group, taking the first `x_column`
+    value of each chunk. Computed with one batched `np.add.reduceat` instead of a per-group Python call.
+
+    Args:
+        data_df (pd.DataFrame): Frame to downsample, usually ordered by `columns` and `x_column`.
+        chunk_size (int): Number of consecutive rows averaged into one.
+        columns (list): Columns identifying a series.
+    """
+    if data_df.empty:
+        return pd.DataFrame(columns=[*columns, "chunk_id", value_column, x_column])
+    order, starts, chunk_ids = _chunk_segments(data_df, chunk_size, columns)
+    counts = np.diff(np.append(starts, len(order)))
+    values = data_df[value_column].to_numpy(dtype=np.float64)[order]
+
+    summary_df = _segment_frame(data_df, columns, order, starts, chunk_ids, x_column)
+    summary_df[value_column] = np.add.reduceat(values, starts) / counts
+    # Same column order as the former groupby implementation
+    return summary_df[[*columns, "chunk_id", value_column, x_column]]
+
+
+def chunked_envelope(
+    data_df: pd.DataFrame,
+    chunk_size: int = 20,
+    columns=SERIES_COLUMNS,
+    value_column: str = "avg_runtime",
+    x_column: str = "granularity",
+) -> pd.DataFrame:
+    """
+    Like `chunked_mean`, but also keeps the minimum and maximum of each chunk (`<value_column>_min`/`_max`),
+    so spikes that the mean would hide stay visible.
+    """
+    summary_df = chunked_mean(data_df, chunk_size, columns, value_column, x_column)
+    if data_df.empty:
+        return summary_df.assign(**{f"{value_column}_min": [], f"{value_column}_max": []})
+    order, starts, _ = _chunk_segments(data_df, chunk_size, columns)
+    values = data_df[value_column].to_numpy(dtype=np.float64)[order]
+    summary_df[f"{value_column}_min"] = np.minimum.reduceat(values, starts)
+    summary_df[f"{value_column}_max"] = np.maximum.reduceat(values, starts)
+    return summary_df
+
+
+def chunked_percentiles(
+    data_df: pd.DataFrame,
+    chunk_size: int = 20,
+    columns=SERIES_COLUMNS,
+    quantiles=(0.1, 0.5, 0.9),
+    value_column: str = "avg_runtime",
+    x_column: str = "granularity",
+) -> pd.DataFrame:
+    """
+    Computes percentile bands (`<value_column>_p10`, ...) over chunks of `chunk_size` rows per `columns` group.
+
+    All chunks are sorted at once and the quantiles interpolated linearly, like `np.quantile`.
+    """
+    band_columns = [f"{value_column}_p{round(q * 100)}" for q in quantiles]
+    if data_df.empty:
+        return pd.DataFrame(columns=[*columns, "chunk_id", x_column, *band_columns])
+    order, starts, chunk_ids = _chunk_segments(data_df, chunk_size, columns)
+    counts = np.diff(np.append(starts, len(order)))
+    segment_ids = np.repeat(np.arange(len(starts)), counts)
+    values = data_df[value_column].to_numpy(dtype=np.float64)[order]
+    # Sort the values within their segment, segments stay in place
+    values = values[np.lexsort([values, segment_ids])]
+
+    summary_df = _segment_frame(data_df, columns, order, starts, chunk_ids, x_column)
+    for quantile, band_column in zip(quantiles, band_columns, strict=True):
+        position = quantile * (counts - 1)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, counts - 1)
+        weight = position - lower
+        summary_df[band_column] = values[starts + lower] * (1 - weight) + values[starts + upper] * weight
+    return summary_df
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: picks `n_out` points of a series that preserve its visual shape.
+
+    Args:
+        x (np.ndarray): Ascending x values.
+        y (np.ndarray): y values.
+        n_out (int): Number of points to keep, at least 3.
+
+    Returns:
+        Positions of the kept points, always including the first and last point.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Bucket boundaries of the inner points, the first and last point are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    kept = np.empty(n_out, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # The next bucket's average is the third corner of the triangles
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        next_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous]) - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def lttb(
+    data_df: pd.DataFrame,
+    n_out: int | None = None,
+    columns=SERIES_COLUMNS,
+    value_column: str = "avg_runtime",
+    x_column: str = "granularity",
+    chunk_size: int | None = None,
+) -> pd.DataFrame:
+    """
+    Downsamples every `columns` series of `data_df` with `lttb_indices`.
+
+    Args:
+        n_out (int): Maximum number of points per series.
+        chunk_size (int): Alternatively, reduce every series by this factor.
+    """
+    x_values = data_df[x_column].to_numpy()
+    y_values = data_df[value_column].to_numpy()
+    kept = []
+    for positions in data_df.groupby(columns, sort=True, observed=True).indices.values():
+        positions = positions[np.argsort(x_values[positions], kind="stable")]
+        series_n_out = n_out if chunk_size is None else -(-len(positions) // chunk_size)
+        kept.append(positions[lttb_indices(x_values[positions], y_values[positions], series_n_out)])
+    if not kept:
+        return data_df.iloc[:0]
+    return data_df.iloc[np.concatenate(kept)].reset_index(drop=True)
+
+
+def downsample(data_df: pd.DataFrame, mode: str = "mean", chunk_size: int = 20, columns=SERIES_COLUMNS, **kwargs):
+    """
+    Downsamples a runtime summary with one of the supported modes.
+
+    Args:
+        mode (str): "mean", "envelope" (min/max), "percentiles" or "lttb".
+        chunk_size (int): Rows per chunk, for "lttb" the series are reduced by the same factor.
+    """
+    if mode == "mean":
+        return chunked_mean(data_df, chunk_size, columns, **kwargs)
+    if mode == "envelope":
+        return chunked_envelope(data_df, chunk_size, columns, **kwargs)
+    if mode == "percentiles":
+        return chunked_percentiles(data_df, chunk_size, columns, **kwargs)
+    if mode == "lttb":
+        return lttb(data_df, columns=columns, chunk_size=chunk_size, **kwargs)
+    raise ValueError(f"Unknown downsampling mode: {mode}")
@@ -0,0 +1,63 @@
+import threading
+
+import pandas as pd
+
+from opendic_benchmark_dashboard import schema
+from opendic_benchmark_dashboard.summary_store import GROUP_COLUMNS
+
+# Same aggregates as `summary_store.compute_aggregates`, computed by DuckDB straight from the parquet files
+AGGREGATES_SQL = """
+SELECT {columns},
+    avg(query_runtime) AS "mean",
+    sum(query_runtime) AS "sum",
+    count(query_runtime) AS "count",
+    min(query_runtime) AS "min",
+    max(query_runtime) AS "max",
+    stddev_samp(query_runtime) AS "std"
+FROM read_parquet($data_files)
+GROUP BY {columns}
+ORDER BY {columns}
+"""
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def connect():
+    """
+    Returns the process-wide in-memory DuckDB connection, importing DuckDB on first use.
+
+    DuckDB is an optional dependency (`pip install opendic-benchmark-dashboard[duckdb]`).
+    """
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            try:
+                import duckdb
+            except ImportError as e:
+                raise ImportError(
+                    "The duckdb backend needs DuckDB, install it with `pip install opendic-benchmark-dashboard[duckdb]`"
+                ) from e
+            _connection = duckdb.connect()
+    # Connections must not be shared between threads, cursors are independent connections to the same database
+    return _connection.cursor()
+
+
+def aggregate_files(data_files: list[str], group_columns=GROUP_COLUMNS) -> pd.DataFrame:
+    """
+    Aggregates `query_runtime` per group over the parquet files, without loading the runs into memory.
+
+    DuckDB scans the files in parallel and spills to disk when the groups do not fit into memory. The result
+    matches `summary_store.compute_aggregates` of the loaded runs, including its sorted group order.
+
+    Args:
+        data_files (list[str]): Parquet files to aggregate.
+        group_columns (list[str]): Columns to group by.
+    """
+    columns = ", ".join(f'"{column}"' for column in group_columns)
+    cursor = connect()
+    try:
+        aggregates_df = cursor.execute(AGGREGATES_SQL.format(columns=columns), {"data_files": list(data_files)}).df()
+    finally:
+        cursor.close()
+    return schema.apply_schema(aggregates_df)
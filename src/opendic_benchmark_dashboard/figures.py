@@ -0,0 +1,475 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.colors
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from opendic_benchmark_dashboard import tracing
+
+# Axis and legend labels shared by the runtime charts
+LABELS = {
+    "target_object": "Target Object",
+    "avg_runtime": "Avg. Runtime (s)",
+    "granularity": "Granularity",
+    "ddl_command": "DDL Command",
+    "system_name": "System Name",
+}
+
+# Legend above the plotting area, centered horizontally
+HORIZONTAL_LEGEND = dict(
+    orientation="h",
+    xanchor="center",  # anchor at center
+    yanchor="bottom",  # anchor on bottom of text
+    x=0.5,  # horizontal center
+    y=1.0,  # just above the plotting area
+)
+
+# Plotly config that enables SVG export via the modebar
+CONFIG = {
+    "toImageButtonOptions": {
+        "format": "svg",  # Default to svg format
+        "filename": "total_runtime_chart",
+        "scale": 1,
+    },
+    "displaylogo": False,
+    "modeBarButtonsToAdd": ["downloadSVG"],
+}
+
+# Shaded areas around the lines: column pairs (see `runtime_stats.runtime_statistics`), drawn from the widest
+BANDS = {
+    "none": [],
+    "ci": [("ci_low", "ci_high")],
+    "percentiles": [("p50", "p99"), ("p50", "p90")],
+}
+
+# Number of serialized figures kept in memory
+FIGURE_CACHE_SIZE = 256
+
+
+def add_bands(fig: go.Figure, plot_df: pd.DataFrame, trace_columns: list[str], band: str = "none") -> go.Figure:
+    """
+    Shades the `BANDS[band]` areas of every line in the color of the line, below the lines.
+
+    Args:
+        plot_df (pd.DataFrame): Data of the lines, including the band columns.
+        trace_columns (list[str]): Columns that split the data into lines, in Plotly Express order (color, dash, ...).
+    """
+    if not BANDS[band]:
+        return fig
+    colors = {trace.legendgroup: trace.line.color for trace in fig.data}
+    band_traces = []
+    for key, trace_df in plot_df.groupby(trace_columns, sort=False, observed=True):
+        # Plotly Express names the legend group of a line after its trace column values
+        legendgroup = ", ".join(str(value) for value in key)
+        if legendgroup not in colors:
+            continue
+        trace_df = trace_df.sort_values("granularity")
+        x = trace_df["granularity"].to_numpy()
+        for opacity, (low, high) in zip((0.12, 0.2), BANDS[band]):
+            # Points without a band (e.g. a single run has no confidence interval) collapse onto the line
+            low_values = trace_df[low].fillna(trace_df["avg_runtime"]).to_numpy()
+            high_values = trace_df[high].fillna(trace_df["avg_runtime"]).to_numpy()
+            band_traces.append(
+                go.Scatter(
+                    x=[*x, *x[::-1]],
+                    y=[*high_values, *low_values[::-1]],
+                    fill="toself",
+                    fillcolor=f"rgba{(*plotly.colors.hex_to_rgb(colors[legendgroup]), opacity)}",
+                    line=dict(width=0),
+                    hoverinfo="skip",
+                    showlegend=False,
+                    legendgroup=legendgroup,
+                )
+            )
+    fig.add_traces(band_traces)
+    # Draw the bands first, so the lines stay on top
+    fig.data = fig.data[len(fig.data) - len(band_traces) :] + fig.data[: len(fig.data) - len(band_traces)]
+    return fig
+
+
+def summary_figure(
+    plot_df: pd.DataFrame,
+    y_axis_type: str,
+    series_column: str = "ddl_command",
+    legend_title: str = "DDL Command",
+    legend_orientation: str = "h",
+    line_dash=None,
+    markers: bool = False,
+    symbol=None,
+    render_mode: str = "auto",
+    band: str = "none",
+) -> go.Figure:
+    """
+    Average runtime per granularity, one line per `series_column` (and `line_dash`/`symbol`) value.
+
+    Args:
+        plot_df (pd.DataFrame): Summary with `granularity` and `avg_runtime` columns.
+        y_axis_type (str): Type of y-axis scale. (Log, Linear)
+        render_mode (str): Plotly render mode, see `lod.render_mode`.
+        band (str): Shaded area around the lines, a key of `BANDS`.
+    """
+    fig = px.line(
+        plot_df,
+        x="granularity",
+        y="avg_runtime",
+        color=series_column,
+        line_dash=line_dash,
+        markers=markers,
+        symbol=symbol,
+        render_mode=render_mode,
+        labels=LABELS,
+        log_y=(y_axis_type == "Log"),  # Apply log scale to y-axis if selected
+    )
+    fig.update_layout(
+        legend_title=legend_title,
+        template="plotly_white",
+        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none"),
+        legend=HORIZONTAL_LEGEND if legend_orientation == "h" else None,
+    )
+    trace_columns = [column for column in (series_column, line_dash, symbol) if column is not None]
+    return add_bands(fig, plot_df, trace_columns, band)
+
+
+def percentiles_figure(percentiles_df: pd.DataFrame, y_axis_type: str, render_mode: str = "auto") -> go.Figure:
+    """
+    Runtime percentiles per granularity bucket, one line per system and percentile, one facet per DDL command.
+
+    Args:
+        percentiles_df (pd.DataFrame): Long frame with `granularity_bucket`, `percentile` and `runtime` columns.
+    """
+    fig = px.line(
+        percentiles_df,
+        x="granularity_bucket",
+        y="runtime",
+        color="system_name",
+        line_dash="percentile",
+        facet_col="ddl_command",
+        facet_col_wrap=2,
+        markers=True,
+        render_mode=render_mode,
+        labels={**LABELS, "granularity_bucket": "Granularity", "runtime": "Runtime (s)", "percentile": "Percentile"},
+        log_x=True,
+        log_y=(y_axis_type == "Log"),  # Apply log scale if selected
+    )
+    fig.update_layout(template="plotly_white", height=700, legend=dict(HORIZONTAL_LEGEND, y=1.05))
+    fig.update_yaxes(exponentformat="none")
+    # Facet titles read "DDL Command=ALTER" otherwise
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=")[-1]))
+    return fig
+
+
+def create_figure(plot_df: pd.DataFrame, y_axis_type: str, y_max=None, render_mode: str = "auto") -> go.Figure:
+    """
+    Average CREATE runtime per granularity, one line per target object.
+
+    Args:
+        y_max (float): Upper end of a linear y-axis, cuts off blatant outliers.
+    """
+    fig = px.line(
+        plot_df,
+        x="granularity",
+        y="avg_runtime",
+        color="target_object",
+        render_mode=render_mode,
+        labels=LABELS,
+        log_y=(y_axis_type == "Log"),  # Apply log scale if selected
+    )
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        legend_title="Object Type",
+        template="plotly_white",
+        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none")
+        if y_axis_type == "Log"
+        else dict(title="Avg. Runtime (s)", range=[0, y_max]),
+        legend=HORIZONTAL_LEGEND,
+    )
+    return fig
+
+
+def ddl_figure(plot_df: pd.DataFrame, y_axis_type: str, render_mode: str = "auto", band: str = "none") -> go.Figure:
+    """
+    Average runtime of one DDL command per granularity, one line per target object.
+    """
+    fig = px.line(
+        plot_df,
+        x="granularity",
+        y="avg_runtime",
+        color="target_object",
+        render_mode=render_mode,
+        labels=LABELS,
+        log_y=(y_axis_type == "Log"),  # Apply log scale if selected
+    )
+    fig.update_layout(legend=HORIZONTAL_LEGEND)
+    return add_bands(fig, plot_df, ["target_object"], band)
+
+
+def histogram_figure(
+    data_df: pd.DataFrame,
+    y_axis_type: str,
+    series_column: str = "ddl_command",
+    additional_column=None,
+    legend_title: str = "DDL Command",
+    marginal=None,
+    bar_mode: str = "group",
+) -> go.Figure:
+    """
+    Average runtime per granularity as grouped bars.
+
+    Args:
+        additional_column (str): Combined with `series_column` into the bar colors if given.
+    """
+    # Combine series_column and additional_column if provided
+    columns = {"granularity": data_df["granularity"].astype(str)}  # Make sure x-axis is string not int
+    if additional_column:
+        columns["combined_series"] = data_df[series_column].astype(str) + " | " + data_df[additional_column].astype(str)
+        color_column = "combined_series"
+    else:
+        color_column = series_column
+
+    fig = px.histogram(
+        data_df.assign(**columns),
+        x="granularity",
+        y="avg_runtime",
+        color=color_column,
+        labels=LABELS,
+        marginal=marginal,
+        log_y=(y_axis_type == "Log"),  # Apply log scale to y-axis if selected
+    )
+    fig.update_layout(
+        legend_title=legend_title,
+        template="plotly_white",
+        barmode=bar_mode,
+        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none"),
+        legend=dict(HORIZONTAL_LEGEND, font=dict(size=9)),
+    )
+    return fig
+
+
+def storage_figure(storage_df: pd.DataFrame, y_axis_type: str) -> go.Figure:
+    """
+    Storage usage per data system as bars.
+    """
+    fig = px.bar(
+        storage_df,
+        x="Database System",
+        y="Storage Usage (GB)",
+        color="Database System",
+        title="Storage Usage by Datasystem System (GB)",
+        log_y=(y_axis_type == "Log"),
+        labels={
+            "Database System": "Data System",
+            "Storage Usage (GB)": "Storage Usage (GB)",
+            "Metadatafiles Count": "Metadatafiles",
+            "Datafiles Count": "Datafiles",
+        },
+        hover_data={
+            "Database System": True,
+            "Storage Usage (GB)": True,
+            "Metadatafiles Count": True,
+            "Datafiles Count": True,
+        },
+    )
+    fig.update_layout(xaxis_title="System", yaxis_title="Storage Usage (GB)", legend=HORIZONTAL_LEGEND)
+    return fig
+
+
+def storage_growth_figure(storage_df: pd.DataFrame, y_axis_type: str) -> go.Figure:
+    """
+    Storage footprint per granularity step, one line per system, one facet each for the size and file counts.
+
+    Args:
+        storage_df (pd.DataFrame): Steps recorded by `storage_collector.collect_storage`.
+    """
+    measures = {
+        "Storage (GB)": (storage_df["data_bytes"] + storage_df["metadata_bytes"]) / 1000**3,
+        "Data Files": storage_df["data_files"],
+        "Metadata Files": storage_df["metadata_files"],
+    }
+    long_df = pd.concat(
+        [
+            storage_df[["system_name", "granularity"]].assign(measure=measure, value=values)
+            for measure, values in measures.items()
+        ],
+        ignore_index=True,
+    )
+    fig = px.line(
+        long_df,
+        x="granularity",
+        y="value",
+        color="system_name",
+        facet_col="measure",
+        markers=True,
+        labels={**LABELS, "value": "", "measure": "Measure"},
+        log_x=True,
+        log_y=(y_axis_type == "Log"),
+    )
+    fig.update_layout(template="plotly_white", legend=HORIZONTAL_LEGEND)
+    # Sizes and file counts have nothing in common
+    fig.update_yaxes(matches=None, showticklabels=True, exponentformat="none")
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=")[-1]))
+    return fig
+
+
+def total_runtime_figure(total_runtime_df: pd.DataFrame) -> go.Figure:
+    """
+    Total runtime per experiment/database as horizontal bars.
+    """
+    fig = px.bar(
+        total_runtime_df,
+        y="system_name",
+        x="total_runtime",
+        orientation="h",
+        labels={"system_name": "Database/Experiment", "total_runtime": "Total Runtime (hours)"},
+        color="system_name",  # Color bars by system name
+    )
+    fig.update_layout(
+        template="plotly_white",
+        showlegend=False,  # No need for legend as y-axis shows the system names
+        xaxis=dict(title="Total Runtime (hours)"),
+    )
+    return fig
+
+
+def scaling_figure(scaling_df: pd.DataFrame, target_granularity=None, slo_seconds=None) -> go.Figure:
+    """
+    Fitted scaling curves over the measured runtimes, one facet per DDL command.
+
+    Args:
+        scaling_df (pd.DataFrame): Curve samples (see `scaling.scaling_curves`) with `series` "fit" and measured
+            runtimes (see `scaling.measured_points`) with `series` "measured".
+        target_granularity (float): Marks the extrapolation target if given.
+        slo_seconds (float): Marks the latency SLO if given.
+    """
+    curves_df = scaling_df[scaling_df["series"] == "fit"]
+    points_df = scaling_df[scaling_df["series"] == "measured"]
+    facets = dict(
+        facet_col="ddl_command",
+        facet_col_wrap=2,
+        category_orders={
+            "ddl_command": sorted(scaling_df["ddl_command"].unique()),
+            "system_name": sorted(scaling_df["system_name"].unique()),
+        },
+        labels={**LABELS, "runtime": "Runtime (s)", "model": "Model"},
+        log_x=True,
+        log_y=True,
+    )
+    fig = px.line(curves_df, x="granularity", y="runtime", color="system_name", hover_data=["model"], **facets)
+    # Same facets and color order, so the measured points land on the axes and in the color of their curve
+    points = px.scatter(points_df, x="granularity", y="runtime", color="system_name", **facets)
+    fig.add_traces(list(points.update_traces(showlegend=False, marker=dict(size=7)).data))
+    if target_granularity is not None:
+        fig.add_vline(x=target_granularity, line_dash="dot", line_color="grey")
+    if slo_seconds is not None:
+        fig.add_hline(y=slo_seconds, line_dash="dash", line_color="red")
+    fig.update_layout(template="plotly_white", height=700, legend=dict(HORIZONTAL_LEGEND, y=1.05))
+    fig.update_yaxes(exponentformat="none")
+    fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split("=")[-1]))
+    return fig
+
+
+def regression_figure(report_df: pd.DataFrame, max_groups: int = 30) -> go.Figure:
+    """
+    Relative slowdown of the flagged groups of a regression report (see `regression.compare_aggregates`).
+    """
+    regressions_df = report_df[report_df["regression"]].head(max_groups)
+    key_columns = [column for column in ("system_name", "ddl_command", "target_object") if column in regressions_df]
+    labels = regressions_df[key_columns].astype(str).agg(" / ".join, axis=1)
+    fig = px.bar(
+        regressions_df.assign(group=labels + " @ " + regressions_df["granularity"].astype(str)),
+        y="group",
+        x="slowdown",
+        color="ddl_command",
+        orientation="h",
+        hover_data=["mean_baseline", "mean_candidate", "q_value"],
+        labels={**LABELS, "group": "Group", "slowdown": "Slowdown"},
+    )
+    fig.update_layout(
+        template="plotly_white",
+        xaxis=dict(tickformat=".0%"),
+        yaxis=dict(autorange="reversed"),  # Largest slowdown on top
+        legend=HORIZONTAL_LEGEND,
+        height=max(400, 22 * len(regressions_df)),
+    )
+    return fig
+
+
+def trace_figure(spans_df: pd.DataFrame) -> go.Figure:
+    """
+    Waterfall of the spans of a trace (see `tracing.spans_frame`), nested spans indented below their parent.
+    """
+    colors = {"hit": "#2ca02c", "miss": "#d62728"}
+    labels = [f"{'  ' * depth}{name}" for depth, name in zip(spans_df["depth"], spans_df["span"])]
+    fig = go.Figure(
+        go.Bar(
+            y=[f"{i:>3} {label}" for i, label in enumerate(labels)],
+            x=spans_df["duration_ms"],
+            base=spans_df["start_ms"],
+            orientation="h",
+            marker_color=[colors.get(cache, "#1f77b4") for cache in spans_df["cache"]],
+            customdata=spans_df[["cache", "memory_delta_mib"]].astype(object).fillna("-"),
+            hovertemplate="%{y}<br>%{x:.1f} ms<br>cache: %{customdata[0]}<br>memory: %{customdata[1]:.1f} MiB<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        template="plotly_white",
+        height=max(300, 18 * len(spans_df)),
+        margin=dict(l=0, r=0, t=10, b=0),
+        xaxis=dict(title="ms since rerun start"),
+        yaxis=dict(autorange="reversed", tickfont=dict(size=9)),  # First span on top
+    )
+    return fig
+
+
+BUILDERS = {
+    "summary": summary_figure,
+    "percentiles": percentiles_figure,
+    "create": create_figure,
+    "ddl": ddl_figure,
+    "histogram": histogram_figure,
+    "storage": storage_figure,
+    "storage_growth": storage_growth_figure,
+    "total_runtime": total_runtime_figure,
+    "regression": regression_figure,
+    "scaling": scaling_figure,
+}
+
+# (data_key, kind, options) -> figure JSON, shared by all sessions and reruns of the process
+_figure_json: OrderedDict[tuple, str] = OrderedDict()
+_figure_lock = threading.Lock()
+
+
+def build_figure(kind: str, data_df: pd.DataFrame, data_key=None, **options) -> go.Figure:
+    """
+    Builds the `kind` figure (see `BUILDERS`) of `data_df`, reusing the serialized figure of an earlier call.
+
+    Parsing the cached JSON is an order of magnitude faster than running Plotly Express again, so toggling
+    the y-axis scale or switching pages does not rebuild figures.
+
+    Args:
+        kind (str): Builder to use.
+        data_df (pd.DataFrame): Data of the figure.
+        data_key: Identifies `data_df` (e.g. a `disk_cache.fingerprint` plus view parameters), None disables caching.
+        options: Keyword arguments of the builder, part of the cache key.
+    """
+    with tracing.span(f"figure: {kind}"):
+        if data_key is None:
+            return BUILDERS[kind](data_df, **options)
+
+        key = (data_key, kind, tuple(sorted(options.items())))
+        with _figure_lock:
+            figure_json = _figure_json.get(key)
+            if figure_json is not None:
+                _figure_json.move_to_end(key)
+        tracing.annotate(cache="miss" if figure_json is None else "hit")
+        if figure_json is not None:
+            return pio.from_json(figure_json)
+
+        fig = BUILDERS[kind](data_df, **options)
+        with _figure_lock:
+            _figure_json[key] = fig.to_json()
+            while len(_figure_json) > FIGURE_CACHE_SIZE:
+                _figure_json.popitem(last=False)
+        return fig
@@ -0,0 +1,281 @@
+"""
+Appends new benchmark result files to a hive-partitioned dataset.
+
+Usage:
+    opendic-benchmark-ingest [data dirs ...] [--dataset-dir data/dataset]
+
+Every data dir is ingested as one category (its folder name). Files already listed in the manifest with the
+same content are skipped. The summaries of the new rows are merged into those of their partitions, only
+partitions that lost rows to a rewritten file are recomputed from their parts.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from opendic_benchmark_dashboard import atomic_io, loader, schema, sketch_store, summary_store
+
+DATASET_DIR = "data/dataset"
+DEFAULT_DATA_DIRS = ["data/standard", "data/opendic", "data/opendic_batch"]
+
+# Hive partition levels of the dataset, e.g. category=standard/system_name=sqlite/ddl_command=CREATE
+PARTITION_COLUMNS = ["category", "system_name", "ddl_command"]
+PARTITIONING = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive")
+
+# Files starting with an underscore are ignored by Arrow datasets, so they can live next to the parts
+MANIFEST_FILE = "_manifest.json"
+SUMMARY_FILE = "_aggregates.parquet"
+SKETCH_FILE = "_sketches.parquet"
+
+
+def read_manifest(dataset_dir: str = DATASET_DIR) -> dict:
+    """
+    Returns the manifest of ingested files, `{"files": {data_file: entry}}`.
+    """
+    try:
+        with open(os.path.join(dataset_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"files": {}}
+
+
+def write_manifest(manifest: dict, dataset_dir: str = DATASET_DIR) -> None:
+    def write(tmp_path: str) -> None:
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    # Write to a temporary file first so a crashed ingest never leaves a truncated manifest
+    atomic_io.write_atomic(os.path.join(dataset_dir, MANIFEST_FILE), write)
+
+
+def partition_dir_name(*values: str) -> str:
+    return os.path.join(*(f"{column}={value}" for column, value in zip(PARTITION_COLUMNS, values, strict=True)))
+
+
+def compute_summaries(data_df: pd.DataFrame, category: str) -> dict[str, tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Computes the aggregates (see `summary_store.compute_aggregates`) and runtime sketches
+    (see `sketch_store.compute_sketches`) of the runs of one category, per partition dir.
+    """
+    data_df = data_df.assign(category=category)
+    aggregates_df = summary_store.compute_aggregates(data_df, ["category", *summary_store.GROUP_COLUMNS])
+    sketch_df = sketch_store.compute_sketches(data_df).assign(category=category)
+    sketch_groups = sketch_df.groupby(PARTITION_COLUMNS[1:], observed=True)
+    return {
+        partition_dir_name(category, *key): (partition_df, sketch_groups.get_group(key))
+        for key, partition_df in aggregates_df.groupby(PARTITION_COLUMNS[1:], observed=True)
+    }
+
+
+def ingest_file(
+    data_file: str, category: str, manifest: dict, dataset_dir: str = DATASET_DIR
+) -> tuple[set[str], dict[str, tuple[pd.DataFrame, pd.DataFrame]]] | None:
+    """
+    Writes the runs of `data_file` into the dataset, replacing the parts of an earlier version of the file.
+
+    Args:
+        data_file (str): Parquet file of benchmark runs.
+        category (str): Value of the `category` partition level.
+        manifest (dict): Manifest as returned by `read_manifest`, updated in place.
+
+    Returns:
+        None if the file was ingested before. Otherwise the partition dirs that lost rows, whose summaries must
+        be rebuilt (see `update_summary`), and the summaries of the new rows per partition dir, which are merged
+        into the existing ones (see `merge_summary`).
+    """
+    data_file = os.path.normpath(data_file)
+    content_hash = summary_store.file_content_hash(data_file)
+    entry = manifest["files"].get(data_file)
+    if entry is not None and entry["content_hash"] == content_hash:
+        return None
+
+    stale = set()
+    stem = os.path.splitext(os.path.basename(data_file))[0]
+    parts = list(entry["parts"]) if entry is not None else []
+    # Parts of this version written by an interrupted run are already counted in their summaries
+    basename = glob.escape(f"{stem}-{content_hash}-")
+    parts += [
+        os.path.relpath(part, dataset_dir) for part in glob.glob(os.path.join(dataset_dir, "*", "*", "*", basename + "*"))
+    ]
+    for part in parts:
+        stale.add(os.path.dirname(part))
+        if os.path.exists(os.path.join(dataset_dir, part)):
+            os.remove(os.path.join(dataset_dir, part))
+
+    table = loader.read_benchmark_tables([data_file])[data_file]
+    summaries = compute_summaries(schema.to_frame([table.select([*summary_store.GROUP_COLUMNS, "query_runtime"])]), category)
+    # Partition values are written as plain strings into the directory names
+    for column in PARTITION_COLUMNS[1:]:
+        table = table.set_column(table.schema.get_field_index(column), column, pc.cast(table[column], pa.string()))
+    table = table.append_column("category", pa.array([category] * table.num_rows, pa.string()))
+
+    written = []
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"{stem}-{content_hash}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda written_file: written.append(os.path.relpath(written_file.path, dataset_dir)),
+    )
+    manifest["files"][data_file] = {
+        "category": category,
+        "content_hash": content_hash,
+        "rows": table.num_rows,
+        "parts": sorted(written),
+    }
+    return stale, summaries
+
+
+def write_summary(partition_dir: str, aggregates_df: pd.DataFrame, sketch_df: pd.DataFrame) -> None:
+    for file_name, summary_df in ((SUMMARY_FILE, aggregates_df), (SKETCH_FILE, sketch_df)):
+        atomic_io.write_atomic(
+            os.path.join(partition_dir, file_name),
+            lambda tmp_path, summary_df=summary_df: summary_df.to_parquet(tmp_path, engine="pyarrow", index=False),
+        )
+
+
+def merge_summary(
+    partition: str, summaries: list[tuple[pd.DataFrame, pd.DataFrame]], dataset_dir: str = DATASET_DIR
+) -> None:
+    """
+    Merges the aggregates and sketches of newly ingested runs into the summaries of one partition dir,
+    without reading its parts, so the cost does not grow with the history of the partition.
+
+    Args:
+        summaries (list): (aggregates, sketches) of the new runs, see `compute_summaries`.
+    """
+    partition_dir = os.path.join(dataset_dir, partition)
+    paths = [os.path.join(partition_dir, file_name) for file_name in (SUMMARY_FILE, SKETCH_FILE)]
+    if not all(os.path.exists(path) for path in paths):
+        # A partition without summaries may hold parts of earlier runs, only a rebuild covers them
+        update_summary(partition, dataset_dir)
+        return
+
+    aggregates_df = summary_store.combine_aggregates(
+        [pd.read_parquet(paths[0], engine="pyarrow"), *(aggregates_df for aggregates_df, _ in summaries)],
+        ["category", *summary_store.GROUP_COLUMNS],
+    )
+    sketch_df = sketch_store.merge_sketches(
+        [pd.read_parquet(paths[1], engine="pyarrow"), *(sketch_df for _, sketch_df in summaries)],
+        [*sketch_store.SKETCH_GROUP_COLUMNS, "category"],
+    )
+    write_summary(partition_dir, aggregates_df, sketch_df)
+
+
+def update_summary(partition: str, dataset_dir: str = DATASET_DIR) -> None:
+    """
+    Recomputes the aggregates (see `summary_store.compute_aggregates`) and runtime sketches
+    (see `sketch_store.compute_sketches`) of one partition dir from all of its parts.
+    """
+    partition_dir = os.path.join(dataset_dir, partition)
+    parts = glob.glob(os.path.join(partition_dir, "*.parquet"))
+    parts = [part for part in parts if not os.path.basename(part).startswith("_")]
+    if not parts:
+        shutil.rmtree(partition_dir, ignore_errors=True)
+        return
+
+    data_df = loader.read_benchmark_data(parts, columns=["target_object", "granularity", "query_runtime"])
+    values = dict(level.split("=", 1) for level in partition.split(os.sep))
+    data_df = data_df.assign(system_name=values["system_name"], ddl_command=values["ddl_command"])
+    aggregates_df, sketch_df = compute_summaries(data_df, values["category"])[partition]
+    write_summary(partition_dir, aggregates_df, sketch_df)
+
+
+def dataset_covers(data_files: list[str], dataset_dir: str = DATASET_DIR) -> bool:
+    """
+    Whether the dataset holds exactly `data_files`, none of them modified since the last ingest, so its
+    summaries can stand in for the per-file sidecars.
+    """
+    try:
+        manifest_mtime = os.stat(os.path.join(dataset_dir, MANIFEST_FILE)).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    data_files = {os.path.normpath(data_file) for data_file in data_files}
+    if data_files != set(read_manifest(dataset_dir)["files"]):
+        return False
+    return all(os.stat(data_file).st_mtime_ns <= manifest_mtime for data_file in data_files)
+
+
+def load_summaries(dataset_dir: str = DATASET_DIR, category: str | None = None) -> pd.DataFrame:
+    """
+    Returns the precomputed aggregates of all partitions, or of one `category`.
+    """
+    pattern = os.path.join(dataset_dir, f"category={category or '*'}", "*", "*", SUMMARY_FILE)
+    summary_files = sorted(glob.glob(pattern))
+    if not summary_files:
+        return pd.DataFrame(columns=["category", *summary_store.GROUP_COLUMNS, *summary_store.AGGREGATE_COLUMNS])
+    summaries_df = pd.concat([pd.read_parquet(path, engine="pyarrow") for path in summary_files], ignore_index=True)
+    return schema.apply_schema(summaries_df)
+
+
+def load_sketches(dataset_dir: str = DATASET_DIR, category: str | None = None) -> pd.DataFrame:
+    """
+    Returns the runtime sketches of all partitions, or of one `category`.
+
+    Partitions are merged with `sketch_store.merge_sketches` and read with `sketch_store.sketch_percentiles`.
+    """
+    pattern = os.path.join(dataset_dir, f"category={category or '*'}", "*", "*", SKETCH_FILE)
+    sketch_files = sorted(glob.glob(pattern))
+    if not sketch_files:
+        return pd.DataFrame(columns=[*sketch_store.SKETCH_GROUP_COLUMNS, "bucket", "count", "category"])
+    sketches_df = pd.concat([pd.read_parquet(path, engine="pyarrow") for path in sketch_files], ignore_index=True)
+    return schema.apply_schema(sketches_df)
+
+
+def ingest(data_dirs: list[str], dataset_dir: str = DATASET_DIR) -> dict:
+    """
+    Ingests every parquet file of `data_dirs` that is new or changed since the last run.
+
+    Returns:
+        A report with the ingested files, the number of skipped files and the updated partitions.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    manifest = read_manifest(dataset_dir)
+    ingested, skipped, stale, pending = [], 0, set(), {}
+    for data_dir in data_dirs:
+        category = os.path.basename(os.path.normpath(data_dir))
+        for data_file in sorted(glob.glob(os.path.join(data_dir, "*.parquet"))):
+            result = ingest_file(data_file, category, manifest, dataset_dir)
+            if result is None:
+                skipped += 1
+                continue
+            ingested.append(data_file)
+            stale |= result[0]
+            for partition, summary in result[1].items():
+                pending.setdefault(partition, []).append(summary)
+
+    # Partitions that only received rows merge the new summaries, those that lost rows are rebuilt
+    affected = stale | set(pending)
+    for partition in sorted(affected):
+        if partition in stale:
+            update_summary(partition, dataset_dir)
+        else:
+            merge_summary(partition, pending[partition], dataset_dir)
+    # The manifest is written last, so an interrupted run ingests its files again
+    write_manifest(manifest, dataset_dir)
+    return {"ingested": ingested, "skipped": skipped, "partitions": sorted(affected)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dirs", nargs="*", default=DEFAULT_DATA_DIRS)
+    parser.add_argument("--dataset-dir", default=DATASET_DIR)
+    args = parser.parse_args()
+
+    report = ingest(args.data_dirs, args.dataset_dir)
+    print(f"Ingested {len(report['ingested'])} file(s), skipped {report['skipped']} unchanged")
+    for partition in report["partitions"]:
+        print(f"  updated {partition}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from opendic_benchmark_dashboard import disk_cache, schema, tracing
+
+# Columns needed by the runtime plots, everything else is only shown in the raw data views
+RUNTIME_COLUMNS = ["system_name", "ddl_command", "target_object", "granularity", "query_runtime"]
+
+# Files decoded concurrently, the parquet decoders release the GIL
+READ_WORKERS = int(os.environ.get("OPENDIC_DASHBOARD_READ_WORKERS", min(8, os.cpu_count() or 1)))
+
+# Rows per record batch when streaming files, bounds the memory of a streaming pass
+STREAM_BATCH_SIZE = 64 * 1024
+
+# Upper bound of the decoded size of one page of raw runs, pages of wide rows (long query texts) get fewer rows
+MAX_PAGE_BYTES = 2 * 1024**2
+
+
+@dataclass
+class Page:
+    """
+    One page of raw runs, see `read_page`.
+
+    Attributes:
+        page (int): Zero-based page number, clamped to the last page.
+        page_size (int): Rows per page, lowered to stay under the payload cap.
+        total_rows (int): Runs matching the filters, across all pages.
+    """
+
+    table: pa.Table
+    page: int
+    page_size: int
+    total_rows: int
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total_rows // self.page_size))
+
+
+def build_filter(ddl_commands=None, system_names=None) -> ds.Expression | None:
+    """
+    Builds the row filter for the given predicates, `None` means no filtering on that column.
+    """
+    expression = None
+    for column, values in (("ddl_command", ddl_commands), ("system_name", system_names)):
+        if values is None:
+            continue
+        predicate = ds.field(column).isin(list(values))
+        expression = predicate if expression is None else expression & predicate
+    return expression
+
+
+def map_files(func, data_files: list[str], max_workers: int = READ_WORKERS) -> list:
+    """
+    Calls `func` on every file with a bounded thread pool, returning the results in the order of `data_files`.
+    """
+    if max_workers <= 1 or len(data_files) <= 1:
+        return [func(data_file) for data_file in data_files]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(data_files))) as executor:
+        return list(executor.map(func, data_files))
+
+
+def normalized_table(
+    data_file: str,
+    table_cache: disk_cache.DiskCache = disk_cache.default_cache,
+    columns=None,
+    expression: ds.Expression | None = None,
+) -> pa.Table:
+    """
+    Returns the `columns` and `expression` rows of `data_file`, decoded from parquet once and memory-mapped
+    from `table_cache` afterwards.
+
+    Every projection and filter is its own entry, decoded with the columns and predicates pushed down to the
+    parquet reader.
+    """
+    key_parts = (
+        "normalized_table",
+        disk_cache.file_fingerprint(data_file),
+        None if columns is None else tuple(columns),
+        None if expression is None else str(expression),
+    )
+    return table_cache.get_or_compute(
+        key_parts,
+        lambda: ds.dataset(data_file, format=schema.PARQUET_FORMAT).to_table(columns=columns, filter=expression),
+    )
+
+
+@tracing.traced(name="parquet decode")
+def read_benchmark_tables(
+    data_files: list[str],
+    columns=None,
+    ddl_commands=None,
+    system_names=None,
+    table_cache: disk_cache.DiskCache = disk_cache.default_cache,
+    max_workers: int = READ_WORKERS,
+    timings: dict[str, float] | None = None,
+) -> dict[str, pa.Table]:
+    """
+    Reads benchmark parquet files as Arrow tables, only materializing the requested columns and rows.
+
+    The columns and predicates are pushed down to the parquet reader, so row groups whose statistics exclude
+    the filtered values are never decoded. The decoded table of every file, projection and filter is kept as an
+    uncompressed Arrow IPC file of `table_cache` (see `normalized_table`), later reads memory-map it, so processes
+    skip the parquet decoding and share the pages. Label columns are decoded dictionary encoded (see `schema`).
+
+    Args:
+        data_files (list[str]): Parquet files to read.
+        columns (list[str]): Columns to read, all columns if None.
+        ddl_commands (list[str]): Only read rows with these DDL commands.
+        system_names (list[str]): Only read rows of these systems.
+        table_cache (DiskCache): Persistent cache of the decoded tables.
+        max_workers (int): Number of files decoded concurrently.
+        timings (dict): Filled with the seconds spent loading each file, if given.
+
+    Returns:
+        The table of each file, in the order of `data_files`.
+    """
+    expression = build_filter(ddl_commands, system_names)
+
+    def load_table(data_file: str) -> tuple[pa.Table, float]:
+        start = time.perf_counter()
+        table = normalized_table(data_file, table_cache, columns, expression)
+        return table, time.perf_counter() - start
+
+    results = map_files(load_table, data_files, max_workers)
+    if timings is not None:
+        timings.update((data_file, seconds) for data_file, (_, seconds) in zip(data_files, results, strict=True))
+    return {data_file: table for data_file, (table, _) in zip(data_files, results, strict=True)}
+
+
+def read_benchmark_data(
+    data_files: list[str], columns=None, ddl_commands=None, system_names=None, float32_runtime: bool = False
+) -> pd.DataFrame:
+    """
+    Reads benchmark parquet files as one frame with the compact benchmark-run schema.
+
+    See `read_benchmark_tables` for the arguments.
+    """
+    tables = read_benchmark_tables(data_files, columns, ddl_commands, system_names)
+    return schema.to_frame(list(tables.values()), float32_runtime)
+
+
+def iter_benchmark_batches(
+    data_files: list[str], columns=None, ddl_commands=None, system_names=None, batch_size: int = STREAM_BATCH_SIZE
+):
+    """
+    Streams benchmark parquet files as record batches, so only one batch per file is decoded at a time.
+
+    See `read_benchmark_tables` for the arguments.
+
+    Yields:
+        (data_file, pa.RecordBatch) pairs, file by file.
+    """
+    expression = build_filter(ddl_commands, system_names)
+    for data_file in data_files:
+        dataset = ds.dataset(data_file, format=schema.PARQUET_FORMAT)
+        for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+            yield data_file, batch
+
+
+def column_names(data_files: list[str]) -> list[str]:
+    """
+    Columns of the benchmark parquet files, read from the parquet footers.
+    """
+    return ds.dataset(data_files, format=schema.PARQUET_FORMAT).schema.names
+
+
+def read_page(
+    data_files: list[str],
+    ddl_commands=None,
+    system_names=None,
+    sort_by: str | None = None,
+    descending: bool = False,
+    page: int = 0,
+    page_size: int = 100,
+    max_bytes: int = MAX_PAGE_BYTES,
+    table_cache: disk_cache.DiskCache = disk_cache.default_cache,
+) -> Page:
+    """
+    Reads one page of the runs of `data_files`, filtered and sorted before the page is cut.
+
+    The filters are applied by `read_benchmark_tables`, so only the matching rows are decoded (or mapped from
+    the cache), and only the rows of the page are gathered. Sorting orders the row indices, not the rows.
+
+    Args:
+        data_files (list[str]): Parquet files to page through, concatenated in this order.
+        ddl_commands (list[str]): Only read rows with these DDL commands.
+        system_names (list[str]): Only read rows of these systems.
+        sort_by (str): Column to sort by, file order if None.
+        descending (bool): Sort in descending order.
+        page (int): Zero-based page number.
+        page_size (int): Requested rows per page.
+        max_bytes (int): Payload cap, `page_size` is lowered so a page of rows of average width stays under it.
+    """
+    tables = read_benchmark_tables(data_files, ddl_commands=ddl_commands, system_names=system_names, table_cache=table_cache)
+    # Query texts are large strings in some files, plain strings in others
+    table = pa.concat_tables(list(tables.values()), promote_options="permissive")
+
+    if table.num_rows and table.nbytes:
+        page_size = max(1, min(page_size, max_bytes * table.num_rows // table.nbytes))
+    page = min(max(page, 0), max(0, table.num_rows - 1) // page_size)
+    offset = page * page_size
+
+    if sort_by is None:
+        page_table = table.slice(offset, page_size)
+    else:
+        keys = table[sort_by]
+        if pa.types.is_dictionary(keys.type):
+            # Arrow only sorts dictionary columns of arrays, not of tables
+            keys = keys.cast(keys.type.value_type)
+        order = "descending" if descending else "ascending"
+        indices = pc.sort_indices(pa.table({sort_by: keys}), sort_keys=[(sort_by, order)])
+        page_table = table.take(indices.slice(offset, page_size))
+    return Page(page_table, page, page_size, table.num_rows)
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import downsampling
+
+# Width of a full-width chart on a typical laptop screen
+DEFAULT_WIDTH_PX = 1200
+
+# Points per figure above which the SVG renderer gets sluggish and WebGL is used instead
+WEBGL_POINT_THRESHOLD = 10_000
+
+# Granularity steps the visible range can be narrowed to, the benchmarks scale in powers of ten
+GRANULARITY_STEPS = [0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Share of the points of a trace that may be spent on outliers, the strongest outliers are kept first
+OUTLIER_SHARE = 0.1
+
+
+@dataclass(frozen=True)
+class LevelOfDetail:
+    """
+    Level of detail of the line charts.
+
+    Attributes:
+        x_range (tuple): Visible granularity range, points outside it are not sent to the browser. An upper end at
+            the last of `GRANULARITY_STEPS` keeps all larger granularities, None shows everything.
+        max_points (int): Maximum number of points per trace.
+        method (str): "lttb" or "minmax" (keeps the minimum and maximum of every bucket).
+        keep_outliers (bool): Always keep points that are outliers of their trace.
+        render_mode (str): "auto" (WebGL above `webgl_threshold` points), "svg" or "webgl".
+        webgl_threshold (int): Points per figure above which "auto" renders with WebGL.
+    """
+
+    x_range: tuple[int, int] | None = None
+    max_points: int = 2 * DEFAULT_WIDTH_PX
+    method: str = "lttb"
+    keep_outliers: bool = True
+    render_mode: str = "auto"
+    webgl_threshold: int = WEBGL_POINT_THRESHOLD
+
+
+def max_points_for_width(width_px: int = DEFAULT_WIDTH_PX, points_per_pixel: int = 2) -> int:
+    """
+    More points per trace than pixels (times two for the min/max of a pixel column) are not visible.
+    """
+    return width_px * points_per_pixel
+
+
+def render_mode(n_points: int, level_of_detail: LevelOfDetail) -> str:
+    """
+    Picks the Plotly render mode for a figure with `n_points` points.
+
+    WebGL traces stay responsive with many points, SVG traces export as vector graphics.
+    """
+    if level_of_detail.render_mode != "auto":
+        return level_of_detail.render_mode
+    return "webgl" if n_points > level_of_detail.webgl_threshold else "svg"
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Splits a series into `(n_out - 2) / 2` buckets and keeps the minimum and maximum of each, plus the first
+    and last position, so at most `n_out` positions are returned.
+    """
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    if n_out < 4:
+        return np.array([0, n - 1][:max(n_out, 0)], dtype=np.intp)
+    n_buckets = (n_out - 2) // 2
+    starts = np.arange(n_buckets) * n // n_buckets
+    bucket_ids = np.repeat(np.arange(n_buckets), np.diff(np.append(starts, n)))
+    # Positions ordered by bucket, then by value, so each bucket starts with its minimum and ends with its maximum
+    order = np.lexsort([y, bucket_ids])
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+def outlier_indices(y: np.ndarray, threshold: float = 3.5, limit: int | None = None) -> np.ndarray:
+    """
+    Positions whose modified z-score (based on the median absolute deviation) exceeds `threshold`.
+
+    Args:
+        limit (int): Keep only the `limit` positions with the largest scores, growing or heavy-tailed series
+            can have many points above the threshold.
+    """
+    median = np.nanmedian(y)
+    mad = np.nanmedian(np.abs(y - median))
+    if not mad > 0:
+        return np.array([], dtype=np.intp)
+    scores = 0.6745 * np.abs(y - median) / mad
+    outliers = np.flatnonzero(scores > threshold)
+    if limit is not None and len(outliers) > limit:
+        outliers = np.sort(outliers[np.argpartition(scores[outliers], -limit)[-limit:]]) if limit > 0 else outliers[:0]
+    return outliers
+
+
+def reduce_traces(
+    data_df: pd.DataFrame,
+    trace_columns: list[str],
+    level_of_detail: LevelOfDetail,
+    x_column: str = "granularity",
+    y_column: str = "avg_runtime",
+) -> pd.DataFrame:
+    """
+    Reduces every trace of a line chart to the points visible at `level_of_detail`.
+
+    Args:
+        data_df (pd.DataFrame): Data of the chart.
+        trace_columns (list[str]): Columns that split the data into traces (color, line dash, ...).
+        level_of_detail (LevelOfDetail): Visible range and point budget.
+    """
+    if level_of_detail.x_range is not None:
+        low, high = level_of_detail.x_range
+        visible = data_df[x_column] >= low
+        # The last step stands for "and above", larger granularities stay visible
+        if high < GRANULARITY_STEPS[-1]:
+            visible &= data_df[x_column] <= high
+        data_df = data_df[visible]
+
+    max_points = level_of_detail.max_points
+    x_values = data_df[x_column].to_numpy()
+    y_values = data_df[y_column].to_numpy(dtype=np.float64)
+    if trace_columns:
+        traces = data_df.groupby(trace_columns, sort=False, observed=True).indices.values()
+    else:
+        traces = [np.arange(len(data_df))]
+
+    kept = []
+    for positions in traces:
+        if len(positions) <= max_points:
+            kept.append(positions)
+            continue
+        positions = positions[np.argsort(x_values[positions], kind="stable")]
+        x, y = x_values[positions], y_values[positions]
+        outliers = np.array([], dtype=np.intp)
+        if level_of_detail.keep_outliers:
+            # The outliers come out of the point budget, so a trace never exceeds `max_points`
+            outliers = outlier_indices(y, limit=int(max_points * OUTLIER_SHARE))
+        n_out = max_points - len(outliers)
+        if level_of_detail.method == "minmax":
+            indices = minmax_indices(y, n_out)
+        else:
+            indices = downsampling.lttb_indices(x, y, n_out)
+        kept.append(positions[np.union1d(indices, outliers)])
+
+    if not kept:
+        return data_df
+    # Keep the original row order, which is the drawing order of the lines
+    return data_df.iloc[np.sort(np.concatenate(kept))]
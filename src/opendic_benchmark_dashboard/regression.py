@@ -0,0 +1,249 @@
+"""
+Flags significant runtime regressions between a baseline and a candidate benchmark run.
+
+Usage:
+    opendic-benchmark-regression --baseline BASELINE [...] --candidate CANDIDATE [...] [--json report.json]
+
+Runs are parquet files or data dirs. The runtimes of every (system_name, ddl_command, target_object,
+granularity) group are compared with Welch's t-test on the per-group aggregates, so the runs are never
+held in memory. The exit code is 1 if any group regressed, 0 otherwise.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import aggregation, summary_store
+from opendic_benchmark_dashboard.summary_store import GROUP_COLUMNS
+
+# False discovery rate of the flagged groups (Benjamini-Hochberg)
+ALPHA = 0.05
+
+# Significant slowdowns smaller than this relative change are not reported, e.g. 0.05 for 5 %
+MIN_SLOWDOWN = 0.05
+
+# Continued fraction of the incomplete beta function, see `incomplete_beta`
+_MAX_ITERATIONS = 300
+_EPSILON = 1e-12
+_TINY = 1e-300
+
+_log_gamma = np.vectorize(math.lgamma, otypes=[np.float64])
+
+
+def _beta_continued_fraction(a: np.ndarray, b: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # Modified Lentz evaluation, converges quickly for x < (a + 1) / (a + b + 2)
+    c = np.ones_like(x)
+    d = 1 - (a + b) * x / (a + 1)
+    d = 1 / np.where(np.abs(d) < _TINY, _TINY, d)
+    h = d
+    for m in range(1, _MAX_ITERATIONS + 1):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1 + numerator * d
+            d = 1 / np.where(np.abs(d) < _TINY, _TINY, d)
+            c = 1 + numerator / c
+            c = np.where(np.abs(c) < _TINY, _TINY, c)
+            delta = c * d
+            h = h * delta
+        if np.all(np.abs(delta - 1) < _EPSILON):
+            break
+    return h
+
+
+def incomplete_beta(a, b, x) -> np.ndarray:
+    """
+    Regularized incomplete beta function I_x(a, b), elementwise.
+    """
+    a, b, x = np.broadcast_arrays(*(np.asarray(value, dtype=np.float64) for value in (a, b, x)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        front = np.exp(_log_gamma(a + b) - _log_gamma(a) - _log_gamma(b) + a * np.log(x) + b * np.log1p(-x))
+        # The continued fraction converges on the side of the mean, the other side follows from symmetry
+        direct = x < (a + 1) / (a + b + 2)
+        result = np.where(
+            direct,
+            front * _beta_continued_fraction(a, b, x) / a,
+            1 - front * _beta_continued_fraction(b, a, 1 - x) / b,
+        )
+    result = np.where(x <= 0, 0.0, np.where(x >= 1, 1.0, result))
+    return np.where(np.isnan(x), np.nan, result)
+
+
+def t_survival(t, df) -> np.ndarray:
+    """
+    P(T > t) of Student's t distribution with `df` degrees of freedom, elementwise.
+    """
+    t, df = np.broadcast_arrays(np.asarray(t, dtype=np.float64), np.asarray(df, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = 0.5 * incomplete_beta(df / 2, 0.5, df / (df + t**2))
+    return np.where(t > 0, tail, 1 - tail)
+
+
+def benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """
+    Adjusted p-values (q-values) that control the false discovery rate, NaN p-values stay NaN.
+    """
+    q_values = np.full(len(p_values), np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    if not len(tested):
+        return q_values
+    order = tested[np.argsort(p_values[tested])]
+    scaled = p_values[order] * len(order) / np.arange(1, len(order) + 1)
+    # Running minimum from the largest p-value down keeps the q-values monotone
+    q_values[order] = np.minimum.accumulate(scaled[::-1])[::-1].clip(max=1)
+    return q_values
+
+
+def compare_aggregates(
+    baseline_df: pd.DataFrame,
+    candidate_df: pd.DataFrame,
+    group_columns=GROUP_COLUMNS,
+    alpha: float = ALPHA,
+    min_slowdown: float = MIN_SLOWDOWN,
+) -> pd.DataFrame:
+    """
+    Tests every group present in both runs for a slowdown of the candidate and ranks the result.
+
+    Welch's t-test (one-sided) is computed from the count, mean and stddev of the groups, the p-values are
+    adjusted for the number of groups with Benjamini-Hochberg.
+
+    Args:
+        baseline_df (pd.DataFrame): Aggregates of the baseline run (see `summary_store.compute_aggregates`).
+        candidate_df (pd.DataFrame): Aggregates of the candidate run.
+        group_columns (list): Groups to compare, coarser groups than those of the aggregates are merged first.
+        alpha (float): False discovery rate of the flagged groups.
+        min_slowdown (float): Smallest relative slowdown of the mean to flag.
+
+    Returns:
+        One row per group with the means, counts, `slowdown` (relative change of the mean), `t`, `df`,
+        `p_value`, `q_value` and `regression`, regressions first and the largest slowdowns on top.
+    """
+    sides = [
+        summary_store.combine_aggregates([aggregates_df], group_columns)[[*group_columns, "mean", "std", "count"]]
+        for aggregates_df in (baseline_df, candidate_df)
+    ]
+    report_df = sides[0].merge(sides[1], on=group_columns, suffixes=("_baseline", "_candidate"))
+
+    n_baseline = report_df["count_baseline"].to_numpy(dtype=np.float64)
+    n_candidate = report_df["count_candidate"].to_numpy(dtype=np.float64)
+    mean_baseline = report_df["mean_baseline"].to_numpy(dtype=np.float64)
+    mean_candidate = report_df["mean_candidate"].to_numpy(dtype=np.float64)
+    # Standard error of each mean, NaN for single runs which cannot be tested
+    var_baseline = report_df["std_baseline"].to_numpy(dtype=np.float64) ** 2 / n_baseline
+    var_candidate = report_df["std_candidate"].to_numpy(dtype=np.float64) ** 2 / n_candidate
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        difference = mean_candidate - mean_baseline
+        standard_error = np.sqrt(var_baseline + var_candidate)
+        t = difference / standard_error
+        # Welch-Satterthwaite degrees of freedom
+        df = (var_baseline + var_candidate) ** 2 / (
+            var_baseline**2 / (n_baseline - 1) + var_candidate**2 / (n_candidate - 1)
+        )
+        p_value = t_survival(t, df)
+        slowdown = difference / mean_baseline
+    # Runs without any variance differ for certain if their means do
+    constant = standard_error == 0
+    p_value = np.where(constant, np.where(difference > 0, 0.0, 1.0), p_value)
+    q_value = benjamini_hochberg(p_value)
+
+    report_df = report_df.assign(
+        slowdown=slowdown,
+        t=t,
+        df=np.where(constant, np.nan, df),
+        p_value=p_value,
+        q_value=q_value,
+        regression=(q_value < alpha) & (slowdown >= min_slowdown),
+    )
+    return report_df.sort_values(["regression", "slowdown"], ascending=[False, False], ignore_index=True)
+
+
+def summarize_regressions(report_df: pd.DataFrame, key_columns=None) -> pd.DataFrame:
+    """
+    Condenses a report of `compare_aggregates` to one row per `key_columns` group, most regressed first.
+
+    Args:
+        key_columns (list): Defaults to the group columns of the report without `granularity`.
+    """
+    if key_columns is None:
+        key_columns = [column for column in GROUP_COLUMNS[:3] if column in report_df]
+    summary_df = report_df.groupby(key_columns, as_index=False, observed=True).agg(
+        granularities=("slowdown", "size"),
+        regressions=("regression", "sum"),
+        worst_slowdown=("slowdown", "max"),
+        median_slowdown=("slowdown", "median"),
+    )
+    return summary_df.sort_values(["regressions", "worst_slowdown"], ascending=[False, False], ignore_index=True)
+
+
+def report_json(report_df: pd.DataFrame, **metadata) -> dict:
+    """
+    Machine-readable report: the `metadata`, the number of compared groups and the flagged groups.
+    """
+    regressions_df = report_df[report_df["regression"]]
+    return {
+        **metadata,
+        "compared": len(report_df),
+        "regressions": len(regressions_df),
+        "groups": json.loads(regressions_df.to_json(orient="records")),
+    }
+
+
+def expand_data_files(paths: list[str]) -> list[str]:
+    """
+    Replaces the data dirs among `paths` with their parquet files.
+    """
+    data_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            data_files.extend(sorted(glob.glob(os.path.join(path, "*.parquet"))))
+        else:
+            data_files.append(path)
+    return data_files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", nargs="+", required=True)
+    parser.add_argument("--candidate", nargs="+", required=True)
+    parser.add_argument("--alpha", type=float, default=ALPHA)
+    parser.add_argument("--min-slowdown", type=float, default=MIN_SLOWDOWN)
+    parser.add_argument("--ignore-system", action="store_true", help="Compare the runs across system names")
+    parser.add_argument("--json", help="Write the report to this file instead of stdout")
+    args = parser.parse_args()
+
+    group_columns = GROUP_COLUMNS[1:] if args.ignore_system else GROUP_COLUMNS
+    baseline_files = expand_data_files(args.baseline)
+    candidate_files = expand_data_files(args.candidate)
+    report_df = compare_aggregates(
+        aggregation.load_file_aggregates(baseline_files),
+        aggregation.load_file_aggregates(candidate_files),
+        group_columns=group_columns,
+        alpha=args.alpha,
+        min_slowdown=args.min_slowdown,
+    )
+    report = report_json(
+        report_df,
+        baseline=baseline_files,
+        candidate=candidate_files,
+        alpha=args.alpha,
+        min_slowdown=args.min_slowdown,
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Compared {report['compared']} group(s), {report['regressions']} regression(s)")
+    else:
+        print(json.dumps(report, indent=2))
+    raise SystemExit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Renders the dashboard overviews headlessly into static files.
+
+Usage:
+    opendic-benchmark-dashboard [data dirs ...] [--output-dir report] [--workers N]
+
+Every data dir is one category (its folder name), rendered in its own worker process. The output dir gets
+an HTML page per category plus an index, SVG copies of the figures if kaleido is installed, the runtime
+aggregates and scaling fits as parquet, and `report.json` with the wall-clock time and peak memory.
+"""
+
+import argparse
+import glob
+import html
+import importlib.util
+import json
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from opendic_benchmark_dashboard import (
+    aggregation,
+    downsampling,
+    figures,
+    ingest,
+    loader,
+    lod,
+    scaling,
+    sketch_store,
+    summary_store,
+)
+
+OUTPUT_DIR = "report"
+
+# Aggregation of the DDL commands per category, like the dashboards: batched CREATE runtimes are summed
+AGG_SPECS = {"opendic_batch": {"CREATE": "sum"}}
+
+# Target granularity and latency SLO of the scaling fits
+TARGET_GRANULARITY = 1_000_000
+SLO_SECONDS = 1.0
+
+# Groups of the merged runtime sketches, see `sketch_store.merge_sketches`
+PERCENTILE_GROUP_COLUMNS = ["system_name", "ddl_command", "granularity_bucket"]
+
+
+def svg_export_available() -> bool:
+    # Plotly needs kaleido to render static images
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def write_html(named_figures: dict, path: str, title: str, include_plotlyjs="cdn") -> None:
+    """
+    Writes the figures one below the other into a standalone HTML page.
+    """
+    sections = []
+    for i, (name, fig) in enumerate(named_figures.items()):
+        # plotly.js is only needed once per page
+        body = fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs if i == 0 else False, config=figures.CONFIG)
+        sections.append(f"<h2>{html.escape(name)}</h2>\n{body}")
+    with open(path, "w") as f:
+        f.write(
+            f"<!DOCTYPE html>\n<html>\n<head><meta charset='utf-8'><title>{html.escape(title)}</title></head>\n"
+            f"<body>\n<h1>{html.escape(title)}</h1>\n" + "\n".join(sections) + "\n</body>\n</html>\n"
+        )
+
+
+def write_svgs(named_figures: dict, output_dir: str, prefix: str) -> None:
+    for name, fig in named_figures.items():
+        slug = "_".join(name.lower().replace("/", " ").split())
+        fig.write_image(os.path.join(output_dir, f"{prefix}_{slug}.svg"), format="svg")
+
+
+def category_figures(category: str, data_files: list[str]) -> tuple[dict, pd.DataFrame, pd.DataFrame]:
+    """
+    Computes the overview of one category: its aggregates, scaling fits and figures.
+
+    Returns:
+        The figures by title, the runtime aggregates and the scaling report.
+    """
+    aggregates_df = aggregation.load_file_aggregates(data_files)
+    summaries = aggregation.split_by_command(aggregates_df, agg_spec=AGG_SPECS.get(category))
+    level_of_detail = lod.LevelOfDetail()
+
+    named_figures = {}
+    for ddl_command, summary_df in summaries.items():
+        if ddl_command == "CREATE" and category not in AGG_SPECS:
+            # Every CREATE granularity is measured, average chunks of them like the overview pages
+            summary_df = downsampling.chunked_mean(summary_df, chunk_size=20)
+        plot_df = lod.reduce_traces(summary_df, ["system_name", "target_object"], level_of_detail)
+        named_figures[f"Average Runtime for {ddl_command} Commands"] = figures.summary_figure(
+            plot_df,
+            "Log",
+            series_column="system_name",
+            legend_title=f"{ddl_command}: System, Object Type",
+            line_dash="target_object",
+            render_mode=lod.render_mode(len(plot_df), level_of_detail),
+        )
+
+    sketch_df = sketch_store.merge_sketches(
+        loader.map_files(sketch_store.load_sketches, data_files), group_columns=PERCENTILE_GROUP_COLUMNS
+    )
+    percentiles_df = sketch_store.sketch_percentiles(sketch_df, PERCENTILE_GROUP_COLUMNS).melt(
+        id_vars=PERCENTILE_GROUP_COLUMNS, value_vars=["p50", "p90", "p99"], var_name="percentile", value_name="runtime"
+    )
+    named_figures["Runtime Percentiles"] = figures.percentiles_figure(percentiles_df, "Log")
+
+    scaling_df = scaling.scaling_report(aggregates_df, TARGET_GRANULARITY, SLO_SECONDS)
+    curves_df = pd.concat(
+        [
+            scaling.scaling_curves(scaling_df, 1, TARGET_GRANULARITY).assign(series="fit"),
+            scaling.measured_points(aggregates_df).assign(series="measured"),
+        ],
+        ignore_index=True,
+    )
+    named_figures["Runtime Scaling by Granularity"] = figures.scaling_figure(curves_df, TARGET_GRANULARITY, SLO_SECONDS)
+    return named_figures, aggregates_df, scaling_df
+
+
+def category_files(data_dir: str) -> list[str]:
+    # A missing data dir has no files
+    return sorted(glob.glob(os.path.join(data_dir, "*.parquet")))
+
+
+def render_category(data_dir: str, output_dir: str, svg: bool, include_plotlyjs="cdn") -> dict:
+    """
+    Renders the page of one category, runs in a worker process.
+
+    Returns:
+        The timing of the category and its aggregates and scaling report, tagged with the category.
+    """
+    start = time.perf_counter()
+    category = os.path.basename(os.path.normpath(data_dir))
+    data_files = category_files(data_dir)
+    named_figures, aggregates_df, scaling_df = category_figures(category, data_files)
+    compute_seconds = time.perf_counter() - start
+
+    write_html(named_figures, os.path.join(output_dir, f"{category}.html"), f"{category} overview", include_plotlyjs)
+    if svg:
+        write_svgs(named_figures, output_dir, category)
+    return {
+        "category": category,
+        "files": len(data_files),
+        "groups": len(aggregates_df),
+        "figures": len(named_figures),
+        "compute_seconds": round(compute_seconds, 3),
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mib": round(peak_rss_mib(resource.RUSAGE_SELF), 1),
+        "aggregates": aggregates_df.assign(category=category),
+        "scaling": scaling_df.assign(category=category),
+    }
+
+
+def peak_rss_mib(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def total_runtime(aggregates_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Total runtime in hours per system, summed over the average runtime of every unique operation (like the TLDR page).
+    """
+    avg_runtime_df = summary_store.combine_aggregates([aggregates_df], ["system_label", "ddl_command", "granularity"])
+    total_runtime_df = (
+        avg_runtime_df.groupby("system_label", as_index=False, observed=True)
+        .agg(total_runtime=("mean", "sum"))
+        .rename(columns={"system_label": "system_name"})
+    )
+    total_runtime_df["total_runtime"] = (total_runtime_df["total_runtime"] / 60 / 60).round(4)
+    return total_runtime_df.sort_values("total_runtime", ignore_index=True)
+
+
+def generate_report(
+    data_dirs: list[str], output_dir: str = OUTPUT_DIR, workers: int | None = None, include_plotlyjs="cdn"
+) -> dict:
+    """
+    Renders every category in parallel and writes the index, parquet summaries and `report.json`.
+
+    Args:
+        data_dirs (list[str]): One data dir per category, dirs that are missing or hold no parquet files are
+            skipped and listed as `skipped` in the report.
+        workers (int): Worker processes, defaults to one per category. 1 renders in this process.
+        include_plotlyjs: How the pages load plotly.js, see `plotly.io.to_html` ("cdn" or True to embed it).
+    """
+    start = time.perf_counter()
+    skipped = [data_dir for data_dir in data_dirs if not category_files(data_dir)]
+    data_dirs = [data_dir for data_dir in data_dirs if data_dir not in skipped]
+    if not data_dirs:
+        raise FileNotFoundError(f"No parquet files in {', '.join(skipped) or 'any data dir'}")
+    os.makedirs(output_dir, exist_ok=True)
+    svg = svg_export_available()
+    workers = workers or len(data_dirs)
+    arguments = [(data_dir, output_dir, svg, include_plotlyjs) for data_dir in data_dirs]
+    if workers == 1:
+        results = [render_category(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_category, *zip(*arguments)))
+
+    aggregates_df = pd.concat([result.pop("aggregates") for result in results], ignore_index=True)
+    scaling_df = pd.concat([result.pop("scaling") for result in results], ignore_index=True)
+    aggregates_df.to_parquet(os.path.join(output_dir, "summary.parquet"), engine="pyarrow", index=False)
+    scaling_df.to_parquet(os.path.join(output_dir, "scaling.parquet"), engine="pyarrow", index=False)
+
+    index_figures = {"Total Runtime by Experiment/Database": figures.total_runtime_figure(total_runtime(aggregates_df))}
+    write_html(index_figures, os.path.join(output_dir, "index.html"), "OpenDIC Benchmark Report", include_plotlyjs)
+    if svg:
+        write_svgs(index_figures, output_dir, "index")
+
+    report = {
+        "categories": results,
+        "skipped": skipped,
+        "svg": svg,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        # The largest worker is reported separately, ru_maxrss of the children is the maximum, not the sum
+        "peak_rss_mib": round(peak_rss_mib(resource.RUSAGE_SELF), 1),
+        "peak_worker_rss_mib": round(peak_rss_mib(resource.RUSAGE_CHILDREN), 1),
+    }
+    with open(os.path.join(output_dir, "report.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("data_dirs", nargs="*", default=ingest.DEFAULT_DATA_DIRS)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--embed-plotlyjs", action="store_true", help="Embed plotly.js instead of loading it from a CDN")
+    args = parser.parse_args()
+
+    try:
+        report = generate_report(args.data_dirs, args.output_dir, args.workers, True if args.embed_plotlyjs else "cdn")
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    for data_dir in report["skipped"]:
+        print(f"  {data_dir}: skipped, no parquet files")
+    for category in report["categories"]:
+        print(
+            f"  {category['category']}: {category['files']} file(s), {category['figures']} figure(s) "
+            f"in {category['seconds']:.2f}s, peak {category['peak_rss_mib']:.0f} MiB"
+        )
+    print(
+        f"Wrote {args.output_dir}/ in {report['wall_seconds']:.2f}s, peak memory {report['peak_rss_mib']:.0f} MiB "
+        f"(largest worker {report['peak_worker_rss_mib']:.0f} MiB)"
+    )
+    if not report["svg"]:
+        print("  SVG export skipped, install kaleido to write SVG figures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import tracing
+from opendic_benchmark_dashboard.summary_store import GROUP_COLUMNS
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Groups with more runs than this get sketched quantiles and a normal confidence interval
+SKETCH_THRESHOLD = 10_000
+
+# Relative error of the sketched quantiles, e.g. 0.01 reports 1.00 s as anything between 0.99 s and 1.01 s
+RELATIVE_ACCURACY = 0.01
+
+# Runtimes are positive, smaller values (e.g. 0) share the bucket of this value
+MIN_SKETCH_VALUE = 1e-9
+
+
+def quantile_columns(quantiles=QUANTILES) -> list[str]:
+    return [f"p{round(q * 100)}" for q in quantiles]
+
+
+def sketch_buckets(values: np.ndarray, relative_accuracy: float = RELATIVE_ACCURACY) -> np.ndarray:
+    """
+    Logarithmic bucket of every value (DDSketch): a bucket spans values within `relative_accuracy` of its center.
+    """
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    return np.ceil(np.log(np.maximum(values, MIN_SKETCH_VALUE)) / np.log(gamma)).astype(np.int64)
+
+
+def bucket_values(buckets: np.ndarray, relative_accuracy: float = RELATIVE_ACCURACY) -> np.ndarray:
+    """
+    Center of each bucket of `sketch_buckets`, within `relative_accuracy` of every value in the bucket.
+    """
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    return 2 * gamma ** buckets.astype(np.float64) / (gamma + 1)
+
+
+def sketch_quantiles(
+    group_codes: np.ndarray,
+    buckets: np.ndarray,
+    bucket_counts: np.ndarray,
+    n_groups: int,
+    quantiles=QUANTILES,
+    relative_accuracy: float = RELATIVE_ACCURACY,
+) -> np.ndarray:
+    """
+    Quantiles of many sketches at once, as the bucket of the nearest lower rank (like `interpolation="lower"`).
+
+    Args:
+        group_codes (np.ndarray): Group (0 to `n_groups - 1`) of every bucket row.
+        buckets (np.ndarray): Bucket of every row, see `sketch_buckets`.
+        bucket_counts (np.ndarray): Number of values in every bucket row.
+        n_groups (int): Number of groups.
+
+    Returns:
+        Array of shape (n_groups, len(quantiles)), NaN for groups without values.
+    """
+    order = np.lexsort([buckets, group_codes])
+    group_codes, buckets, bucket_counts = group_codes[order], buckets[order], bucket_counts[order]
+    cumulative = np.cumsum(bucket_counts)
+    group_counts = np.bincount(group_codes, weights=bucket_counts, minlength=n_groups)
+    group_offsets = np.cumsum(group_counts) - group_counts
+
+    result = np.full((n_groups, len(quantiles)), np.nan)
+    has_values = group_counts > 0
+    for i, quantile in enumerate(quantiles):
+        # The first bucket whose cumulative count exceeds the rank holds the quantile
+        ranks = group_offsets + quantile * (group_counts - 1)
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side="right"), len(cumulative) - 1)
+        result[has_values, i] = bucket_values(buckets[positions[has_values]], relative_accuracy)
+    return result
+
+
+def bootstrap_mean_ci(
+    values: np.ndarray,
+    counts: np.ndarray,
+    starts: np.ndarray,
+    confidence: float = 0.95,
+    n_resamples: int = 200,
+    selected: np.ndarray | None = None,
+    seed: int = 0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap interval of the mean of every group slice `values[start:start + count]`.
+
+    Each resample draws the runs of all selected groups at once, so the cost is one vectorized pass per resample.
+    Groups with a single run or that are not `selected` get NaN.
+    """
+    ci_low = np.full(len(counts), np.nan)
+    ci_high = np.full(len(counts), np.nan)
+    selected = (counts > 1) if selected is None else selected & (counts > 1)
+    if not selected.any():
+        return ci_low, ci_high
+
+    group_counts = counts[selected]
+    row_starts = np.repeat(starts[selected], group_counts)
+    row_counts = np.repeat(group_counts, group_counts)
+    local_starts = np.cumsum(group_counts) - group_counts
+    rng = np.random.default_rng(seed)
+
+    resampled_means = np.empty((n_resamples, len(group_counts)))
+    for i in range(n_resamples):
+        positions = row_starts + (rng.random(len(row_starts)) * row_counts).astype(np.intp)
+        resampled_means[i] = np.add.reduceat(values[positions], local_starts) / group_counts
+
+    alpha = (1 - confidence) / 2
+    ci_low[selected], ci_high[selected] = np.quantile(resampled_means, [alpha, 1 - alpha], axis=0)
+    return ci_low, ci_high
+
+
+@tracing.traced(name="runtime statistics")
+def runtime_statistics(
+    data_df: pd.DataFrame,
+    group_columns=GROUP_COLUMNS,
+    quantiles=QUANTILES,
+    confidence: float = 0.95,
+    n_resamples: int = 200,
+    sketch_threshold: int = SKETCH_THRESHOLD,
+    value_column: str = "query_runtime",
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Computes count, mean, stddev, quantiles and a bootstrap confidence interval of the mean per group.
+
+    All groups are handled at once. The runs of groups with up to `sketch_threshold` runs are sorted into one array
+    for exact quantiles and the bootstrap. Larger groups are never sorted: their runs are counted into log-bucket
+    sketches for the quantiles, and they get a normal confidence interval.
+
+    Args:
+        data_df (pd.DataFrame): Raw benchmark runs.
+        group_columns (list): Columns to group by.
+        quantiles (tuple): Quantiles to compute, reported as `p50`, `p90`, ...
+        confidence (float): Coverage of the confidence interval (`ci_low`, `ci_high`), NaN for single runs.
+        n_resamples (int): Bootstrap resamples.
+    """
+    columns = quantile_columns(quantiles)
+    if data_df.empty:
+        return pd.DataFrame(columns=[*group_columns, "count", "mean", "std", *columns, "ci_low", "ci_high"])
+
+    grouped = data_df.groupby(group_columns, observed=True, sort=True)
+    stats_df = grouped.size().reset_index(name="count")
+    # Runs with a missing group key belong to no group (NaN or -1 depending on the pandas version), like in `groupby`
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    values = data_df[value_column].to_numpy(dtype=np.float64)
+    has_key = codes >= 0
+    if not has_key.all():
+        codes, values = codes[has_key], values[has_key]
+    counts = stats_df["count"].to_numpy()
+
+    mean = np.bincount(codes, weights=values, minlength=len(counts)) / counts
+    m2 = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=len(counts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.where(counts > 1, np.sqrt(m2 / (counts - 1)), np.nan)
+    stats_df["mean"] = mean
+    stats_df["std"] = std
+
+    large = counts > sketch_threshold
+    small_rows = ~large[codes]
+    # Only the small groups are sorted, by group and then by value, so each of them is a sorted slice
+    order = np.lexsort([values[small_rows], codes[small_rows]])
+    small_values = values[small_rows][order]
+    small_counts = counts[~large]
+    small_starts = np.cumsum(small_counts) - small_counts
+
+    # Exact quantiles, interpolated linearly like `np.quantile`
+    for quantile, column in zip(quantiles, columns, strict=True):
+        position = quantile * (small_counts - 1)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.minimum(lower + 1, small_counts - 1)
+        weight = position - lower
+        stats_df[column] = np.nan
+        stats_df.loc[~large, column] = (
+            small_values[small_starts + lower] * (1 - weight) + small_values[small_starts + upper] * weight
+        )
+
+    if large.any():
+        # The runs of the large groups are only counted into buckets, a group has more runs than distinct buckets
+        large_groups = np.flatnonzero(large)
+        buckets = sketch_buckets(values[~small_rows])
+        min_bucket = buckets.min()
+        n_buckets = buckets.max() - min_bucket + 1
+        local_codes = np.searchsorted(large_groups, codes[~small_rows])
+        bucket_counts = np.bincount(
+            local_codes * n_buckets + (buckets - min_bucket), minlength=len(large_groups) * n_buckets
+        )
+        nonempty = np.flatnonzero(bucket_counts)
+        sketched = sketch_quantiles(
+            large_groups[nonempty // n_buckets],
+            nonempty % n_buckets + min_bucket,
+            bucket_counts[nonempty],
+            len(counts),
+            quantiles,
+        )
+        stats_df.loc[large, columns] = sketched[large]
+
+    ci_low, ci_high = np.full(len(counts), np.nan), np.full(len(counts), np.nan)
+    ci_low[~large], ci_high[~large] = bootstrap_mean_ci(
+        small_values, small_counts, small_starts, confidence, n_resamples, seed=seed
+    )
+    # Large groups: the mean is approximately normal
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * std / np.sqrt(counts)
+    stats_df["ci_low"] = np.where(large, mean - half_width, ci_low)
+    stats_df["ci_high"] = np.where(large, mean + half_width, ci_high)
+    return stats_df
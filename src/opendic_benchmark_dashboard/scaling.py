@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import sketch_store, summary_store
+
+# Growth models runtime = a + b * f(granularity), granularities below 1 count as 1 so the logarithms stay finite
+MODELS = {
+    "constant": None,
+    "log": lambda n: np.log(np.maximum(n, 1)),
+    "linear": lambda n: n,
+    "n log n": lambda n: n * np.log(np.maximum(n, 1)),
+    "quadratic": lambda n: n**2,
+}
+
+# Groups of the fitted curves, the runtimes of their target objects are merged
+FIT_COLUMNS = ["system_name", "ddl_command"]
+
+# Granularities searched for the crossing of a latency SLO, see `slo_granularity`
+MAX_GRANULARITY = 1e15
+
+
+def fit_models(aggregates_df: pd.DataFrame, group_columns=FIT_COLUMNS) -> pd.DataFrame:
+    """
+    Fits every model of `MODELS` to the mean runtime per granularity of each group by least squares.
+
+    All groups are fitted at once from per-group sums, so a group with 100k granularities costs the same
+    Python overhead as one with five.
+
+    Args:
+        aggregates_df (pd.DataFrame): Runtime aggregates with a `granularity` column (see `summary_store`).
+        group_columns (list): Groups of the fitted curves.
+
+    Returns:
+        One row per group and model with the coefficients `a` and `b`, the number of points `n`, the residual
+        sum of squares `rss` and the small-sample corrected Akaike information criterion `aicc`.
+    """
+    points_df = summary_store.combine_aggregates([aggregates_df], [*group_columns, "granularity"])
+    grouped = points_df.groupby(group_columns, observed=True, sort=True)
+    groups_df = grouped.size().reset_index(name="n")
+    codes = grouped.ngroup().to_numpy()
+    n_groups = len(groups_df)
+    x = points_df["granularity"].to_numpy(dtype=np.float64)
+    y = points_df["mean"].to_numpy(dtype=np.float64)
+
+    def group_sum(values):
+        return np.bincount(codes, weights=values, minlength=n_groups)
+
+    n = groups_df["n"].to_numpy(dtype=np.float64)
+    sum_y = group_sum(y)
+    fit_dfs = []
+    for model, basis in MODELS.items():
+        if basis is None:
+            a, b, k = sum_y / n, np.zeros(n_groups), 1
+        else:
+            f = basis(x)
+            sum_f, sum_ff, sum_fy = group_sum(f), group_sum(f * f), group_sum(f * y)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                b = (n * sum_fy - sum_f * sum_y) / (n * sum_ff - sum_f**2)
+            # A single granularity cannot tell the models apart
+            b = np.where(np.isfinite(b), b, 0.0)
+            a, k = (sum_y - b * sum_f) / n, 2
+        prediction = a[codes] + (b[codes] * basis(x) if basis is not None else 0)
+        rss = group_sum((y - prediction) ** 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # AIC of a least-squares fit with Gaussian errors, corrected for the few granularities per group
+            aicc = n * np.log(np.maximum(rss, 1e-300) / n) + 2 * k + 2 * k * (k + 1) / (n - k - 1)
+        fit_dfs.append(groups_df.assign(model=model, a=a, b=b, rss=rss, aicc=np.where(n - k - 1 > 0, aicc, np.inf)))
+    return pd.concat(fit_dfs, ignore_index=True)
+
+
+def best_fits(fits_df: pd.DataFrame, group_columns=FIT_COLUMNS) -> pd.DataFrame:
+    """
+    Picks the model with the lowest AICc of every group from `fit_models`, the simpler model on ties.
+    """
+    ranked_df = fits_df.assign(order=fits_df["model"].map({model: i for i, model in enumerate(MODELS)}))
+    ranked_df = ranked_df.sort_values([*group_columns, "aicc", "order"], kind="stable")
+    return ranked_df.drop_duplicates(group_columns).drop(columns="order").reset_index(drop=True)
+
+
+def predict(fits_df: pd.DataFrame, granularity) -> np.ndarray:
+    """
+    Runtime of every fit at `granularity` (a scalar, or one granularity per fit).
+    """
+    granularity = np.broadcast_to(np.asarray(granularity, dtype=np.float64), len(fits_df))
+    runtime = fits_df["a"].to_numpy(dtype=np.float64).copy()
+    for model, basis in MODELS.items():
+        selected = (fits_df["model"] == model).to_numpy()
+        if basis is not None and selected.any():
+            runtime[selected] += fits_df["b"].to_numpy()[selected] * basis(granularity[selected])
+    return runtime
+
+
+def slo_granularity(fits_df: pd.DataFrame, slo_seconds: float, iterations: int = 100) -> np.ndarray:
+    """
+    Smallest granularity at which every fit exceeds `slo_seconds`, NaN if it never does.
+
+    All models are increasing for a positive `b`, so the crossing is found by a bisection on the log scale.
+    """
+    low = np.zeros(len(fits_df))
+    high = np.full(len(fits_df), np.log10(MAX_GRANULARITY))
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        above = predict(fits_df, 10**middle) > slo_seconds
+        high = np.where(above, middle, high)
+        low = np.where(above, low, middle)
+    reaches = (fits_df["b"].to_numpy() > 0) & (predict(fits_df, MAX_GRANULARITY) > slo_seconds)
+    return np.where(predict(fits_df, 1) > slo_seconds, 1.0, np.where(reaches, 10**high, np.nan))
+
+
+def scaling_report(
+    aggregates_df: pd.DataFrame, target_granularity: float, slo_seconds: float, group_columns=FIT_COLUMNS
+) -> pd.DataFrame:
+    """
+    Best model per group with its coefficients, the extrapolated runtime at `target_granularity` and the
+    granularity at which the runtime crosses `slo_seconds`.
+    """
+    report_df = best_fits(fit_models(aggregates_df, group_columns), group_columns)
+    return report_df.assign(
+        predicted_runtime=predict(report_df, target_granularity),
+        slo_granularity=slo_granularity(report_df, slo_seconds),
+    )
+
+
+def scaling_curves(report_df: pd.DataFrame, min_granularity: float, max_granularity: float, points: int = 60):
+    """
+    Samples the fitted curve of every group of `scaling_report` on a logarithmic granularity grid.
+    """
+    grid = np.geomspace(max(min_granularity, 1), max(max_granularity, min_granularity, 1), points)
+    curves_df = report_df.loc[report_df.index.repeat(points)].reset_index(drop=True)
+    granularity = np.tile(grid, len(report_df))
+    return curves_df.assign(granularity=granularity, runtime=predict(curves_df, granularity))
+
+
+def measured_points(aggregates_df: pd.DataFrame, group_columns=FIT_COLUMNS) -> pd.DataFrame:
+    """
+    Mean runtime per group and logarithmic granularity bucket (see `sketch_store.granularity_buckets`).
+
+    Bucketing keeps commands measured at every granularity (e.g. CREATE) to a few points per decade.
+    """
+    bucketed_df = aggregates_df.assign(granularity=sketch_store.granularity_buckets(aggregates_df["granularity"]))
+    points_df = summary_store.combine_aggregates([bucketed_df], [*group_columns, "granularity"])
+    return points_df.rename(columns={"mean": "runtime"})
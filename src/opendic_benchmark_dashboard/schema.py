@@ -0,0 +1,119 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# High-repetition string columns, kept dictionary encoded (pandas categoricals)
+LABEL_COLUMNS = ["system_name", "ddl_command", "target_object"]
+
+# Non-negative integer columns, downcast to the smallest unsigned type that fits
+COUNTER_COLUMNS = ["granularity", "repetition_nr"]
+
+# Columns derived from `system_name` (see `add_system_columns`), each drops the suffixes of some system variants
+SYSTEM_COLUMNS = {
+    # Polaris catalogs are labeled with their storage only
+    "system_label": ("_polaris",),
+    # Batched and cached variants are merged into the system they run on
+    "system_family": ("_batch", "_cache"),
+}
+
+# Parquet format that decodes the label columns straight into dictionary arrays
+PARQUET_FORMAT = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=LABEL_COLUMNS))
+
+
+def apply_schema(data_df: pd.DataFrame, float32_runtime: bool = False) -> pd.DataFrame:
+    """
+    Returns `data_df` converted to the compact benchmark-run schema, without modifying it.
+
+    Args:
+        data_df (pd.DataFrame): Benchmark runs.
+        float32_runtime (bool): Store `query_runtime` as float32 instead of float64.
+    """
+    return data_df.assign(**compact_columns(data_df, float32_runtime))
+
+
+def compact_columns(data_df: pd.DataFrame, float32_runtime: bool = False) -> dict[str, pd.Series]:
+    """
+    The columns of `data_df` that `apply_schema` converts, by name.
+    """
+    columns = {}
+    for column in LABEL_COLUMNS:
+        if column not in data_df:
+            continue
+        labels = data_df[column]
+        if not isinstance(labels.dtype, pd.CategoricalDtype):
+            labels = labels.astype("category")
+        # Sort the categories so groupby output keeps the lexical order of plain string columns
+        columns[column] = labels.cat.set_categories(sorted(labels.cat.categories))
+
+    for column in COUNTER_COLUMNS:
+        if column in data_df:
+            columns[column] = pd.to_numeric(data_df[column], downcast="unsigned")
+
+    if float32_runtime and "query_runtime" in data_df:
+        columns["query_runtime"] = data_df["query_runtime"].astype("float32")
+    return columns
+
+
+def to_frame(tables: list[pa.Table], float32_runtime: bool = False) -> pd.DataFrame:
+    """
+    Concatenates Arrow tables of benchmark runs into one frame with the compact schema.
+    """
+    table = pa.concat_tables(tables, promote_options="default")
+    data_df = table.to_pandas()
+    # The frame is our own, so convert it in place instead of copying it
+    for column, values in compact_columns(data_df, float32_runtime).items():
+        data_df[column] = values
+    return data_df
+
+
+def memory_report(tables: dict[str, pa.Table], timings: dict[str, float] | None = None) -> pd.DataFrame:
+    """
+    Reports rows, columns and in-memory size of each loaded file, measured on its frame (see `to_frame`).
+
+    Args:
+        tables (dict[str, pa.Table]): Loaded table per data file.
+        timings (dict[str, float]): Load seconds per data file (see `loader.read_benchmark_tables`), added as
+            `load_seconds` if given.
+    """
+    report_df = pd.DataFrame(
+        {
+            "data_file": list(tables),
+            "rows": [table.num_rows for table in tables.values()],
+            "columns": [table.num_columns for table in tables.values()],
+            # Deep, so the strings of object columns count too
+            "memory_mb": [to_frame([table]).memory_usage(deep=True).sum() / (1024**2) for table in tables.values()],
+        }
+    )
+    if timings is not None:
+        report_df["load_seconds"] = [timings.get(data_file) for data_file in tables]
+    return report_df
+
+
+def strip_suffixes(system_names: pd.Series, suffixes) -> pd.Series:
+    """
+    Removes `suffixes` from every system name, once per distinct name rather than per row.
+
+    Returns:
+        A categorical series with sorted categories, aligned with `system_names`.
+    """
+    names = system_names.astype("category")
+    stripped = names.cat.categories.astype(str).str.replace("|".join(map(re.escape, suffixes)), "", regex=True)
+    categories = pd.Index(stripped.unique()).sort_values()
+    codes = names.cat.codes.to_numpy()
+    # Missing names (code -1) stay missing
+    new_codes = np.where(codes >= 0, categories.get_indexer(stripped)[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories), index=system_names.index)
+
+
+def add_system_columns(data_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns `data_df` with the `SYSTEM_COLUMNS` derived from its `system_name`, without modifying it.
+    """
+    if "system_name" not in data_df:
+        return data_df
+    return data_df.assign(
+        **{column: strip_suffixes(data_df["system_name"], suffixes) for column, suffixes in SYSTEM_COLUMNS.items()}
+    )
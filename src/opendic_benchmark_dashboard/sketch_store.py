@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from opendic_benchmark_dashboard import loader, runtime_stats, schema, summary_store
+
+# A sketch summarizes the runtimes of one group, granularities are bucketed logarithmically
+SKETCH_GROUP_COLUMNS = ["system_name", "ddl_command", "target_object", "granularity_bucket"]
+
+# Granularity buckets per power of ten, the benchmarks scale in powers of ten
+BUCKETS_PER_DECADE = 10
+
+# Sketch sidecars live next to the source parquet in this sub-folder
+SKETCH_DIR = ".sketches"
+
+
+def granularity_buckets(granularity, buckets_per_decade: int = BUCKETS_PER_DECADE) -> np.ndarray:
+    """
+    Lower edge of the logarithmic bucket of every granularity, powers of ten are their own edge.
+
+    Granularities below one (e.g. 0) share the bucket of 1, so every bucket shows on a logarithmic axis.
+    """
+    granularity = np.asarray(granularity, dtype=np.float64)
+    # The epsilon keeps exact powers of ten from rounding into the bucket below
+    steps = np.floor(np.log10(np.maximum(granularity, 1)) * buckets_per_decade + 1e-9)
+    return np.floor(10 ** (steps / buckets_per_decade) + 1e-9).astype(np.int64)
+
+
+def compute_sketches(data_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds a log-bucket sketch (see `runtime_stats.sketch_buckets`) of `query_runtime` per `SKETCH_GROUP_COLUMNS` group.
+
+    A sketch is stored as rows of (group, `bucket`, `count`), so sketches merge by adding the counts of equal buckets.
+    """
+    sketch_df = data_df[SKETCH_GROUP_COLUMNS[:3]].assign(
+        granularity_bucket=granularity_buckets(data_df["granularity"]),
+        bucket=runtime_stats.sketch_buckets(data_df["query_runtime"].to_numpy(dtype=np.float64)),
+    )
+    return sketch_df.groupby([*SKETCH_GROUP_COLUMNS, "bucket"], as_index=False, observed=True).agg(count=("bucket", "size"))
+
+
+def merge_sketches(sketch_dfs: list[pd.DataFrame], group_columns=SKETCH_GROUP_COLUMNS) -> pd.DataFrame:
+    """
+    Merges sketches of several files, optionally onto a coarser set of `group_columns`.
+
+    Args:
+        sketch_dfs: Frames as returned by `load_sketches`.
+        group_columns: Columns of the merged groups, must be a subset of `SKETCH_GROUP_COLUMNS`.
+    """
+    all_df = pd.concat(sketch_dfs, ignore_index=True)
+    return all_df.groupby([*group_columns, "bucket"], as_index=False, observed=True).agg(count=("count", "sum"))
+
+
+def load_sketches(data_file: str) -> pd.DataFrame:
+    """
+    Returns the sketches of `data_file`, computing them batch by batch and persisting the sidecar on first use.
+    """
+    content_hash = summary_store.file_content_hash(data_file)
+    path = summary_store.sidecar_path(data_file, content_hash, SKETCH_DIR)
+    if os.path.exists(path):
+        return pd.read_parquet(path, engine="pyarrow")
+
+    columns = [*SKETCH_GROUP_COLUMNS[:3], "granularity", "query_runtime"]
+    sketch_dfs = [
+        compute_sketches(schema.to_frame([pa.Table.from_batches([batch])]))
+        for _, batch in loader.iter_benchmark_batches([data_file], columns=columns)
+    ]
+    if sketch_dfs:
+        sketch_df = merge_sketches(sketch_dfs)
+    else:
+        sketch_df = compute_sketches(loader.read_benchmark_data([data_file], columns=columns))
+    summary_store.write_sidecar(sketch_df, data_file, content_hash, SKETCH_DIR)
+    return sketch_df
+
+
+def sketch_percentiles(sketch_df: pd.DataFrame, group_columns, quantiles=runtime_stats.QUANTILES) -> pd.DataFrame:
+    """
+    Reads the quantiles (`p50`, `p90`, ...) and run count of every group off merged sketches.
+    """
+    grouped = sketch_df.groupby(list(group_columns), observed=True, sort=True)
+    percentiles_df = grouped["count"].sum().reset_index()
+    quantile_values = runtime_stats.sketch_quantiles(
+        grouped.ngroup().to_numpy(),
+        sketch_df["bucket"].to_numpy(),
+        sketch_df["count"].to_numpy(),
+        len(percentiles_df),
+        quantiles,
+    )
+    percentiles_df[runtime_stats.quantile_columns(quantiles)] = quantile_values
+    return percentiles_df
@@ -0,0 +1,227 @@
+"""
+Records the storage footprint of benchmark output directories per granularity step.
+
+Usage:
+    opendic-benchmark-storage OUTPUT_ROOT [...] [--dataset-dir data/storage] [--workers N] [--full]
+
+Every output root holds one directory per system, and every system directory one snapshot directory per
+granularity step, named after the granularity (`1000` or `granularity=1000`):
+
+    OUTPUT_ROOT/opendict_file/granularity=1000/metadata/...
+
+Files below a `metadata` directory (Iceberg metadata, manifests, snapshots) count as metadata files,
+everything else (data files, DuckDB and SQLite databases) as data files. The bytes and file counts of every
+step are written to one parquet file per system in the dataset dir. Directories whose mtime did not change
+since the last scan are not listed again, so rescanning after each step only reads the new snapshots.
+"""
+
+import argparse
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from opendic_benchmark_dashboard import atomic_io
+
+STORAGE_DIR = "data/storage"
+
+# Files starting with an underscore are ignored by Arrow datasets, so the scan state can live next to the files
+STATE_FILE = "_scan_state.json"
+
+# Directories listed concurrently, os.scandir and os.stat release the GIL
+SCAN_WORKERS = min(32, 4 * (os.cpu_count() or 1))
+
+# Name of a granularity step directory, e.g. `1000` or `granularity=1000`
+STEP_PATTERN = re.compile(r"^(?:granularity=)?(\d+)$")
+
+# Files rewritten in place, a write does not change the mtime of their directory so their size is never reused
+MUTABLE_SUFFIXES = (".duckdb", ".db", ".sqlite", ".sqlite3", ".wal", "-wal", "-journal")
+
+STORAGE_COLUMNS = ["data_bytes", "data_files", "metadata_bytes", "metadata_files"]
+
+
+def read_state(dataset_dir: str = STORAGE_DIR) -> dict:
+    """
+    Returns the listing of every scanned directory, `{"directories": {path: entry}}`.
+    """
+    try:
+        with open(os.path.join(dataset_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"directories": {}}
+
+
+def write_state(state: dict, dataset_dir: str = STORAGE_DIR) -> None:
+    def write(tmp_path: str) -> None:
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+
+    # Write to a temporary file first so a crashed scan never leaves a truncated state
+    atomic_io.write_atomic(os.path.join(dataset_dir, STATE_FILE), write)
+
+
+def scan_directory(path: str, previous: dict | None) -> tuple[dict, bool]:
+    """
+    Lists the files and subdirectories of one directory, reusing `previous` if the directory did not change.
+
+    Args:
+        previous (dict): Entry of the directory from the last scan, if any.
+
+    Returns:
+        The entry of the directory and whether it was listed (False if `previous` was reused).
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    if previous is not None and previous["mtime_ns"] == mtime_ns:
+        # Only the databases can have grown without a new directory entry
+        mutable_sizes = {}
+        for name in previous["mutable_sizes"]:
+            try:
+                mutable_sizes[name] = os.stat(os.path.join(path, name)).st_size
+            except FileNotFoundError:
+                pass
+        return dict(previous, mutable_sizes=mutable_sizes), False
+
+    entry = {"mtime_ns": mtime_ns, "bytes": 0, "files": 0, "mutable_sizes": {}, "subdirs": []}
+    with os.scandir(path) as dir_entries:
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir(follow_symlinks=False):
+                entry["subdirs"].append(dir_entry.name)
+            elif dir_entry.is_file(follow_symlinks=False):
+                size = dir_entry.stat(follow_symlinks=False).st_size
+                entry["files"] += 1
+                if dir_entry.name.endswith(MUTABLE_SUFFIXES):
+                    entry["mutable_sizes"][dir_entry.name] = size
+                else:
+                    entry["bytes"] += size
+    return entry, True
+
+
+def find_steps(output_root: str) -> list[tuple[str, str, int]]:
+    """
+    Finds the snapshot directories of `output_root` as (path, system_name, granularity).
+    """
+    steps = []
+    with os.scandir(output_root) as systems:
+        for system in systems:
+            if not system.is_dir() or system.name.startswith("."):
+                continue
+            with os.scandir(system.path) as step_dirs:
+                for step in step_dirs:
+                    match = STEP_PATTERN.match(step.name)
+                    if match and step.is_dir():
+                        steps.append((step.path, system.name, int(match.group(1))))
+    return steps
+
+
+def collect_storage(
+    output_roots: list[str], state: dict | None = None, max_workers: int = SCAN_WORKERS
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Sums the bytes and files of every granularity step of the output roots.
+
+    The directory trees are walked level by level, every level is listed in parallel with `os.scandir`.
+
+    Args:
+        output_roots (list[str]): Benchmark output directories, see the module docstring for their layout.
+        state (dict): Scan state of an earlier call (see `read_state`), updated in place. None rescans everything.
+        max_workers (int): Directories listed concurrently.
+
+    Returns:
+        One row per system and granularity with the `STORAGE_COLUMNS`, and the number of `listed` and
+        `reused` directories.
+    """
+    state = state if state is not None else {"directories": {}}
+    previous_entries = state["directories"]
+    entries = {}
+    counts = {"listed": 0, "reused": 0}
+    # (path, step index, below a metadata dir)
+    level = []
+    steps = []
+    for output_root in output_roots:
+        for path, system_name, granularity in find_steps(output_root):
+            level.append((os.path.abspath(path), len(steps), False))
+            steps.append({"system_name": system_name, "granularity": granularity, **dict.fromkeys(STORAGE_COLUMNS, 0)})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            results = executor.map(lambda item: scan_directory(item[0], previous_entries.get(item[0])), level)
+            next_level = []
+            for (path, step, metadata), (entry, listed) in zip(level, results, strict=True):
+                entries[path] = entry
+                counts["listed" if listed else "reused"] += 1
+                kind = "metadata" if metadata else "data"
+                steps[step][f"{kind}_bytes"] += entry["bytes"] + sum(entry["mutable_sizes"].values())
+                steps[step][f"{kind}_files"] += entry["files"]
+                next_level.extend(
+                    (os.path.join(path, name), step, metadata or name == "metadata") for name in entry["subdirs"]
+                )
+            level = next_level
+
+    # Directories below the scanned roots that were removed since the last scan are dropped from the state,
+    # the entries of other roots are kept for their next scan
+    scanned_roots = tuple(os.path.join(os.path.abspath(output_root), "") for output_root in output_roots)
+    state["directories"] = {
+        path: entry for path, entry in previous_entries.items() if not path.startswith(scanned_roots)
+    } | entries
+    storage_df = pd.DataFrame(steps, columns=["system_name", "granularity", *STORAGE_COLUMNS])
+    storage_df = storage_df.sort_values(["system_name", "granularity"], ignore_index=True)
+    return storage_df, counts
+
+
+def write_storage(storage_df: pd.DataFrame, dataset_dir: str = STORAGE_DIR) -> list[str]:
+    """
+    Writes the steps of every system to `<dataset_dir>/<system_name>.parquet`, replacing earlier scans of it.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    paths = []
+    for system_name, system_df in storage_df.groupby("system_name", sort=True):
+        path = os.path.join(dataset_dir, f"{system_name}.parquet")
+        # Write to a temporary file first so the dashboard never reads a partial file
+        atomic_io.write_atomic(
+            path, lambda tmp_path, system_df=system_df: system_df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        )
+        paths.append(path)
+    return paths
+
+
+def storage_files(dataset_dir: str = STORAGE_DIR) -> list[str]:
+    if not os.path.isdir(dataset_dir):
+        return []
+    return sorted(
+        os.path.join(dataset_dir, f) for f in os.listdir(dataset_dir) if f.endswith(".parquet") and not f.startswith("_")
+    )
+
+
+def load_storage(dataset_dir: str = STORAGE_DIR) -> pd.DataFrame | None:
+    """
+    Reads the recorded steps of all systems, None if nothing was collected into `dataset_dir` yet.
+    """
+    files = storage_files(dataset_dir)
+    if not files:
+        return None
+    return ds.dataset(files, format="parquet").to_table().to_pandas()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output_roots", nargs="+")
+    parser.add_argument("--dataset-dir", default=STORAGE_DIR)
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS)
+    parser.add_argument("--full", action="store_true", help="List every directory again, ignoring the last scan")
+    args = parser.parse_args()
+
+    state = {"directories": {}} if args.full else read_state(args.dataset_dir)
+    storage_df, counts = collect_storage(args.output_roots, state, args.workers)
+    paths = write_storage(storage_df, args.dataset_dir)
+    write_state(state, args.dataset_dir)
+    print(
+        f"Recorded {len(storage_df)} step(s) of {len(paths)} system(s) into {args.dataset_dir}/, "
+        f"listed {counts['listed']} directories, reused {counts['reused']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import contextlib
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from opendic_benchmark_dashboard import atomic_io, loader, schema
+
+# Columns every dashboard groups the raw benchmark runs by
+GROUP_COLUMNS = ["system_name", "ddl_command", "target_object", "granularity"]
+
+# Runtime aggregates of every group, see `compute_aggregates`
+AGGREGATE_COLUMNS = ["mean", "sum", "count", "min", "max", "std"]
+
+# Sidecar files live next to the source parquet in this sub-folder
+SIDECAR_DIR = ".aggregates"
+
+# (path, mtime, size) -> content hash, so unchanged files are only hashed once per process
+_content_hashes: dict[tuple[str, float, int], str] = {}
+
+
+def file_content_hash(data_file: str, block_size: int = 1 << 20) -> str:
+    """
+    Returns a short sha256 digest of the file content.
+    """
+    stat = os.stat(data_file)
+    memo_key = (os.path.abspath(data_file), stat.st_mtime, stat.st_size)
+    if memo_key not in _content_hashes:
+        digest = hashlib.sha256()
+        with open(data_file, "rb") as f:
+            while block := f.read(block_size):
+                digest.update(block)
+        _content_hashes[memo_key] = digest.hexdigest()[:16]
+    return _content_hashes[memo_key]
+
+
+def sidecar_path(data_file: str, content_hash: str, sidecar_dir: str = SIDECAR_DIR) -> str:
+    data_dir, file_name = os.path.split(data_file)
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(data_dir, sidecar_dir, f"{stem}.{content_hash}.parquet")
+
+
+def write_sidecar(sidecar_df: pd.DataFrame, data_file: str, content_hash: str, sidecar_dir: str = SIDECAR_DIR) -> bool:
+    """
+    Persists the sidecar of `data_file` version `content_hash`, removing the sidecars of older versions.
+
+    Returns:
+        False if the sidecar could not be written (e.g. a read-only data dir), the caller then keeps using
+        the frame it computed.
+    """
+    path = sidecar_path(data_file, content_hash, sidecar_dir)
+    folder = os.path.dirname(path)
+    # Only `<stem>.<content hash>.parquet`, not the sidecars of siblings like `<stem>.v2.parquet`
+    stem = os.path.splitext(os.path.basename(data_file))[0]
+    version_pattern = re.compile(rf"{re.escape(stem)}\.[0-9a-f]{{16}}\.parquet")
+    try:
+        os.makedirs(folder, exist_ok=True)
+        for file_name in os.listdir(folder):
+            if version_pattern.fullmatch(file_name) and file_name != os.path.basename(path):
+                # Another writer may have removed it already
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(folder, file_name))
+        # Concurrent readers never see a partial sidecar
+        atomic_io.write_atomic(path, lambda tmp_path: sidecar_df.to_parquet(tmp_path, engine="pyarrow", index=False))
+    except OSError:
+        return False
+    return True
+
+
+def compute_aggregates(data_df: pd.DataFrame, group_columns=GROUP_COLUMNS) -> pd.DataFrame:
+    """
+    Computes mean, sum, count, min, max and stddev of `query_runtime` per group.
+    """
+    return data_df.groupby(group_columns, as_index=False, observed=True).agg(
+        mean=("query_runtime", "mean"),
+        sum=("query_runtime", "sum"),
+        count=("query_runtime", "count"),
+        min=("query_runtime", "min"),
+        max=("query_runtime", "max"),
+        std=("query_runtime", "std"),
+    )
+
+
+def stream_aggregates(data_files: list[str], group_columns=GROUP_COLUMNS) -> pd.DataFrame:
+    """
+    Computes the aggregates of `data_files` batch by batch, without materializing all runs at once.
+    """
+    aggregate_dfs = [
+        compute_aggregates(schema.to_frame([pa.Table.from_batches([batch])]), group_columns)
+        for _, batch in loader.iter_benchmark_batches(data_files, columns=group_columns + ["query_runtime"])
+    ]
+    if not aggregate_dfs:
+        return compute_aggregates(
+            loader.read_benchmark_data(data_files, columns=group_columns + ["query_runtime"]), group_columns
+        )
+    if len(aggregate_dfs) == 1:
+        return aggregate_dfs[0]
+    return combine_aggregates(aggregate_dfs, group_columns)
+
+
+def load_aggregates(data_file: str) -> pd.DataFrame:
+    """
+    Returns the aggregates of `data_file`, computing and persisting the sidecar on first use.
+
+    Sidecars are keyed by the content hash of the source file, so a rewritten file gets a fresh sidecar
+    and the outdated ones are removed.
+    """
+    content_hash = file_content_hash(data_file)
+    path = sidecar_path(data_file, content_hash)
+    if os.path.exists(path):
+        return pd.read_parquet(path, engine="pyarrow")
+
+    aggregates_df = stream_aggregates([data_file])
+    write_sidecar(aggregates_df, data_file, content_hash)
+    return aggregates_df
+
+
+def combine_aggregates(aggregate_dfs: list[pd.DataFrame], group_columns=GROUP_COLUMNS) -> pd.DataFrame:
+    """
+    Merges aggregates of several files, optionally onto a coarser set of `group_columns`.
+
+    Args:
+        aggregate_dfs: Frames as returned by `load_aggregates`, an empty list gives an empty frame.
+        group_columns: Columns of the merged groups, a subset of `GROUP_COLUMNS` or the derived system columns of
+            `schema.SYSTEM_COLUMNS` in place of `system_name`.
+    """
+    if not aggregate_dfs:
+        empty_df = pd.DataFrame(columns=[*group_columns, *AGGREGATE_COLUMNS])
+        return empty_df.astype({column: "int64" if column == "count" else "float64" for column in AGGREGATE_COLUMNS})
+    all_df = pd.concat(aggregate_dfs, ignore_index=True)
+    # Merge the squared deviations (Chan et al.): the within-part ones plus those of the part means from the merged mean
+    grouped = all_df.groupby(group_columns, observed=True)
+    mean = grouped["sum"].transform("sum") / grouped["count"].transform("sum")
+    m2 = all_df["std"].fillna(0) ** 2 * (all_df["count"] - 1) + all_df["count"] * (all_df["mean"] - mean) ** 2
+    combined_df = (
+        all_df.assign(m2=m2)
+        .groupby(group_columns, as_index=False, observed=True)
+        .agg(sum=("sum", "sum"), count=("count", "sum"), min=("min", "min"), max=("max", "max"), m2=("m2", "sum"))
+    )
+    count = combined_df["count"]
+    combined_df["mean"] = combined_df["sum"] / count
+    combined_df["std"] = np.sqrt((combined_df["m2"] / (count - 1)).clip(lower=0)).where(count > 1)
+    return combined_df[[*group_columns, *AGGREGATE_COLUMNS]]
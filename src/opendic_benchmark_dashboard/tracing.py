@@ -0,0 +1,177 @@
+import contextlib
+import functools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+@dataclass
+class Span:
+    """
+    One timed stage of a trace.
+
+    Attributes:
+        start (float): Seconds since the start of the trace.
+        depth (int): Nesting level, 0 for the outermost spans.
+        memory_delta (int): Change of the resident set size over the span, in bytes.
+        attributes (dict): Details of the stage, e.g. `cache="hit"`.
+    """
+
+    name: str
+    start: float
+    depth: int
+    thread_id: int
+    duration: float = 0.0
+    memory_delta: int = 0
+    attributes: dict = field(default_factory=dict)
+
+
+class Trace:
+    """
+    Spans of one run (e.g. one Streamlit rerun), in the order they started.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_start = time.time()
+        self.origin = time.perf_counter()
+        self.rss_start = current_rss()
+        self.spans: list[Span] = []
+        self.duration = 0.0
+        self._open: list[Span] = []
+
+
+# Trace of the run on this thread, Streamlit runs the script of every session on its own thread
+_local = threading.local()
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Resident set size of the process in bytes, 0 where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def start_trace(name: str) -> Trace:
+    _local.trace = Trace(name)
+    return _local.trace
+
+
+def stop_trace() -> Trace | None:
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is not None:
+        trace.duration = time.perf_counter() - trace.origin
+    return trace
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """
+    Times the enclosed block as a span of the active trace, does nothing if no trace is active.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield
+        return
+
+    current = Span(
+        name,
+        start=time.perf_counter() - trace.origin,
+        depth=len(trace._open),
+        thread_id=threading.get_ident(),
+        attributes=attributes,
+    )
+    trace.spans.append(current)
+    trace._open.append(current)
+    rss_before = current_rss()
+    try:
+        yield
+    finally:
+        current.duration = time.perf_counter() - trace.origin - current.start
+        current.memory_delta = current_rss() - rss_before
+        trace._open.pop()
+
+
+def annotate(**attributes) -> None:
+    """
+    Adds attributes to the innermost open span of the active trace.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is not None and trace._open:
+        trace._open[-1].attributes.update(attributes)
+
+
+def traced(func=None, *, name: str | None = None):
+    """
+    Decorator that records every call of the function as a span, named after the function by default.
+    """
+    if func is None:
+        return functools.partial(traced, name=name)
+
+    span_name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with span(span_name):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def spans_frame(trace: Trace) -> pd.DataFrame:
+    """
+    One row per span with its start and duration in milliseconds, memory delta in MiB and attributes.
+
+    Every attribute gets its own column after `cache`, in the order the attributes first appear, and is
+    empty for the spans without it.
+    """
+    columns = ["span", "depth", "start_ms", "duration_ms", "memory_delta_mib", "cache"]
+    attribute_columns = list(dict.fromkeys(key for s in trace.spans for key in s.attributes if key not in columns))
+    return pd.DataFrame(
+        [
+            {
+                "span": s.name,
+                "depth": s.depth,
+                "start_ms": s.start * 1000,
+                "duration_ms": s.duration * 1000,
+                "memory_delta_mib": s.memory_delta / 1024**2,
+                "cache": s.attributes.get("cache"),
+                **{key: value for key, value in s.attributes.items() if key in attribute_columns},
+            }
+            for s in trace.spans
+        ],
+        columns=columns + attribute_columns,
+    )
+
+
+def chrome_trace(traces: list[Trace]) -> dict:
+    """
+    Converts traces to the Chrome trace-event format (chrome://tracing, Perfetto), one process per trace.
+    """
+    events = []
+    for pid, trace in enumerate(traces, start=1):
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": trace.name}})
+        for s in trace.spans:
+            events.append(
+                {
+                    "name": s.name,
+                    "ph": "X",
+                    # Microseconds since the epoch, so the traces of several reruns line up in time
+                    "ts": (trace.wall_start + s.start) * 1e6,
+                    "dur": s.duration * 1e6,
+                    "pid": pid,
+                    "tid": s.thread_id,
+                    "args": {"memory_delta_mib": round(s.memory_delta / 1024**2, 3), **s.attributes},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
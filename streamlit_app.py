@@ -1,10 +1,43 @@
+import json
 import os
 
 import pandas as pd
-import plotly.express as px
 import streamlit as st
 
-from opendic_benchmark_dashboard import storage_data
+from opendic_benchmark_dashboard import (
+    aggregation,
+    cache,
+    disk_cache,
+    downsampling,
+    figures,
+    ingest,
+    loader,
+    lod,
+    regression,
+    runtime_stats,
+    scaling,
+    schema,
+    sketch_store,
+    storage_collector,
+    storage_data,
+    summary_store,
+    tracing,
+)
+
+# Groups of the runtime aggregates behind the TLDR plots
+TLDR_GROUP_COLUMNS = ["system_name", "ddl_command", "granularity"]
+
+# Rows of the derived frames listed under the charts, the raw data viewer pages through the runs themselves
+PREVIEW_ROWS = 200
+
+# Rows per page offered by the raw data viewer, `loader.MAX_PAGE_BYTES` lowers them for wide rows
+RAW_PAGE_SIZES = [50, 100, 500, 1000]
+
+# Reruns kept per session for the Chrome trace export
+TRACE_HISTORY = 20
+
+# Groups of the percentile charts, the per-file sketches are merged onto these
+PERCENTILE_GROUP_COLUMNS = ["system_name", "ddl_command", "granularity_bucket"]
 
 # Set page title and layout
 st.set_page_config(page_title="OpenDIC Benchmark Dashboard", layout="wide")
@@ -15,34 +48,138 @@ st.write("Visualize and compare benchmark results for different databases")
 
 # Create tabs for switching between different dataset categories
 st.sidebar.header("Dashboard Controls")
-sidebar_category = st.sidebar.radio("Select Dataset Category", options=["TLDR", "Standard", "Opendic", "Opendic(Batch)"])
+sidebar_category = st.sidebar.radio(
+    "Select Dataset Category", options=["TLDR", "Standard", "Opendic", "Opendic(Batch)", "Regressions"]
+)
 
 
-@st.cache_data(ttl="1h")
-def load_data_standard(selected_db: str, data_dir: str, database_options):
-    if selected_db != "overview":
-        data_file = f"{data_dir}{selected_db}.parquet"
-        data_df = pd.read_parquet(data_file, engine="pyarrow")
+def show_figure(fig):
+    # Serializing a figure for the browser is a stage of its own in the trace
+    with tracing.span("st.plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True, config=figures.CONFIG)
+
+
+def show_dataframe(data_df, **kwargs):
+    with tracing.span("st.dataframe", rows=len(data_df)):
+        st.dataframe(data_df, **kwargs)
+
+
+def preview_dataframe(data_df, label="Query Data"):
+    """
+    Lists the first `PREVIEW_ROWS` rows of a frame in an expander, whose content is sent even while it is closed.
+    """
+    with st.expander(label):
+        if len(data_df) > PREVIEW_ROWS:
+            st.caption(f"First {PREVIEW_ROWS:,} of {len(data_df):,} rows")
+        show_dataframe(data_df.head(PREVIEW_ROWS), use_container_width=True)
+
 
+@cache.cache_data(ttl="1h")
+def load_raw_page(datafiles: list[str], ddl_commands, system_names, sort_by, descending, page, page_size, data_key=None):
+    return loader.read_page(datafiles, ddl_commands, system_names, sort_by, descending, page, page_size)
+
+
+def raw_data_viewer(datafiles: list[str], data_key, filter_df, key: str):
+    """
+    Pages through the runs of `datafiles`, nothing is read or sent until the viewer is switched on.
+
+    Args:
+        data_key: Identifies the content of `datafiles` for the cache.
+        filter_df (pd.DataFrame): Frame with the `system_name` and `ddl_command` values offered as filters
+            (e.g. the runtime aggregates).
+        key (str): Identifies the viewer among the pages, its filters are kept per page.
+    """
+    if not st.toggle("View Raw Data", key=f"{key}_raw_data"):
+        return
+
+    controls = st.columns(5)
+    system_names = controls[0].multiselect(
+        "Systems", sorted(filter_df["system_name"].unique()), key=f"{key}_raw_system_names"
+    )
+    ddl_commands = controls[1].multiselect(
+        "DDL commands", sorted(filter_df["ddl_command"].unique()), key=f"{key}_raw_ddl_commands"
+    )
+    sort_by = controls[2].selectbox(
+        "Sort by",
+        [None, *loader.column_names(datafiles)],
+        format_func=lambda column: column or "File order",
+        key=f"{key}_raw_sort_by",
+    )
+    descending = controls[3].toggle("Descending", key=f"{key}_raw_descending")
+    page_size = controls[4].selectbox("Rows per page", RAW_PAGE_SIZES, index=1, key=f"{key}_raw_page_size")
+    page_number = st.number_input("Page", min_value=1, value=1, key=f"{key}_raw_page")
+
+    page = load_raw_page(
+        datafiles,
+        ddl_commands or None,
+        system_names or None,
+        sort_by,
+        descending,
+        page_number - 1,
+        page_size,
+        data_key=data_key,
+    )
+    show_dataframe(schema.to_frame([page.table]), use_container_width=True)
+    caption = f"Page {page.page + 1:,} of {page.pages:,}, {page.total_rows:,} matching runs"
+    if page.page_size < page_size:
+        caption += f", {page.page_size:,} rows per page to stay under {loader.MAX_PAGE_BYTES / 1024**2:.0f} MB"
+    st.caption(caption)
+
+
+@cache.shared_data(ttl="1h")
+def load_data_standard(selected_db: str, data_dir: str, database_options, data_key=None):
+    """
+    Loads the runs of the selected experiment(s), only needed for the error bands.
+    """
+    timings = {}
+    if selected_db != "overview":
+        data_files = [f"{data_dir}{selected_db}.parquet"]
     else:
-        data_df = pd.concat(
-            [pd.read_parquet(f"{data_dir}{db}.parquet", engine="pyarrow") for db in database_options if db != "overview"],
-            ignore_index=False,
-        )
+        data_files = [f"{data_dir}{db}.parquet" for db in database_options if db != "overview"]
+    # The statistics only need the runtimes, so skip the wide query text and timestamp columns
+    tables = loader.read_benchmark_tables(data_files, columns=loader.RUNTIME_COLUMNS, timings=timings)
+    data_df = schema.to_frame(list(tables.values()))
 
-    # Display raw data in expandable section
-    with st.expander("View Raw Data"):
-        mem_bytes = data_df.memory_usage(deep=True).sum()
-        mem_mb = mem_bytes / (1024**2)
-        if mem_mb > 50:
-            st.warning(f"Dataframe size is {mem_mb:.2f} MB. Showing Compacted")
-            st.dataframe(data_df.iloc[::10], use_container_width=True)
-        else:
-            st.dataframe(data_df, use_container_width=True)
+    with st.expander("Memory and load time per file"):
+        show_dataframe(schema.memory_report(tables, timings), use_container_width=True)
 
     return data_df
 
 
+@cache.shared_data(ttl="1h")
+def load_summary_stats(selected_db: str, data_dir: str, database_options, data_key=None):
+    """
+    Loads the per-group runtime aggregates (see `aggregation.load_file_aggregates`) for the selected experiment(s).
+    """
+    if selected_db != "overview":
+        return aggregation.load_file_aggregates([f"{data_dir}{selected_db}.parquet"])
+
+    return aggregation.load_file_aggregates([f"{data_dir}{db}.parquet" for db in database_options if db != "overview"])
+
+
+def level_of_detail_controls() -> lod.LevelOfDetail:
+    """
+    Sidebar controls for how many points the line charts send to the browser.
+    """
+    full_range = (lod.GRANULARITY_STEPS[0], lod.GRANULARITY_STEPS[-1])
+    x_range = st.sidebar.select_slider("Granularity range", options=lod.GRANULARITY_STEPS, value=full_range)
+    chart_width = st.sidebar.number_input("Chart width (px)", min_value=200, max_value=8000, value=lod.DEFAULT_WIDTH_PX)
+    method = st.sidebar.selectbox("Downsampling", options=["lttb", "minmax"], format_func=str.upper)
+    render_mode = st.sidebar.selectbox(
+        "Render mode",
+        options=["auto", "svg", "webgl"],
+        format_func={"auto": "Auto", "svg": "SVG (vector export)", "webgl": "WebGL"}.get,
+    )
+    return lod.LevelOfDetail(
+        # The full range shows every granularity, including those beyond the last step
+        x_range=None if tuple(x_range) == full_range else x_range,
+        max_points=lod.max_points_for_width(chart_width),
+        method=method,
+        render_mode=render_mode,
+    )
+
+
+@tracing.traced
 def create_dashboard(data_dir):
     data_files = [f for f in os.listdir(data_dir) if f.endswith(".parquet")]
     database_options = ["overview"] + sorted([os.path.splitext(f)[0] for f in data_files])
@@ -50,344 +187,527 @@ def create_dashboard(data_dir):
     # Sidebar for controls
     selected_db = st.sidebar.selectbox("Select Experiment", options=database_options, index=0)
 
-    data_df = load_data_standard(selected_db, data_dir, database_options)
+    # Identifies the selected data for the caches, so no frame has to be hashed
+    if selected_db == "overview":
+        data_key = disk_cache.fingerprint([data_dir + f for f in data_files])
+    else:
+        data_key = disk_cache.fingerprint([f"{data_dir}{selected_db}.parquet"])
+
+    stats_df = load_summary_stats(selected_db, data_dir, database_options, data_key=data_key)
+    if selected_db == "overview":
+        selected_files = [data_dir + f for f in data_files]
+    else:
+        selected_files = [f"{data_dir}{selected_db}.parquet"]
+    raw_data_viewer(selected_files, data_key, stats_df, key=f"{data_dir}{selected_db}")
+
+    # Bands need one line per group, which the Opendic overviews do not draw
+    band, runtime_stats_df = "none", None
+    if selected_db != "overview" or sidebar_category == "Standard":
+        band = error_band_controls()
+    if band != "none":
+        data_df = load_data_standard(selected_db, data_dir, database_options, data_key=data_key)
+        runtime_stats_df = compute_runtime_statistics(data_df, data_key=data_key)
+    bands = dict(runtime_stats_df=runtime_stats_df, band=band)
+
+    # The overviews chart runtime percentiles from the merged sketches of all experiments
+    sketch_df = None
+    if selected_db == "overview":
+        sketch_df = load_runtime_sketches([data_dir + f for f in data_files], data_key=data_key)
 
     if sidebar_category == "Standard":
         if selected_db == "overview":
-            standard_compare_all_dashboard(data_df)
+            standard_compare_all_dashboard(stats_df, data_key=data_key, sketch_df=sketch_df, **bands)
         else:
-            standard_dashboard(data_df, selected_db=selected_db)
+            standard_dashboard(stats_df, selected_db=selected_db, data_key=data_key, **bands)
     elif sidebar_category == "Opendic":
         if selected_db == "overview":
-            opendic_compare_all_dashboard(data_df)
+            opendic_compare_all_dashboard(stats_df, data_key=data_key, sketch_df=sketch_df)
         else:
-            opendic_dashboard(data_df, selected_db=selected_db)
+            opendic_dashboard(stats_df, selected_db=selected_db, data_key=data_key, **bands)
     elif sidebar_category == "Opendic(Batch)":
         if selected_db == "overview":
-            opendic_batch_compare_all_dashboard(data_df)
+            opendic_batch_compare_all_dashboard(stats_df, data_key=data_key, sketch_df=sketch_df)
         else:
-            opendic_batch_dashboard(data_df, selected_db=selected_db)
+            opendic_batch_dashboard(stats_df, selected_db=selected_db, data_key=data_key, **bands)
 
+    experiment_name = f"All {sidebar_category} Experiments" if selected_db == "overview" else selected_db
+    plot_scaling(stats_df, data_key=data_key, experiment_name=experiment_name, **scaling_controls())
 
-def standard_dashboard(data_df, selected_db):
-    # Overview dashboard
-    # Filter for 'CREATE' commands and average runtimes
-    create_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+
+def scaling_controls() -> dict:
+    """
+    Sidebar controls for the extrapolation of the scaling curves.
+    """
+    target_granularity = st.sidebar.number_input(
+        "Extrapolate to granularity", min_value=1, max_value=10**12, value=1_000_000, step=100_000
+    )
+    slo_seconds = st.sidebar.number_input("Latency SLO (s)", min_value=0.0001, value=1.0, format="%.4f")
+    return dict(target_granularity=target_granularity, slo_seconds=slo_seconds)
+
+
+@cache.keyed_cache
+def plot_scaling(_aggregates_df, data_key, experiment_name: str, target_granularity: int, slo_seconds: float):
+    """
+    Plots the best fitting growth model (see `scaling.MODELS`) of the runtime per system and DDL command.
+
+    Args:
+        _aggregates_df (pd.DataFrame): Runtime aggregates with `system_name`, `ddl_command` and `granularity` groups.
+        data_key: Identifies `_aggregates_df` for the cache (see `cache.keyed_cache`).
+        target_granularity (int): Granularity the curves are extrapolated to.
+        slo_seconds (float): Latency SLO, the report lists the granularity at which each curve crosses it.
+    """
+    st.subheader(f"Runtime Scaling by Granularity in {experiment_name}")
+    report_df = scaling.scaling_report(_aggregates_df, target_granularity, slo_seconds)
+    scaling_df = pd.concat(
+        [
+            scaling.scaling_curves(report_df, 1, target_granularity).assign(series="fit"),
+            scaling.measured_points(_aggregates_df).assign(series="measured"),
+        ],
+        ignore_index=True,
+    )
+
+    fig = figures.build_figure(
+        "scaling",
+        scaling_df,
+        data_key=(data_key, "scaling"),
+        target_granularity=target_granularity,
+        slo_seconds=slo_seconds,
+    )
+    show_figure(fig)
+    st.caption(
+        "Lines: model with the lowest AICc of runtime = a + b * f(granularity), extrapolated to the dotted line. "
+        "Points: measured mean runtime. Dashed line: latency SLO."
+    )
+    show_dataframe(
+        report_df.rename(
+            columns={
+                "predicted_runtime": f"runtime at {target_granularity:,} (s)",
+                "slo_granularity": f"granularity at {slo_seconds:g} s",
+            }
+        ),
+        use_container_width=True,
+    )
+
+
+def error_band_controls() -> str:
+    """
+    Sidebar control for the shaded area around the ALTER, COMMENT and SHOW lines.
+    """
+    return st.sidebar.selectbox(
+        "Error band",
+        options=list(figures.BANDS),
+        format_func={"none": "None", "ci": "95% confidence interval", "percentiles": "p50-p90-p99 fan"}.get,
     )
+
+
+@cache.keyed_cache
+def compute_runtime_statistics(_data_df, data_key):
+    """
+    Percentiles, stddev and confidence intervals of the runtime per group (see `runtime_stats`).
+    """
+    return runtime_stats.runtime_statistics(_data_df)
+
+
+def with_runtime_statistics(plot_df, runtime_stats_df):
+    """
+    Adds the runtime statistics of each plotted group to `plot_df`, keeping its row order.
+    """
+    keys = [column for column in summary_store.GROUP_COLUMNS if column in plot_df]
+    return plot_df.merge(runtime_stats_df.drop(columns=["count", "mean"]), on=keys, how="left")
+
+
+@tracing.traced
+def standard_dashboard(stats_df, selected_db, data_key, runtime_stats_df=None, band="none"):
+    # Overview dashboard
+    # Average runtimes per DDL command
+    summaries = aggregation.split_by_command(stats_df)
+    create_df = summaries["CREATE"]
     create_summary_df = chunked_avg_runtime(
         create_df,
+        data_key=(data_key, "create"),
         chunk_size=20,
     )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
     # Combine all summaries
-    small_create_df = chunked_avg_runtime(create_df, chunk_size=250)
+    small_create_df = chunked_avg_runtime(create_df, data_key=(data_key, "create"), chunk_size=250)
     summary_df = pd.concat([small_create_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Add y-axis type control to sidebar
     y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
 
-    plot_create(create_summary_df, experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(alter_summary_df, "ALTER", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(comment_summary_df, "COMMENT", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(show_summary_df, "SHOW", experiment_name=selected_db, y_axis_type=y_axis_type)
+    plot_create(
+        create_summary_df,
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "create_summary"),
+    )
+    plot_ddl(
+        alter_summary_df,
+        "ALTER",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "alter_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
+    plot_ddl(
+        comment_summary_df,
+        "COMMENT",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "comment_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
+    plot_ddl(
+        show_summary_df,
+        "SHOW",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "show_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
     plot_summary(
         summary_df,
+        data_key=(data_key, "summary"),
         ddl_command="ALL",
         experiment_name=selected_db,
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="ddl_command",
         line_dash="target_object",
         legend_orientation="v",
     )
 
 
-def standard_compare_all_dashboard(data_df):
-    create_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+@tracing.traced
+def standard_compare_all_dashboard(stats_df, data_key, sketch_df=None, runtime_stats_df=None, band="none"):
+    summaries = aggregation.split_by_command(stats_df)
+    create_df = summaries["CREATE"]
     create_summary_df = chunked_avg_runtime(
         create_df,
+        data_key=(data_key, "create"),
         chunk_size=20,
     )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
     # Combine all summaries
-    small_create_df = chunked_avg_runtime(create_df, chunk_size=1000)
+    small_create_df = chunked_avg_runtime(create_df, data_key=(data_key, "create"), chunk_size=1000)
     all_df = pd.concat([small_create_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Create a summary_df that averages across target_object
-    summary_df = all_df.groupby(["system_name", "ddl_command", "granularity"], as_index=False).agg(
+    summary_df = all_df.groupby(["system_name", "ddl_command", "granularity"], as_index=False, observed=True).agg(
         avg_runtime=("avg_runtime", "mean")
     )
 
     # Add y-axis type control to sidebar
     y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
 
     plot_summary(
         create_summary_df,
+        data_key=(data_key, "create_summary"),
         ddl_command="CREATE",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="CREATE: System, Object Type",
         line_dash="target_object",
     )
     plot_summary(
         alter_summary_df,
+        data_key=(data_key, "alter_summary"),
         ddl_command="ALTER",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="ALTER: System, Object Type",
         line_dash="target_object",
+        _runtime_stats_df=runtime_stats_df,
+        band=band,
     )
 
     plot_summary(
         comment_summary_df,
+        data_key=(data_key, "comment_summary"),
         ddl_command="COMMENT",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="COMMENT: System, Object Type",
         line_dash="target_object",
+        _runtime_stats_df=runtime_stats_df,
+        band=band,
     )
 
     plot_summary(
         show_summary_df,
+        data_key=(data_key, "show_summary"),
         ddl_command="SHOW",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="SHOW: System, Object Type",
         line_dash="target_object",
+        _runtime_stats_df=runtime_stats_df,
+        band=band,
     )
     plot_summary(
         summary_df,
+        data_key=(data_key, "summary"),
         ddl_command="ALL",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System, Object Type",
         line_dash="ddl_command",
         legend_orientation="v",
     )
+    if sketch_df is not None:
+        plot_percentiles(sketch_df, data_key=data_key, experiment_name="All standard datasystems", y_axis_type=y_axis_type)
 
 
-def opendic_dashboard(data_df, selected_db):
-    # Filter for 'CREATE' commands and average runtimes
-    create_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+@tracing.traced
+def opendic_dashboard(stats_df, selected_db, data_key, runtime_stats_df=None, band="none"):
+    # Average runtimes per DDL command
+    summaries = aggregation.split_by_command(stats_df)
+    create_df = summaries["CREATE"]
     create_summary_df = chunked_avg_runtime(
         create_df,
+        data_key=(data_key, "create"),
         chunk_size=20,
     )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    small_create_df = chunked_avg_runtime(create_df, chunk_size=250)
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
+    small_create_df = chunked_avg_runtime(create_df, data_key=(data_key, "create"), chunk_size=250)
     summary_df = pd.concat([small_create_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Add y-axis type control to sidebar
     y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
 
     # Plot the summary dataframes
-    plot_create(create_summary_df, experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(alter_summary_df, "ALTER", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(comment_summary_df, "COMMENT", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(show_summary_df, "SHOW", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_summary(summary_df, ddl_command="ALL", experiment_name=selected_db, y_axis_type=y_axis_type)
+    plot_create(
+        create_summary_df,
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "create_summary"),
+    )
+    plot_ddl(
+        alter_summary_df,
+        "ALTER",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "alter_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
+    plot_ddl(
+        comment_summary_df,
+        "COMMENT",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "comment_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
+    plot_ddl(
+        show_summary_df,
+        "SHOW",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "show_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
+    )
+    plot_summary(
+        summary_df,
+        data_key=(data_key, "summary"),
+        ddl_command="ALL",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+    )
 
 
-def opendic_compare_all_dashboard(data_df):
-    create_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+@tracing.traced
+def opendic_compare_all_dashboard(stats_df, data_key, sketch_df=None):
+    summaries = aggregation.split_by_command(stats_df)
+    create_df = summaries["CREATE"]
     create_summary_df = chunked_avg_runtime(
         create_df,
+        data_key=(data_key, "create"),
         chunk_size=20,
     )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
     # Combine all summaries
-    small_create_df = chunked_avg_runtime(create_df, chunk_size=1000)
+    small_create_df = chunked_avg_runtime(create_df, data_key=(data_key, "create"), chunk_size=1000)
     all_df = pd.concat([small_create_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Create a summary_df that averages across target_object
-    summary_df = all_df.groupby(["system_name", "ddl_command", "granularity"], as_index=False).agg(
+    summary_df = all_df.groupby(["system_name", "ddl_command", "granularity"], as_index=False, observed=True).agg(
         avg_runtime=("avg_runtime", "mean")
     )
 
     # Add y-axis type control to sidebar
     y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
 
     plot_summary(
         create_summary_df,
+        data_key=(data_key, "create_summary"),
         ddl_command="CREATE",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="CREATE: System, Object Type",
     )
     plot_summary(
         alter_summary_df,
+        data_key=(data_key, "alter_summary"),
         ddl_command="ALTER",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="ALTER: System, Object Type",
     )
 
     plot_summary(
         comment_summary_df,
+        data_key=(data_key, "comment_summary"),
         ddl_command="COMMENT",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="COMMENT: System, Object Type",
     )
 
     plot_summary(
         show_summary_df,
+        data_key=(data_key, "show_summary"),
         ddl_command="SHOW",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="SHOW: System, Object Type",
     )
 
     plot_summary(
         summary_df,
+        data_key=(data_key, "summary"),
         ddl_command="ALL",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System, DDL Command, Object Type",
         line_dash="ddl_command",
     )
+    if sketch_df is not None:
+        plot_percentiles(sketch_df, data_key=data_key, experiment_name="All Opendic experiments", y_axis_type=y_axis_type)
 
 
-def opendic_batch_dashboard(data_df, selected_db: str):
-    # Filter for 'CREATE' commands and average runtimes
-    create_summary_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=("query_runtime", "sum"))
-    )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "target_object", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
+@tracing.traced
+def opendic_batch_dashboard(stats_df, selected_db: str, data_key, runtime_stats_df=None, band="none"):
+    # Batched CREATE runtimes are summed, the other commands averaged
+    summaries = aggregation.split_by_command(stats_df, agg_spec={"CREATE": "sum"})
+    create_summary_df = summaries["CREATE"]
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
     summary_df = pd.concat([create_summary_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Add y-axis type control to sidebar
     y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
 
-    plot_create(create_summary_df, experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(alter_summary_df, "ALTER", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(comment_summary_df, "COMMENT", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_ddl(show_summary_df, "SHOW", experiment_name=selected_db, y_axis_type=y_axis_type)
-    plot_summary(summary_df, ddl_command="SUMMARY", experiment_name=selected_db, y_axis_type=y_axis_type)
-
-
-def opendic_batch_compare_all_dashboard(data_df):
-    create_summary_df = (
-        data_df[data_df["ddl_command"] == "CREATE"]
-        .groupby(["granularity", "system_name", "ddl_command", "target_object"], as_index=False)
-        .agg(avg_runtime=("query_runtime", "sum"))
+    plot_create(
+        create_summary_df,
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "create_summary"),
+    )
+    plot_ddl(
+        alter_summary_df,
+        "ALTER",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "alter_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
     )
-    alter_summary_df = (
-        data_df[data_df["ddl_command"] == "ALTER"]
-        .groupby(["granularity", "system_name", "ddl_command", "target_object"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+    plot_ddl(
+        comment_summary_df,
+        "COMMENT",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "comment_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
     )
-    comment_summary_df = (
-        data_df[data_df["ddl_command"] == "COMMENT"]
-        .groupby(["granularity", "system_name", "ddl_command", "target_object"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+    plot_ddl(
+        show_summary_df,
+        "SHOW",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
+        data_key=(data_key, "show_summary"),
+        runtime_stats_df=runtime_stats_df,
+        band=band,
     )
-    show_summary_df = (
-        data_df[data_df["ddl_command"] == "SHOW"]
-        .groupby(["granularity", "system_name", "ddl_command", "target_object"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+    plot_summary(
+        summary_df,
+        data_key=(data_key, "summary"),
+        ddl_command="SUMMARY",
+        experiment_name=selected_db,
+        y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
     )
+
+
+@tracing.traced
+def opendic_batch_compare_all_dashboard(stats_df, data_key, sketch_df=None):
+    # Order by granularity so the histogram bars appear in ascending granularity
+    stats_df = stats_df.sort_values("granularity", kind="stable")
+    # Batched CREATE runtimes are summed, the other commands averaged
+    summaries = aggregation.split_by_command(stats_df, agg_spec={"CREATE": "sum"})
+    create_summary_df = summaries["CREATE"]
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
     # Combine all summaries
     all_df = pd.concat([create_summary_df, alter_summary_df, comment_summary_df, show_summary_df])
 
     # Create a summary_df that averages across target_object
-    summary_df = all_df.groupby(["granularity", "system_name", "ddl_command"], as_index=False).agg(
+    summary_df = all_df.groupby(["granularity", "system_name", "ddl_command"], as_index=False, observed=True).agg(
         avg_runtime=("avg_runtime", "mean")
     )
 
@@ -396,6 +716,7 @@ def opendic_batch_compare_all_dashboard(data_df):
 
     plot_histo(
         summary_df,
+        data_key=(data_key, "summary"),
         ddl_command="ALL",
         experiment_name="All standard datasystems",
         y_axis_type=y_axis_type,
@@ -406,6 +727,7 @@ def opendic_batch_compare_all_dashboard(data_df):
 
     plot_histo(
         create_summary_df,
+        data_key=(data_key, "create_summary"),
         ddl_command="CREATE",
         experiment_name="BATCHED CREATE with OPENDIC",
         y_axis_type=y_axis_type,
@@ -414,6 +736,7 @@ def opendic_batch_compare_all_dashboard(data_df):
     )
     plot_histo(
         alter_summary_df,
+        data_key=(data_key, "alter_summary"),
         ddl_command="ALTER",
         experiment_name="BATCHED CREATE with OPENDIC",
         y_axis_type=y_axis_type,
@@ -423,6 +746,7 @@ def opendic_batch_compare_all_dashboard(data_df):
 
     plot_histo(
         comment_summary_df,
+        data_key=(data_key, "comment_summary"),
         ddl_command="COMMENT",
         experiment_name="BATCHED CREATE with OPENDIC",
         y_axis_type=y_axis_type,
@@ -432,35 +756,34 @@ def opendic_batch_compare_all_dashboard(data_df):
 
     plot_histo(
         show_summary_df,
+        data_key=(data_key, "show_summary"),
         ddl_command="SHOW",
         experiment_name="BATCHED CREATE with OPENDIC",
         y_axis_type=y_axis_type,
         series_column="system_name",
         legend_title="SHOW: System, Object Type",
     )
+    if sketch_df is not None:
+        plot_percentiles(
+            sketch_df, data_key=data_key, experiment_name="All batched Opendic experiments", y_axis_type=y_axis_type
+        )
 
 
-@st.cache_data
-def chunked_avg_runtime(data_df, chunk_size=20, columns=["system_name", "ddl_command", "target_object"]):
+@cache.keyed_cache
+def chunked_avg_runtime(_data_df, data_key, chunk_size=20, columns=["system_name", "ddl_command", "target_object"]):
     """
     Args:
+        data_key: Identifies `_data_df` for the cache (see `cache.keyed_cache`).
         columns: List of columns to group by for computing chunked averages.
     """
-    # Create chunked averages (each row represents the average of 20 rows)
-    # assign chunk IDs to each row
-    create_summary = data_df.reset_index(drop=True)
-    create_summary["chunk_id"] = create_summary.index // chunk_size
-
-    # group by these chunk IDs and compute the average for each chunk
-    return create_summary.groupby(columns + ["chunk_id"], as_index=False).agg(
-        avg_runtime=("avg_runtime", "mean"),
-        granularity=("granularity", lambda x: x.iloc[0]),  # Take the first granularity value from each chunk
-    )
+    # Create chunked averages (each row represents the average of `chunk_size` rows)
+    return downsampling.chunked_mean(_data_df, chunk_size=chunk_size, columns=columns)
 
 
-@st.cache_data
+@cache.keyed_cache
 def plot_summary(
-    data_df,
+    _data_df,
+    data_key,
     experiment_name,
     ddl_command,
     y_axis_type,
@@ -470,10 +793,14 @@ def plot_summary(
     line_dash=None,
     markers: bool = False,
     symbol=None,
+    level_of_detail: lod.LevelOfDetail = lod.LevelOfDetail(),
+    _runtime_stats_df=None,
+    band="none",
 ):
     """
     Args:
-        data_df (pd.DataFrame): Dataframe containing the data to be plotted.
+        _data_df (pd.DataFrame): Dataframe containing the data to be plotted.
+        data_key: Identifies `_data_df` for the cache (see `cache.keyed_cache`).
         experiment_name (str): Name of the experiment. (selected_db)
         ddl_command (str): Type of DDL command.
         y_axis_type (str): Type of y-axis scale. (Log, Linear)
@@ -481,165 +808,104 @@ def plot_summary(
         legend_title (str): Title for the legend. (Legend_title for series)
         line_dash (str): Line style for the plot.
         markers (bool): Whether to show markers on the plot.
+        level_of_detail (lod.LevelOfDetail): Visible range and maximum points per trace.
+        _runtime_stats_df (pd.DataFrame): Runtime statistics per group (see `runtime_stats`), needed for `band`.
+        band (str): Shaded area around the lines (see `figures.BANDS`).
     """
     st.subheader(f"Average Runtime for {ddl_command} Commands in {experiment_name}")
-    with st.expander("Query Data"):
-        st.dataframe(data_df, use_container_width=True)
-
-    fig = px.line(
-        data_df,
-        x="granularity",
-        y="avg_runtime",
-        color=series_column,
+    preview_dataframe(_data_df)
+
+    trace_columns = [column for column in (series_column, line_dash, symbol) if column is not None]
+    plot_df = lod.reduce_traces(_data_df, trace_columns, level_of_detail)
+    if len(plot_df) < len(_data_df):
+        st.caption(f"Showing {len(plot_df):,} of {len(_data_df):,} points")
+    if _runtime_stats_df is not None and band != "none":
+        plot_df = with_runtime_statistics(plot_df, _runtime_stats_df)
+
+    fig = figures.build_figure(
+        "summary",
+        plot_df,
+        data_key=(data_key, level_of_detail),
+        y_axis_type=y_axis_type,
+        series_column=series_column,
+        legend_title=legend_title,
+        legend_orientation=legend_orientation,
         line_dash=line_dash,
         markers=markers,
         symbol=symbol,
-        labels={
-            "target_object": "Target Object",
-            "avg_runtime": "Avg. Runtime (s)",
-            "granularity": "Granularity",
-            "ddl_command": "DDL Command",
-            "system_name": "System Name",
-        },
-        log_y=(y_axis_type == "Log"),  # Apply log scale to y-axis if selected
+        render_mode=lod.render_mode(len(plot_df), level_of_detail),
+        band=band,
     )
-
-    fig.update_layout(
-        legend_title=legend_title,
-        template="plotly_white",
-        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none"),
-        legend=dict(
-            orientation=legend_orientation,
-            xanchor="center",  # anchor at center
-            yanchor="bottom",  # anchor on bottom of text
-            x=0.5,  # horizontal center
-            y=1.0,  # just above the plotting area
-        )
-        if legend_orientation == "h"
-        else None,
-    )
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
-    }
-
     # Display the chart with export configuration
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    show_figure(fig)
 
 
-def plot_create(data_df, experiment_name, y_axis_type):
+@tracing.traced
+def plot_create(
+    data_df, experiment_name, y_axis_type, level_of_detail: lod.LevelOfDetail = lod.LevelOfDetail(), data_key=None
+):
+    """
+    Args:
+        data_key: Identifies `data_df` for the figure cache (see `figures.build_figure`), None disables it.
+    """
     # Create visualization for CREATE commands
     st.subheader(f"Average CREATE Query Runtime by Object & Granularity for {experiment_name.capitalize()}")
-    with st.expander("Query Data"):
-        st.dataframe(data_df, use_container_width=True)
-    fig = px.line(
-        data_df,
-        x="granularity",
-        y="avg_runtime",
-        color="target_object",
-        labels={
-            "target_object": "Target Object",
-            "avg_runtime": "Avg. Runtime (s)",
-            "granularity": "Granularity",
-            "ddl_command": "DDL Command",
-            "system_name": "System Name",
-        },
-        log_y=(y_axis_type == "Log"),  # Apply log scale if selected
-    )
-
-    fig.update_layout(
-        xaxis_tickangle=-45,
-        legend_title="Object Type",
-        template="plotly_white",
-        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none")
-        if y_axis_type == "Log"
-        else dict(
-            title="Avg. Runtime (s)",
-            range=[0, data_df["avg_runtime"].quantile(0.999)],  # Remove blantant outliers
-        ),
-        legend=dict(
-            orientation="h",
-            xanchor="center",  # anchor at center
-            yanchor="bottom",  # anchor on bottom of text
-            x=0.5,  # horizontal center
-            y=1.0,  # just above the plotting area
-        ),
+    preview_dataframe(data_df)
+    plot_df = lod.reduce_traces(data_df, ["target_object"], level_of_detail)
+    if len(plot_df) < len(data_df):
+        st.caption(f"Showing {len(plot_df):,} of {len(data_df):,} points")
+    fig = figures.build_figure(
+        "create",
+        plot_df,
+        data_key=None if data_key is None else (data_key, level_of_detail),
+        y_axis_type=y_axis_type,
+        # Remove blantant outliers from a linear axis
+        y_max=None if y_axis_type == "Log" else float(data_df["avg_runtime"].quantile(0.999)),
+        render_mode=lod.render_mode(len(plot_df), level_of_detail),
     )
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
-    }
-
     # Display the chart with export configuration
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    show_figure(fig)
 
 
-def plot_ddl(data_df, ddl_command, experiment_name, y_axis_type):
+def plot_ddl(
+    data_df,
+    ddl_command,
+    experiment_name,
+    y_axis_type,
+    level_of_detail: lod.LevelOfDetail = lod.LevelOfDetail(),
+    data_key=None,
+    runtime_stats_df=None,
+    band="none",
+):
     """
     Plot the average runtime for `ddl_command` commands
+
+    Args:
+        data_key: Identifies `data_df` for the figure cache (see `figures.build_figure`), None disables it.
+        runtime_stats_df (pd.DataFrame): Runtime statistics per group (see `runtime_stats`), needed for `band`.
+        band (str): Shaded area around the lines (see `figures.BANDS`).
     """
     st.subheader(f"Average Runtime for {ddl_command} Commands in {experiment_name}")
-    with st.expander("Query Data"):
-        st.dataframe(data_df, use_container_width=True)
-
-    fig = px.line(
-        data_df,
-        x="granularity",
-        y="avg_runtime",
-        color="target_object",
-        labels={
-            "target_object": "Target Object",
-            "avg_runtime": "Avg. Runtime (s)",
-            "granularity": "Granularity",
-            "ddl_command": "DDL Command",
-            "system_name": "System Name",
-        },
-        log_y=(y_axis_type == "Log"),  # Apply log scale if selectedm
-    )
-
-    fig.update_layout(
-        legend=dict(
-            orientation="h",
-            xanchor="center",  # anchor at center
-            yanchor="bottom",  # anchor on bottom of text
-            x=0.5,  # horizontal center
-            y=1.0,  # just above the plotting area
-        ),
+    preview_dataframe(data_df)
+
+    plot_df = lod.reduce_traces(data_df, ["target_object"], level_of_detail)
+    if len(plot_df) < len(data_df):
+        st.caption(f"Showing {len(plot_df):,} of {len(data_df):,} points")
+    if runtime_stats_df is not None and band != "none":
+        plot_df = with_runtime_statistics(plot_df, runtime_stats_df)
+    fig = figures.build_figure(
+        "ddl",
+        plot_df,
+        data_key=None if data_key is None else (data_key, level_of_detail),
+        y_axis_type=y_axis_type,
+        render_mode=lod.render_mode(len(plot_df), level_of_detail),
+        band=band,
     )
-
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
-    }
-
     # Display the chart with export configuration
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    show_figure(fig)
 
 
+@tracing.traced
 def plot_histo(
     data_df,
     experiment_name,
@@ -650,6 +916,7 @@ def plot_histo(
     legend_title="DDL Command",
     marginal=None,
     bar_mode="group",
+    data_key=None,
 ):
     """
     Args:
@@ -659,302 +926,373 @@ def plot_histo(
         y_axis_type (str): Type of y-axis scale. (Log, Linear)
         series_column (str): Column name for the series.
         legend_title (str): Title for the legend. (Legend_title for series)
-        line_dash (str): Line style for the plot.
-        markers (bool): Whether to show markers on the plot.
+        data_key: Identifies `data_df` for the figure cache (see `figures.build_figure`), None disables it.
     """
     st.subheader(f"Average Runtime for {ddl_command} Commands in {experiment_name}")
-    with st.expander("Query Data"):
-        st.dataframe(data_df, use_container_width=True)
-
-    # Combine series_column and additional_column if provided
-    if additional_column:
-        data_df["combined_series"] = data_df[series_column] + " | " + data_df[additional_column]
-        color_column = "combined_series"
-    else:
-        color_column = series_column
-    data_df["granularity"] = data_df["granularity"].astype(str)  # Make sure x-axis is string not int
+    preview_dataframe(data_df)
 
-    fig = px.histogram(
+    fig = figures.build_figure(
+        "histogram",
         data_df,
-        x="granularity",
-        y="avg_runtime",
-        color=color_column,
-        labels={
-            "target_object": "Target Object",
-            "avg_runtime": "Avg. Runtime (s)",
-            "granularity": "Granularity",
-            "ddl_command": "DDL Command",
-            "system_name": "System Name",
-        },
+        data_key=data_key,
+        y_axis_type=y_axis_type,
+        series_column=series_column,
+        additional_column=additional_column,
+        legend_title=legend_title,
         marginal=marginal,
-        log_y=(y_axis_type == "Log"),  # Apply log scale to y-axis if selected
+        bar_mode=bar_mode,
     )
+    # Display the chart with export configuration
+    show_figure(fig)
 
-    fig.update_layout(
-        legend_title=legend_title,
-        template="plotly_white",
-        barmode=bar_mode,
-        yaxis=dict(title="Avg. Runtime (s)", exponentformat="none"),
-        legend=dict(
-            orientation="h",
-            x=0.5,  # horizontal center
-            xanchor="center",
-            y=1.0,  # just above the plotting area
-            yanchor="bottom",
-            font=dict(
-                size=9  # Adjust this value to your preference (smaller number = smaller text)
-            ),
-        ),
-    )
 
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
-    }
+@cache.shared_data(ttl="1h")
+def load_runtime_aggregates(datafiles: list[str], data_key=None):
+    # The TLDR plots compare systems per DDL command and granularity
+    if ingest.dataset_covers(datafiles):
+        # One summary per partition of the ingested dataset instead of one sidecar per file
+        summaries_df = ingest.load_summaries()
+        return schema.add_system_columns(summary_store.combine_aggregates([summaries_df], TLDR_GROUP_COLUMNS))
+    return aggregation.load_file_aggregates(datafiles, group_columns=TLDR_GROUP_COLUMNS)
+
 
+@cache.shared_data(ttl="1h")
+def load_runtime_sketches(datafiles: list[str], data_key=None):
+    if ingest.dataset_covers(datafiles):
+        return sketch_store.merge_sketches([ingest.load_sketches()], group_columns=PERCENTILE_GROUP_COLUMNS)
+    # Each file keeps its sketches in a sidecar, merging them takes memory per bucket instead of per run
+    sketch_dfs = loader.map_files(sketch_store.load_sketches, datafiles)
+    return sketch_store.merge_sketches(sketch_dfs, group_columns=PERCENTILE_GROUP_COLUMNS)
+
+
+@cache.keyed_cache
+def plot_percentiles(_sketch_df, data_key, experiment_name: str, y_axis_type: str):
+    """
+    Plots p50, p90 and p99 of the runtime per system, DDL command and granularity bucket.
+
+    Args:
+        _sketch_df (pd.DataFrame): Sketches merged onto `PERCENTILE_GROUP_COLUMNS` (see `load_runtime_sketches`).
+        data_key: Identifies `_sketch_df` for the cache (see `cache.keyed_cache`).
+    """
+    st.subheader(f"Runtime Percentiles in {experiment_name}")
+    percentiles_df = sketch_store.sketch_percentiles(_sketch_df, PERCENTILE_GROUP_COLUMNS)
+    preview_dataframe(percentiles_df, "Percentile Data")
+    st.caption(
+        f"Merged from log-bucket sketches, within {runtime_stats.RELATIVE_ACCURACY:.0%} of the exact percentiles. "
+        f"Granularities are bucketed logarithmically ({sketch_store.BUCKETS_PER_DECADE} buckets per power of ten)."
+    )
+
+    long_df = percentiles_df.melt(
+        id_vars=PERCENTILE_GROUP_COLUMNS,
+        value_vars=runtime_stats.quantile_columns(),
+        var_name="percentile",
+        value_name="runtime",
+    )
+    fig = figures.build_figure("percentiles", long_df, data_key=(data_key, "percentiles"), y_axis_type=y_axis_type)
     # Display the chart with export configuration
-    st.plotly_chart(fig, use_container_width=True, config=config)
+    show_figure(fig)
 
 
-@st.cache_data(ttl="1h")
-def load_data():
+@tracing.traced
+def create_tldr_dashboard(category_map: dict[str, str]):
     datafiles = []
     for path in category_map.values():
         path_data_files = [path + f for f in os.listdir(path) if f.endswith(".parquet")]
         datafiles.extend(path_data_files)
+    # Identifies the TLDR data for the caches, so the large frame is never hashed
+    data_key = disk_cache.fingerprint(datafiles)
 
-    data_df = pd.concat(
-        [pd.read_parquet(data_file, engine="pyarrow") for data_file in datafiles],
-        ignore_index=False,
+    runtime_df = load_runtime_aggregates(datafiles, data_key=data_key)
+    raw_data_viewer(datafiles, data_key, runtime_df, key="tldr")
+
+    y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
+    level_of_detail = level_of_detail_controls()
+
+    plot_001_histo_experiment_total_runtime(runtime_df, data_key=data_key)
+    plot_002_all_create_dashboard(runtime_df, data_key=data_key, y_axis_type=y_axis_type, level_of_detail=level_of_detail)
+    storage_files = storage_collector.storage_files()
+    if storage_files:
+        storage_key = disk_cache.fingerprint(storage_files)
+        plot_004_storage_growth(load_storage(data_key=storage_key), data_key=storage_key, y_axis_type=y_axis_type)
+    else:
+        # Nothing collected yet, fall back to the footprints measured after the full runs
+        plot_004_storage(
+            storage_data.df_storage, data_key=disk_cache.fingerprint([storage_data.__file__]), y_axis_type=y_axis_type
+        )
+    plot_003_all_alter_commet_show(runtime_df, data_key=data_key, y_axis_type=y_axis_type, level_of_detail=level_of_detail)
+    plot_percentiles(
+        load_runtime_sketches(datafiles, data_key=data_key),
+        data_key=data_key,
+        experiment_name="ALL",
+        y_axis_type=y_axis_type,
     )
-    with st.expander("View Raw Data (Partial of file size)"):
-        st.dataframe(data_df.iloc[::10], use_container_width=True)
-    return data_df
+    plot_scaling(runtime_df, data_key=data_key, experiment_name="ALL", **scaling_controls())
 
 
-def create_tldr_dashboard(category_map: dict[str, str]):
-    data_df = load_data()
+def plot_005_opendic_optimization_overview(data_df, y_axis_type):
+    # Label the systems without polaris, leaving the (possibly cached) frame untouched
+    data_df = schema.add_system_columns(data_df)
+    preview_dataframe(data_df.assign(system_name=data_df["system_label"]), "Show Raw Data")
 
-    y_axis_type = st.sidebar.selectbox("Y-axis scale", options=["Linear", "Log"], index=1)
 
-    plot_001_histo_experiment_total_runtime(data_df=data_df)
-    plot_002_all_create_dashboard(data_df=data_df, y_axis_type=y_axis_type)
-    plot_004_storage(data_df=storage_data.df_storage, y_axis_type=y_axis_type)
-    plot_003_all_alter_commet_show(data_df=data_df, y_axis_type=y_axis_type)
+@cache.shared_data(ttl="1h")
+def load_storage(data_key=None):
+    return storage_collector.load_storage()
 
 
-def plot_005_opendic_optimization_overview(data_df, y_axis_type):
-    # Remove polaris from system names
-    data_df["system_name"] = data_df["system_name"].str.replace("_polaris", "", regex=True)
+@cache.keyed_cache
+def plot_004_storage_growth(_storage_df, data_key, y_axis_type: str):
+    """
+    Plots the storage footprint per granularity step recorded by `storage_collector`.
 
-    with st.expander("Show Raw Data"):
-        st.dataframe(data_df)
+    Args:
+        _storage_df (pd.DataFrame): Steps of all systems (see `storage_collector.load_storage`).
+        data_key: Identifies `_storage_df` for the cache (see `cache.keyed_cache`).
+    """
+    st.subheader("Storage Growth by Granularity")
+    preview_dataframe(_storage_df, "Show Raw Data")
+
+    fig = figures.build_figure("storage_growth", _storage_df, data_key=data_key, y_axis_type=y_axis_type)
+    # Display the chart with export configuration
+    show_figure(fig)
 
 
-@st.cache_data
-def plot_004_storage(data_df, y_axis_type: str):
+@cache.keyed_cache
+def plot_004_storage(_data_df, data_key, y_axis_type: str):
     # Display the raw data
     with st.expander("Show Raw Data"):
-        st.dataframe(data_df)
-
-    fig_storage = px.bar(
-        data_df,
-        x="Database System",
-        y="Storage Usage (GB)",
-        color="Database System",
-        title="Storage Usage by Datasystem System (GB)",
-        log_y=(y_axis_type == "Log"),
-        labels={
-            "Database System": "Data System",
-            "Storage Usage (GB)": "Storage Usage (GB)",
-            "Metadatafiles Count": "Metadatafiles",
-            "Datafiles Count": "Datafiles",
-        },
-        hover_data={
-            "Database System": True,
-            "Storage Usage (GB)": True,
-            "Metadatafiles Count": True,
-            "Datafiles Count": True,
-        },
-    )
-    fig_storage.update_layout(
-        xaxis_title="System",
-        yaxis_title="Storage Usage (GB)",
-        legend=dict(
-            orientation="h",
-            x=0.5,  # horizontal center
-            xanchor="center",
-            y=1.0,  # just above the plotting area
-            yanchor="bottom",
-        ),
-    )
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
-    }
+        show_dataframe(_data_df)
 
+    fig_storage = figures.build_figure("storage", _data_df, data_key=data_key, y_axis_type=y_axis_type)
     # Display the chart with export configuration
-    st.plotly_chart(fig_storage, use_container_width=True, config=config)
+    show_figure(fig_storage)
 
 
-@st.cache_data
-def plot_003_all_alter_commet_show(data_df, y_axis_type: str):
-    processed_df = data_df.copy()
-    # Remove "_batch" and "_cache" from system_names
-    processed_df["system_name"] = processed_df["system_name"].str.replace("_batch|_cache", "", regex=True)
-
-    alter_summary_df = (
-        processed_df[processed_df["ddl_command"] == "ALTER"]
-        .groupby(["system_name", "ddl_command", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
-    )
-    comment_summary_df = (
-        processed_df[processed_df["ddl_command"] == "COMMENT"]
-        .groupby(["system_name", "ddl_command", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+@cache.keyed_cache
+def plot_003_all_alter_commet_show(_runtime_df, data_key, y_axis_type: str, level_of_detail: lod.LevelOfDetail):
+    # Merge the runs of the batched and cached variants into their system
+    runtime_df = summary_store.combine_aggregates([_runtime_df], ["system_family", *TLDR_GROUP_COLUMNS[1:]]).rename(
+        columns={"system_family": "system_name"}
     )
-    show_summary_df = (
-        processed_df[processed_df["ddl_command"] == "SHOW"]
-        .groupby(["system_name", "ddl_command", "granularity"], as_index=False)
-        .agg(avg_runtime=(("query_runtime"), "mean"))
+
+    summaries = aggregation.split_by_command(
+        runtime_df, group_columns=TLDR_GROUP_COLUMNS, ddl_commands=("ALTER", "COMMENT", "SHOW")
     )
+    alter_summary_df = summaries["ALTER"]
+    comment_summary_df = summaries["COMMENT"]
+    show_summary_df = summaries["SHOW"]
 
     plot_summary(
         alter_summary_df,
+        data_key=(data_key, "alter_summary"),
         ddl_command="ALTER",
         experiment_name="ALL",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System Name",
     )
 
     plot_summary(
         comment_summary_df,
+        data_key=(data_key, "comment_summary"),
         ddl_command="COMMENT",
         experiment_name="ALL",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System Name",
     )
 
     plot_summary(
         show_summary_df,
+        data_key=(data_key, "show_summary"),
         ddl_command="SHOW",
         experiment_name="ALL",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System Name",
     )
 
 
-@st.cache_data(ttl="1h")
-def plot_002_all_create_dashboard(data_df, y_axis_type: str):
-    create_df = (
-        data_df[
-            (data_df["ddl_command"] == "CREATE")
-            & (~data_df["system_name"].str.contains("batch", case=False, na=False))
-            & (~data_df["system_name"].str.contains("cache", case=False, na=False))
-        ]
-        .groupby(["system_name", "ddl_command", "granularity"], as_index=False)
-        .agg(avg_runtime=("query_runtime", "mean"))
+@cache.keyed_cache(ttl="1h")
+def plot_002_all_create_dashboard(_runtime_df, data_key, y_axis_type: str, level_of_detail: lod.LevelOfDetail):
+    runtime_df = _runtime_df[
+        (~_runtime_df["system_name"].str.contains("batch", case=False, na=False))
+        & (~_runtime_df["system_name"].str.contains("cache", case=False, na=False))
+    ]
+    create_df = aggregation.split_by_command(runtime_df, group_columns=TLDR_GROUP_COLUMNS, ddl_commands=("CREATE",))[
+        "CREATE"
+    ]
+    create_summary_df = chunked_avg_runtime(
+        create_df, data_key=(data_key, "create"), chunk_size=50, columns=["system_name", "ddl_command"]
     )
-    create_summary_df = chunked_avg_runtime(create_df, chunk_size=50, columns=["system_name", "ddl_command"])
 
     plot_summary(
         create_summary_df,
+        data_key=(data_key, "create_summary"),
         ddl_command="CREATE",
         experiment_name="ALL",
         y_axis_type=y_axis_type,
+        level_of_detail=level_of_detail,
         series_column="system_name",
         legend_title="System Name",
     )
 
 
-@st.cache_data(ttl="1h")
-def plot_001_histo_experiment_total_runtime(data_df):
+@cache.keyed_cache(ttl="1h")
+def plot_001_histo_experiment_total_runtime(_runtime_df, data_key):
     """
     Plots the total runtime for each experiment/database as a horizontal bar chart.
 
     Args:
-        data_df (pd.DataFrame): Dataframe containing the benchmark data.
-        y_axis_type (str): Type of y-axis scale (Linear or Log).
+        _runtime_df (pd.DataFrame): Runtime aggregates per `TLDR_GROUP_COLUMNS` group.
+        data_key: Identifies `_runtime_df` for the cache (see `cache.keyed_cache`).
     """
     st.subheader("Total Runtime by Experiment/Database")
 
-    # Remove polaris from system names
-    data_df["system_name"] = data_df["system_name"].str.replace("_polaris", "", regex=True)
-
-    # Calculate average runtime for each unique operation to account for repetitions
-    avg_runtime_df = data_df.groupby(["system_name", "ddl_command", "granularity"], as_index=False).agg(
-        avg_runtime=("query_runtime", "mean")
-    )
+    # Label the systems without polaris, the average runtime of each unique operation accounts for repetitions
+    avg_runtime_df = summary_store.combine_aggregates([_runtime_df], ["system_label", *TLDR_GROUP_COLUMNS[1:]])
 
     # Sum the average runtimes for each system to get total runtime
     total_runtime_df = (
-        avg_runtime_df.groupby("system_name", as_index=False)
-        .agg(total_runtime=("avg_runtime", "sum"))
+        avg_runtime_df.groupby("system_label", as_index=False, observed=True)
+        .agg(total_runtime=("mean", "sum"))
+        .rename(columns={"system_label": "system_name"})
         .sort_values("total_runtime", ascending=True)
     )  # Sort for better visualization
 
     total_runtime_df["total_runtime"] = (total_runtime_df["total_runtime"] / 60 / 60).round(4)
 
     with st.expander("View Total Runtime Data"):
-        st.dataframe(total_runtime_df, use_container_width=True)
+        show_dataframe(total_runtime_df, use_container_width=True)
 
     # Create horizontal bar chart
-    fig = px.bar(
-        total_runtime_df,
-        y="system_name",
-        x="total_runtime",
-        orientation="h",
-        labels={"system_name": "Database/Experiment", "total_runtime": "Total Runtime (hours)"},
-        color="system_name",  # Color bars by system name
-    )
-
-    fig.update_layout(
-        template="plotly_white",
-        showlegend=False,  # No need for legend as y-axis shows the system names
-        xaxis=dict(title="Total Runtime (hours)"),
-    )
-
-    # Add SVG export capability
-    # Add a config to enable SVG export via the modebar
-    config = {
-        "toImageButtonOptions": {
-            "format": "svg",  # Default to svg format
-            "filename": "total_runtime_chart",
-            # "height": 500,
-            # "width": 1000,
-            "scale": 1,
-        },
-        "displaylogo": False,
-        "modeBarButtonsToAdd": ["downloadSVG"],
+    fig = figures.build_figure("total_runtime", total_runtime_df, data_key=data_key)
+    # Display the chart with export configuration
+    show_figure(fig)
+
+
+@cache.shared_data(ttl="1h")
+def load_regression_report(
+    baseline_files: list[str],
+    candidate_files: list[str],
+    match_systems: bool,
+    alpha: float,
+    min_slowdown: float,
+    data_key=None,
+):
+    # Both runs are compared on their aggregates, which are cached as sidecars next to the files
+    return regression.compare_aggregates(
+        aggregation.load_file_aggregates(baseline_files),
+        aggregation.load_file_aggregates(candidate_files),
+        group_columns=summary_store.GROUP_COLUMNS if match_systems else summary_store.GROUP_COLUMNS[1:],
+        alpha=alpha,
+        min_slowdown=min_slowdown,
+    )
+
+
+@tracing.traced
+def create_regression_dashboard(category_map: dict[str, str]):
+    """
+    Ranks the groups of a candidate run that got significantly slower than in a baseline run.
+    """
+    experiment_files = {
+        f"{category}: {os.path.splitext(f)[0]}": path + f
+        for category, path in category_map.items()
+        for f in sorted(os.listdir(path))
+        if f.endswith(".parquet")
     }
+    experiments = list(experiment_files)
+    baseline = st.sidebar.selectbox("Baseline run", options=experiments, index=0)
+    candidate = st.sidebar.selectbox("Candidate run", options=experiments, index=min(1, len(experiments) - 1))
+    # Reruns of a system are matched per system, otherwise two systems are compared against each other
+    match_systems = st.sidebar.checkbox("Match system names", value=False)
+    alpha = st.sidebar.number_input("False discovery rate", 0.001, 0.5, value=regression.ALPHA, step=0.01, format="%.3f")
+    min_slowdown = st.sidebar.number_input("Minimum slowdown", 0.0, 10.0, value=regression.MIN_SLOWDOWN, step=0.05)
+
+    baseline_files, candidate_files = [experiment_files[baseline]], [experiment_files[candidate]]
+    report_df = load_regression_report(
+        baseline_files,
+        candidate_files,
+        match_systems,
+        alpha,
+        min_slowdown,
+        data_key=disk_cache.fingerprint(baseline_files + candidate_files),
+    )
+
+    st.subheader(f"Regressions of {candidate} against {baseline}")
+    n_regressions = int(report_df["regression"].sum())
+    st.caption(
+        f"{n_regressions:,} of {len(report_df):,} compared groups got at least {min_slowdown:.0%} slower "
+        f"(one-sided Welch t-test, false discovery rate {alpha:g})."
+    )
+    if n_regressions:
+        fig = figures.build_figure("regression", report_df)
+        show_figure(fig)
+
+    show_dataframe(regression.summarize_regressions(report_df), use_container_width=True)
+    preview_dataframe(report_df, "All compared groups")
+    st.download_button(
+        "Download report (JSON)",
+        data=json.dumps(
+            regression.report_json(
+                report_df, baseline=baseline_files, candidate=candidate_files, alpha=alpha, min_slowdown=min_slowdown
+            ),
+            indent=2,
+        ),
+        file_name="regression_report.json",
+        mime="application/json",
+    )
 
-    # Display the chart with export configuration
-    st.plotly_chart(fig, use_container_width=True, config=config)
+
+def trace_panel(trace: tracing.Trace):
+    """
+    Sidebar panel with the waterfall of the stages of this rerun and an export of the recent reruns.
+    """
+    # Keep the last reruns of the session, so a sequence of interactions can be exported as one trace
+    traces = st.session_state.setdefault("traces", [])
+    traces.append(trace)
+    del traces[:-TRACE_HISTORY]
+
+    spans_df = tracing.spans_frame(trace)
+    with st.sidebar.expander("Performance Trace", expanded=True):
+        cache_counts = spans_df["cache"].value_counts()
+        st.caption(
+            f"Rerun took {trace.duration * 1000:,.0f} ms, RSS {(tracing.current_rss() - trace.rss_start) / 1024**2:+,.1f} MiB. "
+            f"Cache hits: {cache_counts.get('hit', 0)}, misses: {cache_counts.get('miss', 0)}."
+        )
+        st.plotly_chart(figures.trace_figure(spans_df), use_container_width=True, config=figures.CONFIG)
+        st.dataframe(spans_df, use_container_width=True)
+        st.download_button(
+            f"Export last {len(traces)} rerun(s) (Chrome trace)",
+            data=json.dumps(tracing.chrome_trace(traces)),
+            file_name="opendic_dashboard_trace.json",
+            mime="application/json",
+        )
 
 
 if __name__ == "__main__":
+    # `cache.shared_data` hands out shallow copies of cached frames, only copy-on-write keeps writes to them from
+    # reaching the cache. It is always on from pandas 3, where the option is deprecated, and has to be enabled on pandas 2.
+    if int(pd.__version__.split(".")[0]) < 3:
+        pd.set_option("mode.copy_on_write", True)
+
     category_map = {"Standard": "data/standard/", "Opendic": "data/opendic/", "Opendic(Batch)": "data/opendic_batch/"}
 
-    if sidebar_category != "TLDR":
-        create_dashboard(category_map[sidebar_category])
-    else:
+    trace_enabled = st.sidebar.toggle("Trace this page", value=False)
+    if trace_enabled:
+        tracing.start_trace(sidebar_category)
+
+    if sidebar_category == "TLDR":
         create_tldr_dashboard(category_map)
+    elif sidebar_category == "Regressions":
+        create_regression_dashboard(category_map)
+    else:
+        create_dashboard(category_map[sidebar_category])
+
+    with st.sidebar.expander("Cache Statistics"):
+        st.dataframe(cache.stats_frame(), use_container_width=True)
+    if trace_enabled:
+        trace_panel(tracing.stop_trace())
@@ -0,0 +1,69 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import pytest
+
+from opendic_benchmark_dashboard import disk_cache
+
+TARGET_OBJECTS = ["table", "view", "function"]
+
+
+def make_runs(system_name: str, rows: int = 600, seed: int = 0, max_granularity: int = 100) -> pa.Table:
+    """
+    Synthetic runs of one system with the columns of the real benchmark files.
+    """
+    rng = np.random.default_rng(seed)
+    ddl_command = rng.choice(["CREATE", "ALTER", "COMMENT", "SHOW"], rows)
+    target_object = rng.choice(TARGET_OBJECTS, rows)
+    granularity = (np.arange(rows) % max_granularity).astype(np.int32)
+    query_runtime = rng.lognormal(np.log(0.002), 0.3, rows) * (1 + 0.01 * granularity)
+    start_time = np.datetime64("2025-05-01T00:00:00", "us") + np.cumsum((query_runtime * 1e6).astype("timedelta64[us]"))
+    return pa.table(
+        {
+            "system_name": pa.array(np.full(rows, system_name)),
+            "ddl_command": pa.array(ddl_command),
+            "query_text": pa.array(np.char.add(np.char.add(ddl_command, " "), target_object)),
+            "target_object": pa.array(target_object),
+            "granularity": pa.array(granularity),
+            "repetition_nr": pa.array(rng.integers(0, 3, rows, dtype=np.int32)),
+            "query_runtime": pa.array(query_runtime),
+            "start_time": pa.array(start_time),
+            "end_time": pa.array(start_time + (query_runtime * 1e6).astype("timedelta64[us]")),
+        }
+    )
+
+
+@pytest.fixture
+def write_runs(tmp_path):
+    """
+    Writes synthetic runs to `<tmp_path>/<folder>/<file_name or system_name>.parquet` and returns the path.
+    """
+
+    def write(
+        system_name: str,
+        folder: str = "standard",
+        file_name: str | None = None,
+        drop_commands=(),
+        sort_by: str | None = None,
+        row_group_size: int | None = None,
+        **kwargs,
+    ) -> str:
+        data_dir = tmp_path / folder
+        data_dir.mkdir(parents=True, exist_ok=True)
+        data_file = str(data_dir / f"{file_name or system_name}.parquet")
+        table = make_runs(system_name, **kwargs)
+        if drop_commands:
+            table = table.filter(pc.invert(pc.is_in(table["ddl_command"], pa.array(list(drop_commands)))))
+        if sort_by is not None:
+            table = table.sort_by(sort_by)
+        pq.write_table(table, data_file, row_group_size=row_group_size)
+        return data_file
+
+    return write
+
+
+@pytest.fixture(autouse=True)
+def isolated_disk_cache(tmp_path, monkeypatch):
+    # The default cache lives in the home dir, tests get their own
+    monkeypatch.setattr(disk_cache.default_cache, "cache_dir", str(tmp_path / "disk_cache"))
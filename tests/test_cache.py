@@ -0,0 +1,27 @@
+from collections import OrderedDict
+
+import pandas as pd
+
+from opendic_benchmark_dashboard import cache
+
+
+def test_hash_estimates_are_bounded(monkeypatch):
+    monkeypatch.setattr(cache, "HASH_ESTIMATE_CACHE_SIZE", 3)
+    monkeypatch.setattr(cache, "_hash_seconds", OrderedDict())
+
+    @cache.keyed_cache
+    def row_count(_data_df, data_key):
+        return len(_data_df)
+
+    data_df = pd.DataFrame({"query_runtime": range(100)})
+    for data_key in range(5):
+        assert row_count(data_df, data_key=data_key) == 100
+    assert list(cache._hash_seconds) == [(row_count.__qualname__, data_key) for data_key in (2, 3, 4)]
+
+    # A hit refreshes its estimate, so the next miss evicts the older key 3
+    row_count(data_df, data_key=2)
+    row_count(data_df, data_key=5)
+    assert [key for _, key in cache._hash_seconds] == [4, 2, 5]
+    stats = cache.cache_stats[row_count.__qualname__]
+    assert (stats.hits, stats.misses) == (1, 6)
+    row_count.clear()
@@ -0,0 +1,61 @@
+import os
+
+import pyarrow as pa
+
+from opendic_benchmark_dashboard import disk_cache
+
+
+def cached_files(cache_dir) -> list[str]:
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(".arrow"))
+
+
+def test_get_or_compute_computes_once(tmp_path):
+    table_cache = disk_cache.DiskCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return pa.table({"x": [1, 2, 3]})
+
+    assert table_cache.get_or_compute(("key",), compute).to_pydict() == {"x": [1, 2, 3]}
+    assert table_cache.get_or_compute(("key",), compute).to_pydict() == {"x": [1, 2, 3]}
+    assert len(calls) == 1
+    assert len(cached_files(tmp_path)) == 1
+
+
+def test_empty_tables_are_served_from_the_cache(tmp_path):
+    table_cache = disk_cache.DiskCache(str(tmp_path))
+    empty = pa.table({"x": pa.array([], pa.int64())})
+    assert table_cache.get_or_compute(("empty",), lambda: empty).num_rows == 0
+    assert table_cache.get(("empty",)) is not None
+
+
+def test_tables_larger_than_the_budget_are_not_written(tmp_path):
+    table_cache = disk_cache.DiskCache(str(tmp_path), max_bytes=1024)
+    large = pa.table({"x": list(range(1000))})
+    assert table_cache.get_or_compute(("large",), lambda: large) is large
+    assert not os.path.exists(tmp_path) or cached_files(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    table = pa.table({"x": list(range(100))})
+    probe = disk_cache.DiskCache(str(tmp_path / "probe"))
+    probe.put(("probe",), table)
+    entry_bytes = os.path.getsize(probe.path(("probe",)))
+
+    table_cache = disk_cache.DiskCache(str(tmp_path / "cache"), max_bytes=3 * entry_bytes)
+    for i in range(3):
+        table_cache.put((i,), table)
+        os.utime(table_cache.path((i,)), (i, i))
+    # Reading an entry makes it the most recently used one
+    assert table_cache.get((0,)) is not None
+    table_cache.put((3,), table)
+    assert table_cache.get((1,)) is None
+    assert all(table_cache.get((i,)) is not None for i in (0, 2, 3))
+
+
+def test_unwritable_cache_returns_the_computed_table(tmp_path):
+    (tmp_path / "file").write_text("")
+    table_cache = disk_cache.DiskCache(str(tmp_path / "file" / "cache"))
+    table = pa.table({"x": [1]})
+    assert table_cache.get_or_compute(("key",), lambda: table) is table
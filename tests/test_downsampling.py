@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from opendic_benchmark_dashboard import aggregation, downsampling, loader, summary_store
+
+
+def legacy_chunked_avg_runtime(data_df, chunk_size=20, columns=["system_name", "ddl_command", "target_object"]):
+    # The implementation before the reduceat rewrite
+    create_summary = data_df.reset_index(drop=True)
+    create_summary["chunk_id"] = create_summary.index // chunk_size
+    return create_summary.groupby(columns + ["chunk_id"], as_index=False, observed=True).agg(
+        avg_runtime=("avg_runtime", "mean"),
+        granularity=("granularity", lambda x: x.iloc[0]),
+    )
+
+
+@pytest.fixture
+def create_df(write_runs):
+    data_files = [write_runs("sqlite", seed=0, rows=3000, max_granularity=1000), write_runs("duckdb", seed=1, rows=2000)]
+    aggregates_df = summary_store.compute_aggregates(loader.read_benchmark_data(data_files))
+    return aggregation.split_by_command(aggregates_df)["CREATE"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 20, 1000])
+def test_chunked_mean_matches_the_legacy_groupby(create_df, chunk_size):
+    pd.testing.assert_frame_equal(
+        downsampling.chunked_mean(create_df, chunk_size),
+        legacy_chunked_avg_runtime(create_df, chunk_size),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_chunked_mean_matches_the_legacy_groupby_on_unordered_rows(create_df):
+    shuffled_df = create_df.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(
+        downsampling.chunked_mean(shuffled_df, 20),
+        legacy_chunked_avg_runtime(shuffled_df, 20),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_rows_with_missing_keys_are_dropped_like_the_groupby(create_df):
+    data_df = create_df.astype({"target_object": object}).reset_index(drop=True)
+    data_df.loc[::5, "target_object"] = None
+    data_df.loc[3, "system_name"] = np.nan
+
+    expected_df = legacy_chunked_avg_runtime(data_df, 20)
+    pd.testing.assert_frame_equal(
+        downsampling.chunked_mean(data_df, 20), expected_df, check_dtype=False, check_categorical=False
+    )
+
+    envelope_df = downsampling.chunked_envelope(data_df, 20)
+    percentiles_df = downsampling.chunked_percentiles(data_df, 20)
+    assert len(envelope_df) == len(percentiles_df) == len(expected_df)
+    assert envelope_df["target_object"].notna().all()
+    assert (envelope_df["avg_runtime_min"] <= envelope_df["avg_runtime"]).all()
+    assert (envelope_df["avg_runtime"] <= envelope_df["avg_runtime_max"]).all()
+
+
+def test_chunked_percentiles_match_numpy(create_df):
+    percentiles_df = downsampling.chunked_percentiles(create_df, 20, quantiles=(0.1, 0.5, 0.9))
+    legacy_df = create_df.reset_index(drop=True).assign(chunk_id=lambda df: df.index // 20)
+    expected = legacy_df.groupby(["system_name", "ddl_command", "target_object", "chunk_id"], observed=True)[
+        "avg_runtime"
+    ].quantile([0.1, 0.5, 0.9])
+    np.testing.assert_allclose(
+        percentiles_df[["avg_runtime_p10", "avg_runtime_p50", "avg_runtime_p90"]].to_numpy().ravel(), expected.to_numpy()
+    )
+
+
+def test_lttb_keeps_the_end_points_and_the_budget():
+    x = np.arange(1000)
+    y = np.sin(x / 30) + (x == 500) * 5
+    kept = downsampling.lttb_indices(x, y, 50)
+    assert len(kept) == 50 and kept[0] == 0 and kept[-1] == 999
+    assert np.all(np.diff(kept) > 0)
+    assert 500 in kept
@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from opendic_benchmark_dashboard import atomic_io, ingest, loader, sketch_store, summary_store
+
+
+def dataset_parts(dataset_dir) -> list[str]:
+    return sorted(
+        os.path.relpath(os.path.join(folder, name), dataset_dir)
+        for folder, _, names in os.walk(dataset_dir)
+        for name in names
+        if not name.startswith(("_", "."))
+    )
+
+
+def test_write_atomic_replaces_and_cleans_up(tmp_path):
+    path = tmp_path / "_manifest.json"
+    atomic_io.write_atomic(str(path), lambda tmp_path: open(tmp_path, "w").write("old"))
+    atomic_io.write_atomic(str(path), lambda tmp_path: open(tmp_path, "w").write("new"))
+    assert path.read_text() == "new"
+
+    def fail(tmp_path):
+        open(tmp_path, "w").write("partial")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        atomic_io.write_atomic(str(path), fail)
+    assert path.read_text() == "new"
+    assert os.listdir(tmp_path) == ["_manifest.json"]
+
+
+def test_ingest_skips_unchanged_files(tmp_path, write_runs):
+    write_runs("sqlite", seed=0)
+    write_runs("duckdb", seed=1)
+    dataset_dir = str(tmp_path / "dataset")
+
+    first = ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    assert len(first["ingested"]) == 2 and first["skipped"] == 0
+    parts = dataset_parts(dataset_dir)
+
+    second = ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    assert second == {"ingested": [], "skipped": 2, "partitions": []}
+    assert dataset_parts(dataset_dir) == parts
+
+
+def test_rewritten_file_replaces_its_parts(tmp_path, write_runs):
+    data_file = write_runs("sqlite", seed=0)
+    write_runs("duckdb", seed=1)
+    dataset_dir = str(tmp_path / "dataset")
+    ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    old_hash = summary_store.file_content_hash(data_file)
+
+    # Fewer rows and no ALTER runs, the ALTER partition of the system must disappear
+    write_runs("sqlite", seed=2, rows=300, drop_commands=["ALTER"])
+    runs = loader.read_benchmark_data([data_file])
+    report = ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    assert report["ingested"] == [os.path.normpath(data_file)] and report["skipped"] == 1
+
+    parts = dataset_parts(dataset_dir)
+    assert not any(old_hash in part for part in parts)
+    assert not os.path.exists(os.path.join(dataset_dir, ingest.partition_dir_name("standard", "sqlite", "ALTER")))
+    sqlite_rows = ds.dataset(os.path.join(dataset_dir, "category=standard", "system_name=sqlite"), format="parquet")
+    assert sqlite_rows.count_rows() == len(runs)
+
+
+def test_partition_summaries_match_a_rebuild(tmp_path, write_runs):
+    dataset_dir = str(tmp_path / "dataset")
+    write_runs("sqlite", seed=0)
+    ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    # A second file of the same system is merged into the existing partition summaries
+    write_runs("sqlite", file_name="sqlite_rerun", seed=1)
+    report = ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    assert report["skipped"] == 1
+
+    merged_df = ingest.load_summaries(dataset_dir)
+    merged_sketches = ingest.load_sketches(dataset_dir)
+    for partition in report["partitions"]:
+        ingest.update_summary(partition, dataset_dir)
+    rebuilt_df = ingest.load_summaries(dataset_dir)
+    rebuilt_sketches = ingest.load_sketches(dataset_dir)
+
+    sort_columns = ["category", *summary_store.GROUP_COLUMNS]
+    pd.testing.assert_frame_equal(
+        merged_df.sort_values(sort_columns, ignore_index=True),
+        rebuilt_df.sort_values(sort_columns, ignore_index=True),
+        check_exact=False,
+        rtol=1e-9,
+    )
+    sketch_columns = [*sketch_store.SKETCH_GROUP_COLUMNS, "bucket", "category"]
+    pd.testing.assert_frame_equal(
+        merged_sketches.sort_values(sketch_columns, ignore_index=True)[sketch_columns + ["count"]],
+        rebuilt_sketches.sort_values(sketch_columns, ignore_index=True)[sketch_columns + ["count"]],
+        check_dtype=False,
+    )
+    assert merged_df["count"].sum() == 1200
+    runtimes = ds.dataset(dataset_dir, format="parquet", partitioning="hive").to_table()["query_runtime"]
+    assert np.isclose(merged_df["sum"].sum(), runtimes.to_numpy().sum())
+
+
+def test_dataset_covers(tmp_path, write_runs):
+    data_file = write_runs("sqlite")
+    dataset_dir = str(tmp_path / "dataset")
+    assert not ingest.dataset_covers([data_file], dataset_dir)
+    ingest.ingest([str(tmp_path / "standard")], dataset_dir)
+    assert ingest.dataset_covers([data_file], dataset_dir)
+    assert not ingest.dataset_covers([data_file, write_runs("duckdb")], dataset_dir)
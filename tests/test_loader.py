@@ -0,0 +1,43 @@
+import pyarrow.feather as feather
+import pytest
+
+from opendic_benchmark_dashboard import disk_cache, loader
+
+
+@pytest.fixture(params=["cache", "no cache"])
+def table_cache(request, tmp_path):
+    return disk_cache.DiskCache(str(tmp_path / "cache"), max_bytes=0 if request.param == "no cache" else 2**30)
+
+
+def test_read_benchmark_tables_projects_and_filters(write_runs, table_cache):
+    data_files = [write_runs("sqlite", seed=0), write_runs("duckdb", seed=1)]
+    runs_df = loader.read_benchmark_data(data_files)
+    expected_df = runs_df[runs_df["ddl_command"].isin(["CREATE", "SHOW"]) & (runs_df["system_name"] == "duckdb")]
+
+    tables = loader.read_benchmark_tables(
+        data_files,
+        columns=loader.RUNTIME_COLUMNS,
+        ddl_commands=["CREATE", "SHOW"],
+        system_names=["duckdb"],
+        table_cache=table_cache,
+    )
+    assert tables[data_files[0]].num_rows == 0
+    assert tables[data_files[1]].column_names == loader.RUNTIME_COLUMNS
+    assert tables[data_files[1]]["query_runtime"].to_pylist() == expected_df["query_runtime"].tolist()
+
+
+def test_cold_read_decodes_only_the_requested_columns_and_rows(write_runs, tmp_path):
+    # Sorted by command in small row groups, so the row group statistics exclude most of the file
+    data_file = write_runs("sqlite", rows=2000, sort_by="ddl_command", row_group_size=100)
+    table_cache = disk_cache.DiskCache(str(tmp_path / "cache"))
+
+    (table,) = loader.read_benchmark_tables(
+        [data_file], columns=["ddl_command", "query_runtime"], ddl_commands=["SHOW"], table_cache=table_cache
+    ).values()
+
+    # The cached entry holds what the parquet reader decoded
+    (entry,) = [path for path in (tmp_path / "cache").iterdir() if path.suffix == ".arrow"]
+    cached = feather.read_table(str(entry))
+    assert cached.column_names == ["ddl_command", "query_runtime"]
+    assert set(cached["ddl_command"].to_pylist()) == {"SHOW"}
+    assert cached.num_rows == table.num_rows < 2000
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from opendic_benchmark_dashboard import lod
+
+
+@pytest.mark.parametrize("n_out", [0, 1, 2, 3, 4, 5, 10, 11, 100, 999])
+def test_minmax_indices_stay_within_the_budget(n_out):
+    y = np.random.default_rng(0).normal(size=1000)
+    indices = lod.minmax_indices(y, n_out)
+    assert len(indices) <= n_out
+    assert np.all(np.diff(indices) > 0)
+    if n_out >= 4:
+        assert {0, 999, int(np.argmin(y)), int(np.argmax(y))} <= set(indices.tolist())
+
+
+def make_traces(rows=5000, max_granularity=2_000_000):
+    rng = np.random.default_rng(1)
+    granularity = np.linspace(0, max_granularity, rows).astype(np.int64)
+    # Heavy tails, so far more points than the outlier budget score above the threshold
+    avg_runtime = rng.standard_cauchy(2 * rows)
+    return pd.DataFrame(
+        {
+            "target_object": np.repeat(["table", "view"], rows),
+            "granularity": np.tile(granularity, 2),
+            "avg_runtime": avg_runtime,
+        }
+    )
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_reduced_traces_stay_within_the_budget(method):
+    data_df = make_traces()
+    level_of_detail = lod.LevelOfDetail(max_points=200, method=method)
+    assert len(lod.outlier_indices(data_df["avg_runtime"].to_numpy()[:5000])) > 200 * lod.OUTLIER_SHARE
+    assert len(lod.outlier_indices(data_df["avg_runtime"].to_numpy()[:5000], limit=20)) == 20
+
+    plot_df = lod.reduce_traces(data_df, ["target_object"], level_of_detail)
+    assert (plot_df.groupby("target_object").size() <= 200).all()
+    assert plot_df.index.is_monotonic_increasing
+
+
+def test_range_ending_at_the_last_step_keeps_larger_granularities():
+    data_df = make_traces(rows=100)
+    assert data_df["granularity"].max() > lod.GRANULARITY_STEPS[-1]
+    level_of_detail = lod.LevelOfDetail(max_points=1000)
+
+    open_df = lod.reduce_traces(data_df, ["target_object"], lod.LevelOfDetail(x_range=(1_000, lod.GRANULARITY_STEPS[-1])))
+    assert open_df["granularity"].max() == data_df["granularity"].max()
+    assert open_df["granularity"].min() >= 1_000
+    closed_df = lod.reduce_traces(data_df, ["target_object"], lod.LevelOfDetail(x_range=(0, 100_000)))
+    assert closed_df["granularity"].max() <= 100_000
+    assert len(lod.reduce_traces(data_df, ["target_object"], level_of_detail)) == len(data_df)
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from opendic_benchmark_dashboard import regression
+
+
+@pytest.mark.parametrize(
+    ("t", "df", "expected"),
+    [
+        (0.0, 5, 0.5),
+        # Cauchy distribution
+        (1.0, 1, 0.25),
+        # Closed form for two degrees of freedom, 1/2 - t / (2 sqrt(2 + t^2))
+        (1.0, 2, 0.5 - 1 / (2 * math.sqrt(3))),
+        # Critical values of two-sided tests at 5 % and 1 %
+        (12.706204736174698, 1, 0.025),
+        (2.2281388519649385, 10, 0.025),
+        (2.7499956535670305, 30, 0.005),
+        (-2.2281388519649385, 10, 0.975),
+    ],
+)
+def test_t_survival_known_values(t, df, expected):
+    assert regression.t_survival(t, df) == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_t_survival_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    t, df = np.meshgrid(np.linspace(-40, 40, 161), [1, 1.5, 2, 3, 7.3, 29, 120, 1e4])
+    np.testing.assert_allclose(regression.t_survival(t, df), stats.t.sf(t, df), rtol=1e-8, atol=1e-14)
+
+
+def test_incomplete_beta_bounds_and_symmetry():
+    x = np.array([0.0, 0.2, 0.5, 0.7, 1.0, np.nan])
+    result = regression.incomplete_beta(2.5, 4.0, x)
+    assert result[0] == 0 and result[4] == 1 and np.isnan(result[5])
+    np.testing.assert_allclose(result[1:4], 1 - regression.incomplete_beta(4.0, 2.5, 1 - x[1:4]), rtol=1e-10)
+    # I_x(1, b) = 1 - (1 - x)^b
+    assert regression.incomplete_beta(1.0, 3.0, 0.3) == pytest.approx(1 - 0.7**3, rel=1e-12)
+
+
+def test_benjamini_hochberg():
+    p_values = np.array([0.01, 0.04, np.nan, 0.03, 0.005, 0.9])
+    np.testing.assert_allclose(
+        regression.benjamini_hochberg(p_values), [0.025, 0.05, np.nan, 0.05, 0.025, 0.9], equal_nan=True
+    )
+    assert np.isnan(regression.benjamini_hochberg(np.array([np.nan]))).all()
+
+
+def test_compare_aggregates_flags_only_significant_slowdowns():
+    groups = {"system_name": "sqlite", "ddl_command": "CREATE", "target_object": "table"}
+    baseline_df = pd.DataFrame(
+        [
+            {**groups, "granularity": 10, "mean": 1.0, "sum": 30.0, "count": 30, "min": 0.8, "max": 1.2, "std": 0.1},
+            {**groups, "granularity": 100, "mean": 1.0, "sum": 30.0, "count": 30, "min": 0.8, "max": 1.2, "std": 0.1},
+            {**groups, "granularity": 1000, "mean": 1.0, "sum": 30.0, "count": 30, "min": 0.5, "max": 1.5, "std": 0.5},
+        ]
+    )
+    # 50 % slower, unchanged, and 10 % slower but within the noise
+    candidate_df = baseline_df.assign(mean=[1.5, 1.0, 1.1], sum=[45.0, 30.0, 33.0])
+
+    report_df = regression.compare_aggregates(baseline_df, candidate_df).set_index("granularity")
+    assert report_df["regression"].to_dict() == {10: True, 100: False, 1000: False}
+    assert report_df.loc[10, "slowdown"] == pytest.approx(0.5)
+    # Welch's t of the first group, both sides with the same variance and count
+    assert report_df.loc[10, "t"] == pytest.approx(0.5 / math.sqrt(2 * 0.01 / 30))
+    assert report_df.loc[10, "df"] == pytest.approx(58)
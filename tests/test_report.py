@@ -0,0 +1,38 @@
+import json
+import sys
+
+import pytest
+
+from opendic_benchmark_dashboard import aggregation, report
+
+
+def test_no_files_give_empty_aggregates():
+    aggregates_df = aggregation.load_file_aggregates([], backend="pandas")
+    assert aggregates_df.empty
+    assert {"system_name", "granularity", "mean", "count", "system_label"} <= set(aggregates_df.columns)
+
+
+def test_default_invocation_skips_missing_data_dirs(tmp_path, monkeypatch, write_runs, capsys):
+    # Only data/standard exists, like a checkout without the opendic runs
+    write_runs("sqlite", folder="data/standard")
+    (tmp_path / "data" / "opendic_batch").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["opendic-benchmark-dashboard"])
+
+    report.main()
+
+    with open(tmp_path / "report" / "report.json") as f:
+        written = json.load(f)
+    assert [category["category"] for category in written["categories"]] == ["standard"]
+    assert written["skipped"] == ["data/opendic", "data/opendic_batch"]
+    assert (tmp_path / "report" / "standard.html").exists()
+    assert (tmp_path / "report" / "index.html").exists()
+    assert "data/opendic: skipped" in capsys.readouterr().out
+
+
+def test_no_data_fails_with_a_usage_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["opendic-benchmark-dashboard"])
+    with pytest.raises(SystemExit) as exit_info:
+        report.main()
+    assert exit_info.value.code == 2
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from opendic_benchmark_dashboard import loader, runtime_stats
+
+
+@pytest.fixture
+def runs_df(write_runs):
+    return loader.read_benchmark_data([write_runs("sqlite", rows=3000, seed=0), write_runs("duckdb", rows=3000, seed=1)])
+
+
+def expected_quantiles(runs_df, group_columns, quantiles=runtime_stats.QUANTILES, method="linear"):
+    columns = runtime_stats.quantile_columns(quantiles)
+    return (
+        runs_df.groupby(group_columns, observed=True)["query_runtime"]
+        .apply(lambda values: pd.Series(np.quantile(values, quantiles, method=method), index=columns))
+        .unstack()
+        .reset_index()
+    )
+
+
+def test_exact_quantiles_match_numpy(runs_df):
+    group_columns = ["system_name", "ddl_command", "granularity"]
+    stats_df = runtime_stats.runtime_statistics(runs_df, group_columns)
+    expected_df = expected_quantiles(runs_df, group_columns)
+    merged_df = stats_df.merge(expected_df, on=group_columns, suffixes=("", "_expected"))
+
+    assert len(merged_df) == len(stats_df) == len(expected_df)
+    for column in runtime_stats.quantile_columns():
+        np.testing.assert_allclose(merged_df[column], merged_df[f"{column}_expected"], rtol=1e-12)
+    grouped = runs_df.groupby(group_columns, observed=True)["query_runtime"]
+    np.testing.assert_allclose(stats_df["mean"], grouped.mean().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(stats_df["std"], grouped.std().to_numpy(), rtol=1e-9)
+
+
+def test_sketched_quantiles_are_within_the_relative_accuracy(runs_df):
+    group_columns = ["system_name", "ddl_command"]
+    # Every group is larger than the threshold, so all of them are sketched
+    stats_df = runtime_stats.runtime_statistics(runs_df, group_columns, sketch_threshold=100)
+    assert (stats_df["count"] > 100).all()
+    # The sketch reports the run at the nearest lower rank, within 1% of its value
+    expected_df = expected_quantiles(runs_df, group_columns, method="lower")
+    merged_df = stats_df.merge(expected_df, on=group_columns, suffixes=("", "_expected"))
+
+    for column in runtime_stats.quantile_columns():
+        relative_error = (merged_df[column] - merged_df[f"{column}_expected"]).abs() / merged_df[f"{column}_expected"]
+        assert (relative_error <= runtime_stats.RELATIVE_ACCURACY * (1 + 1e-9)).all(), relative_error.max()
+
+
+def test_bootstrap_interval_contains_the_mean_and_covers_the_true_mean():
+    rng = np.random.default_rng(7)
+    # 200 groups of 50 normal runs with true mean 1
+    runs_df = pd.DataFrame({"group": np.repeat(np.arange(200), 50), "query_runtime": rng.normal(1.0, 0.2, 200 * 50)})
+    stats_df = runtime_stats.runtime_statistics(runs_df, ["group"], confidence=0.9)
+
+    assert (stats_df["ci_low"] <= stats_df["mean"]).all() and (stats_df["mean"] <= stats_df["ci_high"]).all()
+    coverage = ((stats_df["ci_low"] <= 1.0) & (1.0 <= stats_df["ci_high"])).mean()
+    # The percentile bootstrap runs a bit narrow for 50 runs
+    assert 0.8 <= coverage <= 0.97
+    expected_half_width = 1.645 * 0.2 / np.sqrt(50)
+    np.testing.assert_allclose((stats_df["ci_high"] - stats_df["ci_low"]).mean() / 2, expected_half_width, rtol=0.15)
+
+
+def test_single_runs_and_missing_keys():
+    runs_df = pd.DataFrame(
+        {
+            "system_name": ["sqlite", "sqlite", None, "duckdb", None],
+            "query_runtime": [1.0, 3.0, 100.0, 2.0, 200.0],
+        }
+    )
+    stats_df = runtime_stats.runtime_statistics(runs_df, ["system_name"])
+
+    assert stats_df["system_name"].tolist() == ["duckdb", "sqlite"]
+    assert stats_df["count"].tolist() == [1, 2]
+    assert stats_df["mean"].tolist() == [2.0, 2.0]
+    assert stats_df["p50"].tolist() == [2.0, 2.0]
+    assert np.isnan(stats_df.loc[0, ["std", "ci_low", "ci_high"]].astype(float)).all()
+    assert stats_df.loc[1, "ci_low"] >= 1.0 and stats_df.loc[1, "ci_high"] <= 3.0
+
+
+def test_sketched_groups_with_missing_keys():
+    runs_df = pd.DataFrame({"system_name": ["sqlite"] * 20 + [None] * 5, "query_runtime": np.arange(1.0, 26.0)})
+    stats_df = runtime_stats.runtime_statistics(runs_df, ["system_name"], sketch_threshold=10)
+    assert stats_df["count"].tolist() == [20]
+    assert stats_df["mean"].tolist() == [10.5]
+    assert stats_df.loc[0, "p99"] <= 20 * (1 + runtime_stats.RELATIVE_ACCURACY)
@@ -0,0 +1,27 @@
+import pandas as pd
+
+from opendic_benchmark_dashboard import loader, schema
+
+
+def test_apply_schema_returns_a_compact_copy(write_runs):
+    data_df = pd.read_parquet(write_runs("sqlite"))
+    original_df = data_df.copy()
+
+    compact_df = schema.apply_schema(data_df, float32_runtime=True)
+    pd.testing.assert_frame_equal(data_df, original_df)
+    assert all(isinstance(compact_df[column].dtype, pd.CategoricalDtype) for column in schema.LABEL_COLUMNS)
+    assert compact_df["granularity"].dtype == "uint8"
+    assert compact_df["query_runtime"].dtype == "float32"
+    assert compact_df["system_name"].tolist() == original_df["system_name"].tolist()
+
+
+def test_memory_report_measures_the_frames(write_runs):
+    data_files = [write_runs("sqlite", rows=1000), write_runs("duckdb", rows=400)]
+    tables = loader.read_benchmark_tables(data_files)
+    report_df = schema.memory_report(tables, {data_files[0]: 0.5})
+
+    assert report_df["rows"].tolist() == [1000, 400]
+    assert report_df["load_seconds"].tolist()[0] == 0.5
+    for data_file, memory_mb in zip(data_files, report_df["memory_mb"]):
+        frame_bytes = schema.to_frame([tables[data_file]]).memory_usage(deep=True).sum()
+        assert memory_mb * 1024**2 == frame_bytes
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from opendic_benchmark_dashboard import loader, runtime_stats, sketch_store
+
+SKETCH_COLUMNS = [*sketch_store.SKETCH_GROUP_COLUMNS, "bucket"]
+
+
+def sorted_sketch(sketch_df):
+    return sketch_df.sort_values(SKETCH_COLUMNS, ignore_index=True)[[*SKETCH_COLUMNS, "count"]]
+
+
+def test_granularity_buckets_are_positive_log_edges():
+    buckets = sketch_store.granularity_buckets([0, 1, 9, 10, 11, 99, 100, 1000, 12345])
+    assert buckets.tolist() == [1, 1, 7, 10, 10, 79, 100, 1000, 10000]
+
+
+def test_merged_sketches_equal_a_sketch_of_all_runs(write_runs):
+    runs_df = loader.read_benchmark_data([write_runs("sqlite", seed=0), write_runs("duckdb", seed=1)])
+    bounds = [0, 1, 250, 900, len(runs_df)]
+    parts = [sketch_store.compute_sketches(runs_df.iloc[low:high]) for low, high in zip(bounds, bounds[1:])]
+
+    merged_df = sketch_store.merge_sketches(parts)
+    pd.testing.assert_frame_equal(
+        sorted_sketch(merged_df), sorted_sketch(sketch_store.compute_sketches(runs_df)), check_dtype=False
+    )
+    assert merged_df["count"].sum() == len(runs_df)
+
+
+def test_sketch_percentiles_are_within_the_relative_accuracy(write_runs):
+    data_files = [write_runs("sqlite", rows=4000, seed=0), write_runs("duckdb", rows=4000, seed=1)]
+    runs_df = loader.read_benchmark_data(data_files)
+    group_columns = ["system_name", "ddl_command"]
+    sketch_dfs = [sketch_store.load_sketches(data_file) for data_file in data_files]
+    sketch_df = sketch_store.merge_sketches(sketch_dfs, group_columns)
+    percentiles_df = sketch_store.sketch_percentiles(sketch_df, group_columns)
+
+    columns = runtime_stats.quantile_columns()
+    # The sketch reports the run at the nearest lower rank, within 1% of its value
+    expected_df = (
+        runs_df.groupby(group_columns, observed=True)["query_runtime"]
+        .apply(lambda values: pd.Series(np.quantile(values, runtime_stats.QUANTILES, method="lower"), index=columns))
+        .unstack()
+        .reset_index()
+    )
+    merged_df = percentiles_df.merge(expected_df, on=group_columns, suffixes=("", "_expected"))
+    assert len(merged_df) == len(expected_df) == 8
+    assert merged_df["count"].sum() == len(runs_df)
+    for column in columns:
+        relative_error = (merged_df[column] - merged_df[f"{column}_expected"]).abs() / merged_df[f"{column}_expected"]
+        assert (relative_error <= runtime_stats.RELATIVE_ACCURACY * (1 + 1e-9)).all(), relative_error.max()
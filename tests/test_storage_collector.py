@@ -0,0 +1,75 @@
+import os
+
+from opendic_benchmark_dashboard import storage_collector
+
+
+def make_output_root(root, systems=("opendict_file",), granularities=(10, 100)):
+    for system in systems:
+        for granularity in granularities:
+            step = root / system / f"granularity={granularity}"
+            (step / "metadata").mkdir(parents=True)
+            (step / "data.parquet").write_bytes(b"x" * granularity)
+            (step / "metadata" / "v1.metadata.json").write_bytes(b"m" * 7)
+    return str(root)
+
+
+def test_collect_storage_sums_data_and_metadata(tmp_path):
+    output_root = make_output_root(tmp_path / "runs")
+    storage_df, counts = storage_collector.collect_storage([output_root])
+    assert storage_df.to_dict("records") == [
+        {
+            "system_name": "opendict_file",
+            "granularity": granularity,
+            "data_bytes": granularity,
+            "data_files": 1,
+            "metadata_bytes": 7,
+            "metadata_files": 1,
+        }
+        for granularity in (10, 100)
+    ]
+    assert counts == {"listed": 4, "reused": 0}
+
+
+def test_rescan_only_lists_changed_directories(tmp_path):
+    output_root = make_output_root(tmp_path / "runs")
+    state = {"directories": {}}
+    storage_collector.collect_storage([output_root], state)
+
+    step = tmp_path / "runs" / "opendict_file" / "granularity=100"
+    (step / "data-2.parquet").write_bytes(b"y" * 50)
+    # Make sure the mtime changes even on file systems with coarse timestamps
+    mtime_ns = os.stat(step).st_mtime_ns + 10**9
+    os.utime(step, ns=(mtime_ns, mtime_ns))
+
+    storage_df, counts = storage_collector.collect_storage([output_root], state)
+    assert counts == {"listed": 1, "reused": 3}
+    assert storage_df.set_index("granularity").loc[100, "data_bytes"] == 150
+    assert state["directories"][str(step)]["mtime_ns"] == mtime_ns
+
+
+def test_rescan_of_one_root_keeps_the_state_of_the_others(tmp_path):
+    first_root = make_output_root(tmp_path / "first", systems=("sqlite",))
+    second_root = make_output_root(tmp_path / "second", systems=("duckdb",))
+    state = {"directories": {}}
+    storage_collector.collect_storage([first_root, second_root], state)
+    scanned = set(state["directories"])
+
+    storage_collector.collect_storage([first_root], state)
+    assert set(state["directories"]) == scanned
+    _, counts = storage_collector.collect_storage([second_root], state)
+    assert counts == {"listed": 0, "reused": 4}
+
+
+def test_state_and_storage_round_trip(tmp_path):
+    output_root = make_output_root(tmp_path / "runs", systems=("sqlite", "duckdb"))
+    dataset_dir = str(tmp_path / "storage")
+    state = {"directories": {}}
+    storage_df, _ = storage_collector.collect_storage([output_root], state)
+    paths = storage_collector.write_storage(storage_df, dataset_dir)
+    storage_collector.write_state(state, dataset_dir)
+
+    assert sorted(os.listdir(dataset_dir)) == ["_scan_state.json", "duckdb.parquet", "sqlite.parquet"]
+    assert storage_collector.storage_files(dataset_dir) == sorted(paths)
+    assert storage_collector.read_state(dataset_dir) == state
+    loaded_df = storage_collector.load_storage(dataset_dir).sort_values(["system_name", "granularity"], ignore_index=True)
+    assert loaded_df.to_dict("records") == storage_df.to_dict("records")
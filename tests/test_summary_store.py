@@ -0,0 +1,95 @@
+import os
+
+import pandas as pd
+import pytest
+
+from opendic_benchmark_dashboard import aggregation, loader, summary_store
+from opendic_benchmark_dashboard.summary_store import AGGREGATE_COLUMNS, GROUP_COLUMNS
+
+
+def assert_aggregates_equal(actual_df, expected_df, group_columns=GROUP_COLUMNS):
+    actual_df = actual_df.sort_values(group_columns, ignore_index=True)
+    expected_df = expected_df.sort_values(group_columns, ignore_index=True)
+    pd.testing.assert_frame_equal(
+        actual_df[[*group_columns, *AGGREGATE_COLUMNS]],
+        expected_df[[*group_columns, *AGGREGATE_COLUMNS]],
+        check_dtype=False,
+        check_categorical=False,
+        check_exact=False,
+        rtol=1e-9,
+    )
+
+
+def test_combined_parts_equal_a_single_groupby(write_runs):
+    runs_df = loader.read_benchmark_data([write_runs("sqlite", seed=0), write_runs("duckdb", seed=1)])
+    # Uneven parts, some groups only appear in one part and some parts hold a single run of a group
+    bounds = [0, 1, 7, 300, 301, len(runs_df)]
+    parts = [summary_store.compute_aggregates(runs_df.iloc[low:high]) for low, high in zip(bounds, bounds[1:])]
+
+    assert_aggregates_equal(summary_store.combine_aggregates(parts), summary_store.compute_aggregates(runs_df))
+
+
+def test_combine_onto_coarser_groups(write_runs):
+    runs_df = loader.read_benchmark_data([write_runs("sqlite", seed=0), write_runs("duckdb", seed=1)])
+    parts = [summary_store.compute_aggregates(runs_df.iloc[low : low + 400]) for low in range(0, len(runs_df), 400)]
+    group_columns = ["ddl_command", "granularity"]
+
+    assert_aggregates_equal(
+        summary_store.combine_aggregates(parts, group_columns),
+        summary_store.compute_aggregates(runs_df, group_columns),
+        group_columns,
+    )
+
+
+def test_stream_aggregates_merge_their_batches(write_runs):
+    # Small row groups, so every file streams as many batches, each aggregated on its own
+    data_files = [
+        write_runs("sqlite", seed=0, rows=1000, row_group_size=64),
+        write_runs("duckdb", seed=1, rows=700, row_group_size=64),
+    ]
+    assert len(list(loader.iter_benchmark_batches(data_files))) > 2
+
+    assert_aggregates_equal(
+        summary_store.stream_aggregates(data_files), summary_store.compute_aggregates(loader.read_benchmark_data(data_files))
+    )
+
+
+def test_sidecar_is_reused_and_replaced_with_the_file(write_runs, tmp_path):
+    data_file = write_runs("sqlite", seed=0)
+    sibling = write_runs("sqlite", file_name="sqlite.v2", seed=1)
+    sidecar_dir = tmp_path / "standard" / summary_store.SIDECAR_DIR
+
+    first_df = summary_store.load_aggregates(data_file)
+    summary_store.load_aggregates(sibling)
+    first_sidecar = summary_store.sidecar_path(data_file, summary_store.file_content_hash(data_file))
+    assert sorted(os.listdir(sidecar_dir)) == sorted(
+        os.path.basename(path)
+        for path in (first_sidecar, summary_store.sidecar_path(sibling, summary_store.file_content_hash(sibling)))
+    )
+    pd.testing.assert_frame_equal(summary_store.load_aggregates(data_file), first_df)
+
+    # A rewritten file gets a new sidecar, the old one goes, the sidecar of `sqlite.v2` stays
+    write_runs("sqlite", seed=2)
+    second_df = summary_store.load_aggregates(data_file)
+    assert not os.path.exists(first_sidecar)
+    assert len(os.listdir(sidecar_dir)) == 2
+    assert not second_df["mean"].equals(first_df["mean"])
+
+
+def test_unwritable_sidecar_dir_keeps_the_computed_frame(write_runs, tmp_path):
+    data_file = write_runs("sqlite")
+    # A file where the sidecar folder should be
+    (tmp_path / "standard" / summary_store.SIDECAR_DIR).write_text("")
+    aggregates_df = summary_store.load_aggregates(data_file)
+    assert aggregates_df["count"].sum() == 600
+    assert not summary_store.write_sidecar(aggregates_df, data_file, "0" * 16)
+
+
+def test_duckdb_aggregates_match_pandas(write_runs):
+    pytest.importorskip("duckdb")
+    data_files = [write_runs("sqlite", seed=0), write_runs("duckdb", seed=1)]
+    duckdb_df = aggregation.load_file_aggregates(data_files, backend="duckdb")
+    pandas_df = aggregation.load_file_aggregates(data_files)
+
+    assert_aggregates_equal(duckdb_df, pandas_df)
+    assert duckdb_df["system_family"].tolist() == pandas_df["system_family"].tolist()